@@ -0,0 +1,24 @@
+"""
+Offline benchmarks for the mockup renderer and API.
+
+Run them as modules from the project root, e.g.::
+
+    python -m benchmarks.render_modes
+
+``benchmarks.suite`` runs the full set and stores the results as JSON for
+comparison between commits.
+"""
+import os
+import sys
+
+
+def setup_django():
+    """Configure Django against benchmarks.settings and create the in-memory schema."""
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    call_command('migrate', verbosity=0)
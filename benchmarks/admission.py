@@ -0,0 +1,109 @@
+"""
+Check admission control on the generate endpoint.
+
+    python -m benchmarks.admission --burst 10 --max-queue-depth 20
+    python -m benchmarks.admission --async-views
+
+Runs against benchmarks.load_settings with no worker, so every admitted job
+stays PENDING. Checks that:
+
+* one client gets ``--burst`` requests through, then 429s with Retry-After,
+* other clients fill the queue up to ``--max-queue-depth``, then get 429s,
+* finishing tasks frees their slots, and the counter matches the database,
+* no admission check runs a COUNT(*) while the counter exists.
+
+Exits non-zero when one of them fails.
+"""
+import argparse
+import os
+import sys
+import time
+
+from benchmarks import setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--burst', type=int, default=10, help="Token bucket size per client")
+    parser.add_argument('--rate', type=float, default=1, help="Tokens per second per client")
+    parser.add_argument('--max-queue-depth', type=int, default=20)
+    parser.add_argument('--async-views', action='store_true', help="Use the async views (MOCKUP_ASYNC_VIEWS)")
+    args = parser.parse_args()
+
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'benchmarks.load_settings'
+    os.environ['MOCKUP_ASYNC_VIEWS'] = '1' if args.async_views else '0'
+    os.environ['MOCKUP_RATE_LIMIT_RATE'] = str(args.rate)
+    os.environ['MOCKUP_RATE_LIMIT_BURST'] = str(args.burst)
+    os.environ['MOCKUP_MAX_QUEUE_DEPTH'] = str(args.max_queue_depth)
+    os.environ.setdefault('MOCKUP_LOG_LEVEL', 'WARNING')
+    setup_django()
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+    from mockups.admission import QUEUE_DEPTH_KEY
+    from mockups.models import GenerationTask
+    from mockups.notifications import TERMINAL_STATUSES
+    from mockups.tasks import _set_task_status
+
+    counter = iter(range(10 ** 6))
+
+    def post(address):
+        client = Client(REMOTE_ADDR=address)
+        return client.post('/api/v1/mockups/generate/', {
+            'text': f"Admission {next(counter)}", 'shirt_color': ['white'],
+        }, content_type='application/json')
+
+    failures = []
+
+    burst = [post('10.0.0.1') for _ in range(args.burst + 5)]
+    admitted = sum(response.status_code == 202 for response in burst)
+    limited = [response for response in burst if response.status_code == 429]
+    retry_after = {response['Retry-After'] for response in limited}
+    print(f"one client: {admitted} admitted, {len(limited)} rate limited, Retry-After {sorted(retry_after)}")
+    if admitted != args.burst or len(limited) != 5:
+        failures.append("the token bucket did not admit exactly --burst requests")
+
+    with CaptureQueriesContext(connection) as queries:
+        others = [post(f"10.0.1.{index}") for index in range(args.max_queue_depth)]
+    counts = [query['sql'] for query in queries if 'COUNT(' in query['sql'].upper()]
+    admitted = sum(response.status_code == 202 for response in others)
+    full = [response for response in others if response.status_code == 429]
+    outstanding = GenerationTask.objects.exclude(status__in=TERMINAL_STATUSES).count()
+    print(f"other clients: {admitted} admitted, {len(full)} queue full, "
+          f"{outstanding} outstanding, counter {cache.get(QUEUE_DEPTH_KEY)}, {len(counts)} COUNT queries")
+    if outstanding != args.max_queue_depth or len(full) != args.burst:
+        failures.append("the queue depth limit was not enforced")
+    if any(response.json().get('error') != 'generation queue is full' or not response['Retry-After'] for response in full):
+        failures.append("a queue-full response lacks its error or Retry-After")
+    if counts:
+        failures.append("an admission check counted the database")
+
+    for gen_task in GenerationTask.objects.filter(status='PENDING')[:5]:
+        _set_task_status(gen_task, 'SUCCESS')
+    outstanding = GenerationTask.objects.exclude(status__in=TERMINAL_STATUSES).count()
+    print(f"after 5 finished: {outstanding} outstanding, counter {cache.get(QUEUE_DEPTH_KEY)}")
+    if cache.get(QUEUE_DEPTH_KEY) != outstanding:
+        failures.append("the queue depth counter drifted from the database")
+
+    refill = [post(f"10.0.2.{index}") for index in range(6)]
+    statuses = [response.status_code for response in refill]
+    print(f"after 5 finished: {statuses.count(202)} admitted, Retry-After {refill[-1].get('Retry-After')}s "
+          f"from the completion rate")
+    if statuses != [202] * 5 + [429]:
+        failures.append("finished tasks did not free their slots")
+
+    _set_task_status(GenerationTask.objects.filter(status='PENDING').first(), 'SUCCESS')
+    time.sleep(1 / args.rate)
+    if post('10.0.0.1').status_code != 202:
+        failures.append("the token bucket did not refill")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK: rate limit and queue depth enforced")
+
+
+if __name__ == '__main__':
+    main()
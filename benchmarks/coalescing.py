@@ -0,0 +1,75 @@
+"""
+Check that bursts of identical generate requests queue a single job.
+
+    python -m benchmarks.coalescing --clients 50
+    python -m benchmarks.coalescing --async-views
+
+Runs against benchmarks.load_settings: LocMemCache, a file-backed SQLite
+database and Celery publishing to the in-memory broker, so jobs stay
+PENDING and the burst really overlaps an in-flight task. Checks that:
+
+* ``--clients`` concurrent identical POSTs get one task id and one row,
+* once that task finished, the next burst starts exactly one new task,
+* a different body is not coalesced.
+
+Exits non-zero when one of them fails.
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--async-views', action='store_true', help="Use the async views (MOCKUP_ASYNC_VIEWS)")
+    args = parser.parse_args()
+
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'benchmarks.load_settings'
+    os.environ['MOCKUP_ASYNC_VIEWS'] = '1' if args.async_views else '0'
+    os.environ.setdefault('MOCKUP_LOG_LEVEL', 'WARNING')
+    setup_django()
+    from django.test import Client
+    from mockups.models import GenerationTask
+    from mockups.tasks import _set_task_status
+
+    body = {'text': 'Campaign launch', 'shirt_color': ['white', 'black']}
+
+    def post(data):
+        response = Client().post('/api/v1/mockups/generate/', data, content_type='application/json')
+        assert response.status_code == 202, response.status_code
+        return response.json()['task_id']
+
+    def burst(data):
+        with ThreadPoolExecutor(max_workers=min(args.clients, 16)) as pool:
+            return set(pool.map(lambda _: post(data), range(args.clients)))
+
+    failures = []
+    first = burst(body)
+    print(f"first burst: {len(first)} task id(s), {GenerationTask.objects.count()} row(s)")
+    if len(first) != 1 or GenerationTask.objects.count() != 1:
+        failures.append("identical concurrent requests were not coalesced")
+
+    _set_task_status(GenerationTask.objects.get(task_id=next(iter(first))), 'SUCCESS')
+    second = burst(body)
+    print(f"after completion: {len(second)} task id(s), new: {not (second & first)}")
+    if len(second) != 1 or second & first:
+        failures.append("a finished task was joined, or its replacement was started more than once")
+
+    other = post({**body, 'text_color': '#FFFFFF'})
+    print(f"different body: new task {other not in first | second}")
+    if other in first | second:
+        failures.append("a different body was coalesced")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK: one job per burst")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Encode time and output size per output format on the bundled shirt templates.
+
+    python -m benchmarks.encoders --runs 5 --text "Hello World"
+
+Each template is composed once with the real text layers, then encoded
+``--runs`` times per format into an in-memory buffer.
+"""
+import argparse
+import io
+import statistics
+import time
+
+from benchmarks import setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--text', default='Hello World')
+    parser.add_argument('--font', default=None)
+    parser.add_argument('--formats', nargs='+', default=None, help="Defaults to every available format")
+    args = parser.parse_args()
+
+    setup_django()
+    from mockups.rendering import SHIRT_FILE_MAP, MockupRenderer, RenderSpec, available_output_formats, encode
+
+    formats = args.formats or available_output_formats()
+    renderer = MockupRenderer()
+    text_layers = renderer.text_layers(args.text, args.font)
+
+    print(f"{'shirt':<8}{'format':<15}{'median ms':>11}{'KiB':>10}")
+    for color in SHIRT_FILE_MAP:
+        base = renderer.render(RenderSpec(args.text, color, args.font), text_layers)
+        if base is None:
+            continue
+
+        for output_format in formats:
+            timings = []
+            for _ in range(args.runs):
+                buffer = io.BytesIO()
+                started = time.perf_counter()
+                encode(base, buffer, output_format)
+                timings.append((time.perf_counter() - started) * 1000)
+            size_kib = buffer.tell() / 1024
+            print(f"{color:<8}{output_format:<15}{statistics.median(timings):>11.1f}{size_kib:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Before/after latency and query plans for the hot lookups indexed in migration 0004.
+
+    python -m benchmarks.indexes --rows 100000
+
+Seeds the tables with migration 0004 unapplied, times each query, applies
+0004 and times them again on the same data.
+"""
+import argparse
+import statistics
+import time
+import uuid
+from datetime import timedelta
+
+from benchmarks import setup_django
+
+STATUSES = ['PENDING', 'STARTED', 'SUCCESS', 'SUCCESS', 'SUCCESS', 'FAILURE']
+
+
+def seed(rows):
+    from django.utils import timezone
+    from mockups.models import GeneratedImage, GenerationTask, Mockup
+
+    now = timezone.now()
+    batch = 10000
+    for start in range(0, rows, batch):
+        mockups = Mockup.objects.bulk_create(
+            Mockup(text=f"Seed slogan number {i}", text_color='#000000', shirt_color='white')
+            for i in range(start, min(start + batch, rows))
+        )
+        GeneratedImage.objects.bulk_create(
+            GeneratedImage(mockup=mockup, image=f"mockups/seed/{mockup.pk}.png") for mockup in mockups
+        )
+        GenerationTask.objects.bulk_create(
+            GenerationTask(task_id=uuid.uuid4(), status=STATUSES[i % len(STATUSES)], mockup=mockup)
+            for i, mockup in enumerate(mockups, start)
+        )
+    # auto_now(_add) ignores explicit values on insert, so spread the timestamps afterwards
+    for model, fields in ((Mockup, ['created_at']), (GenerationTask, ['updated_at'])):
+        objs = list(model.objects.only('pk', *fields))
+        for obj in objs:
+            for field in fields:
+                setattr(obj, field, now - timedelta(seconds=obj.pk))
+        model.objects.bulk_update(objs, fields, batch_size=batch)
+
+
+def hot_queries(rows):
+    from mockups.models import GeneratedImage, GenerationTask, Mockup
+
+    middle = Mockup.objects.get(pk=rows // 2)
+    return {
+        'mockup by text': lambda: list(Mockup.objects.with_text(f"Seed slogan number {rows // 2}")),
+        'mockup list, first page': lambda: list(Mockup.objects.order_by('-created_at', '-id')[:50]),
+        'mockup list, cursor page': lambda: list(
+            Mockup.objects.filter(created_at__lt=middle.created_at).order_by('-created_at', '-id')[:50]
+        ),
+        'tasks by status': lambda: list(
+            GenerationTask.objects.filter(status='PENDING').order_by('-updated_at')[:50]
+        ),
+        'image still referenced': lambda: GeneratedImage.objects.filter(
+            image=f"mockups/seed/{rows // 2}.png"
+        ).exists(),
+    }
+
+
+def plans():
+    from mockups.models import GeneratedImage, GenerationTask, Mockup, TextPrefix
+
+    return {
+        # with_text() resolves candidates with this prefix query, then filters by pk
+        'mockup by text': Mockup.objects.annotate(text_prefix=TextPrefix('text')).filter(text_prefix="x").explain(),
+        'mockup list, first page': Mockup.objects.order_by('-created_at', '-id')[:50].explain(),
+        'tasks by status': GenerationTask.objects.filter(status='PENDING').order_by('-updated_at')[:50].explain(),
+        'image still referenced': GeneratedImage.objects.filter(image="x").explain(),
+    }
+
+
+def measure(queries, repeat):
+    timings = {}
+    for name, query in queries.items():
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            query()
+            samples.append((time.perf_counter() - started) * 1000)
+        timings[name] = statistics.median(samples)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.management import call_command
+
+    call_command('migrate', 'mockups', '0003', verbosity=0)
+    print(f"Seeding {args.rows} mockups, images and tasks...")
+    seed(args.rows)
+
+    before = measure(hot_queries(args.rows), args.repeat)
+    plans_before = plans()
+    call_command('migrate', 'mockups', '0004', verbosity=0)
+    after = measure(hot_queries(args.rows), args.repeat)
+    plans_after = plans()
+
+    print(f"\n{'query':<28}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    for name in before:
+        print(f"{name:<28}{before[name]:>12.3f}{after[name]:>12.3f}{before[name] / after[name]:>9.1f}x")
+
+    print("\nQuery plans")
+    for name in plans_before:
+        print(f"  {name}\n    before: {plans_before[name]}\n    after:  {plans_after[name]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Interactive latency while the bulk lane is saturated.
+
+    python -m benchmarks.lanes --bulk 40 --interactive 10
+
+Starts one in-process Celery worker per lane (solo pool, one job at a time)
+on the in-memory broker of benchmarks.load_settings, then measures the time
+from POST /api/v1/mockups/generate/ to SUCCESS for sequential interactive
+requests in three phases:
+
+* ``idle``: nothing else queued,
+* ``saturated``: while a feeder thread keeps ``--bulk`` jobs queued through
+  the batch endpoint, which uses the bulk lane,
+* ``shared queue``: the same backlog, but the interactive requests pick the
+  bulk lane too. Before lanes existed, every request shared one queue like this.
+
+Both workers run in this process and share its GIL, so the saturated phase
+still pays some CPU contention that separate worker processes would not.
+"""
+import argparse
+import os
+import statistics
+import threading
+import time
+import uuid
+
+from benchmarks import setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bulk', type=int, default=40, help="Bulk jobs kept queued during the loaded phases")
+    parser.add_argument('--interactive', type=int, default=10, help="Interactive requests per phase")
+    parser.add_argument('--colors', type=int, default=1, help="Shirt colours per job")
+    args = parser.parse_args()
+
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'benchmarks.load_settings'
+    os.environ.setdefault('MOCKUP_LOG_LEVEL', 'WARNING')
+    setup_django()
+    from celery.contrib.testing.worker import start_worker
+    from django.test import Client
+    from mockup_project.celery import app
+    from mockups.models import GenerationTask
+    from mockups.notifications import TERMINAL_STATUSES
+    from mockups.rendering import DEFAULT_SHIRT_COLORS
+
+    colors = DEFAULT_SHIRT_COLORS[:args.colors]
+    client = Client()
+
+    def wait_for(task_id):
+        while GenerationTask.objects.get(task_id=task_id).status not in TERMINAL_STATUSES:
+            time.sleep(0.005)
+
+    def interactive_latencies(lane):
+        latencies = []
+        for _ in range(args.interactive):
+            started = time.perf_counter()
+            response = client.post('/api/v1/mockups/generate/', {
+                'text': f"Interactive {uuid.uuid4().hex[:6]}", 'shirt_color': colors, 'lane': lane,
+            }, content_type='application/json')
+            wait_for(response.json()['task_id'])
+            latencies.append((time.perf_counter() - started) * 1000)
+        return sorted(latencies)
+
+    def backlog(task_ids):
+        return GenerationTask.objects.filter(task_id__in=task_ids).exclude(status__in=TERMINAL_STATUSES).count()
+
+    def feed_bulk(task_ids, stop):
+        """Top the bulk lane up to ``--bulk`` unfinished jobs until ``stop`` is set."""
+        feeder = Client()
+        while not stop.is_set():
+            missing = args.bulk - backlog(task_ids)
+            if missing > args.bulk // 4:
+                response = feeder.post('/api/v1/mockups/generate/batch/', {
+                    'items': [{'text': f"Bulk {uuid.uuid4().hex[:6]}", 'shirt_color': colors} for _ in range(missing)],
+                }, content_type='application/json')
+                task_ids.extend(response.json()['task_ids'])
+            stop.wait(0.05)
+
+    workers = [
+        start_worker(app, pool='solo', perform_ping_check=False, queues=[lane], hostname=f"{lane}@bench")
+        for lane in ('interactive', 'bulk')
+    ]
+    for worker in workers:
+        worker.__enter__()
+    try:
+        print(f"{'phase':<14}{'median ms':>12}{'p95 ms':>12}{'bulk done':>12}")
+        phases = [('idle', 'interactive', False), ('saturated', 'interactive', True), ('shared queue', 'bulk', True)]
+        for phase, lane, loaded in phases:
+            bulk_ids, stop = [], threading.Event()
+            feeder = threading.Thread(target=feed_bulk, args=(bulk_ids, stop))
+            if loaded:
+                feeder.start()
+                while len(bulk_ids) < args.bulk:
+                    time.sleep(0.01)
+            latencies = interactive_latencies(lane)
+            stop.set()
+            if loaded:
+                feeder.join()
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            done = len(bulk_ids) - backlog(bulk_ids)
+            print(f"{phase:<14}{statistics.median(latencies):>12.1f}{p95:>12.1f}{done:>12}")
+            # Drain the backlog so the next phase starts from the same state
+            for task_id in bulk_ids:
+                wait_for(task_id)
+    finally:
+        for worker in reversed(workers):
+            worker.__exit__(None, None, None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Check that GET /api/mockups/ issues a constant number of queries per page.
+
+    python -m benchmarks.list_queries --mockups 500
+
+Seeds mockups with four images each, then requests pages of several sizes
+and the following cursor page. Exits non-zero if the query count grows
+with the page size.
+"""
+import argparse
+import sys
+
+from benchmarks import setup_django
+
+
+def seed(count, images_per_mockup=4):
+    from mockups.models import GeneratedImage, Mockup
+
+    mockups = Mockup.objects.bulk_create(
+        Mockup(text=f"Seed {i}", font=None, text_color='#000000', shirt_color='white,black,blue,yellow')
+        for i in range(count)
+    )
+    GeneratedImage.objects.bulk_create(
+        GeneratedImage(mockup=mockup, image=f"mockups/seed/{mockup.pk}_{n}.png",
+                       sizes={'600': f"mockups/seed/{mockup.pk}_{n}.png"})
+        for mockup in mockups
+        for n in range(images_per_mockup)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mockups', type=int, default=500)
+    parser.add_argument('--page-sizes', type=int, nargs='+', default=[1, 10, 50, 200])
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.test import APIClient
+
+    seed(args.mockups)
+    client = APIClient()
+
+    counts = {}
+    for page_size in args.page_sizes:
+        with CaptureQueriesContext(connection) as first_page:
+            response = client.get('/api/mockups/', {'page_size': page_size})
+        assert response.status_code == 200, response.status_code
+        body = response.json()
+        assert len(body['results']) == min(page_size, args.mockups)
+
+        with CaptureQueriesContext(connection) as next_page:
+            client.get(body['next'])
+        counts[page_size] = (len(first_page), len(next_page))
+        print(f"page_size={page_size:<5} first page: {len(first_page)} queries, next page: {len(next_page)} queries")
+
+    if len(set(counts.values())) != 1:
+        print("FAIL: query count depends on page size")
+        sys.exit(1)
+    print("OK: constant query count")
+
+
+if __name__ == '__main__':
+    main()
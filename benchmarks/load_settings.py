@@ -0,0 +1,35 @@
+"""
+Django settings for the benchmarks that queue jobs on a broker instead of running them eagerly.
+
+Like benchmarks.settings, but with a file-backed SQLite database so request
+and worker threads share one schema, and with Celery publishing to the
+in-memory broker instead of running tasks eagerly, so jobs only run where an
+in-process worker consumes them. ``MOCKUP_ASYNC_VIEWS`` comes from the
+environment, and admission control is off unless the environment sets its
+limits, since every request comes from the same client.
+"""
+import os
+import tempfile
+
+from benchmarks.settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(tempfile.mkdtemp(prefix='mockup-load-'), 'db.sqlite3'),
+        # WAL without per-commit fsync: measure the views, not the disk
+        'OPTIONS': {
+            'timeout': 30,
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL',
+        },
+    }
+}
+
+CELERY_TASK_ALWAYS_EAGER = False
+# The memory transport polls its queues; the 1s default would dominate job latency
+CELERY_BROKER_TRANSPORT_OPTIONS = {'polling_interval': 0.01}
+
+MOCKUP_ASYNC_VIEWS = os.getenv('MOCKUP_ASYNC_VIEWS', '').lower() in ('1', 'true', 'yes')
+MOCKUP_RATE_LIMIT_RATE = float(os.getenv('MOCKUP_RATE_LIMIT_RATE', 0))
+MOCKUP_MAX_QUEUE_DEPTH = int(os.getenv('MOCKUP_MAX_QUEUE_DEPTH', 0))
@@ -0,0 +1,301 @@
+"""
+Load test of the generate and task status endpoints, sync (WSGI) against async (ASGI) views.
+
+    python -m benchmarks.load_test --clients 200 --threads 16
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --clients 200
+
+Without ``--url`` each target runs in its own process against
+benchmarks.load_settings:
+
+* ``wsgi``: the DRF views, driven by ``--threads`` request threads like a
+  threaded WSGI server (gunicorn ``--threads``),
+* ``asgi``: the async views (MOCKUP_ASYNC_VIEWS), all clients on one event loop.
+
+Two scenarios run per target:
+
+* ``poll``: every client long-polls (``?wait=``) its own task, and a
+  background thread completes the tasks at random times within
+  ``--complete-within`` seconds. Latency is from a task's completion to its
+  client receiving SUCCESS; a WSGI process can only hold ``--threads``
+  waiting pollers at once.
+* ``generate``: every client POSTs ``--requests`` generation requests
+  (published to an in-memory broker, nothing renders).
+
+With ``--url`` the script instead drives a running server over HTTP: each
+client POSTs one generation request and long-polls it until a worker
+finishes it. Start the server once under WSGI and once under ASGI with
+MOCKUP_ASYNC_VIEWS=1 to compare, e.g. ``gunicorn mockup_project.wsgi
+--threads 16`` and ``uvicorn mockup_project.asgi:application``.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+
+def _latency_summary(latencies_ms):
+    latencies_ms = sorted(latencies_ms)
+    if not latencies_ms:
+        return {}
+    return {
+        'p50_ms': statistics.median(latencies_ms),
+        'p95_ms': latencies_ms[min(len(latencies_ms) - 1, int(len(latencies_ms) * 0.95))],
+        'max_ms': latencies_ms[-1],
+    }
+
+
+def _create_tasks(count):
+    from mockups.models import GenerationTask
+
+    return [str(task.task_id) for task in GenerationTask.objects.bulk_create(
+        GenerationTask(task_id=uuid.uuid4(), status='PENDING') for _ in range(count)
+    )]
+
+
+def _complete_tasks(task_ids, within, completed_at):
+    """Mark tasks SUCCESS at random times, notifying waiters; record each completion time."""
+    from mockups.models import GenerationTask
+    from mockups.tasks import _set_task_status
+
+    schedule = sorted((random.uniform(0, within), task_id) for task_id in task_ids)
+    started = time.perf_counter()
+    for offset, task_id in schedule:
+        delay = started + offset - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        completed_at[task_id] = time.perf_counter()
+        _set_task_status(GenerationTask.objects.get(task_id=task_id), 'SUCCESS')
+
+
+def _poll_wsgi(args):
+    from django.test import Client
+
+    task_ids = _create_tasks(args.clients)
+    received_at = {}
+    completed_at = {}
+
+    def poll(task_id):
+        client = Client()
+        while True:
+            body = client.get(f'/api/v1/tasks/{task_id}/', {'wait': args.wait}).json()
+            if body['status'] == 'SUCCESS':
+                received_at[task_id] = time.perf_counter()
+                return
+
+    completer = threading.Thread(target=_complete_tasks, args=(task_ids, args.complete_within, completed_at))
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        completer.start()
+        list(pool.map(poll, task_ids))
+    completer.join()
+    return started, task_ids, completed_at, received_at
+
+
+async def _poll_asgi(args):
+    from asgiref.sync import sync_to_async
+    from django.test import AsyncClient
+
+    task_ids = await sync_to_async(_create_tasks)(args.clients)
+    received_at = {}
+    completed_at = {}
+    client = AsyncClient()
+
+    async def poll(task_id):
+        while True:
+            response = await client.get(f'/api/v1/tasks/{task_id}/', {'wait': args.wait})
+            if response.json()['status'] == 'SUCCESS':
+                received_at[task_id] = time.perf_counter()
+                return
+
+    completer = threading.Thread(target=_complete_tasks, args=(task_ids, args.complete_within, completed_at))
+    started = time.perf_counter()
+    completer.start()
+    await asyncio.gather(*(poll(task_id) for task_id in task_ids))
+    await asyncio.get_running_loop().run_in_executor(None, completer.join)
+    return started, task_ids, completed_at, received_at
+
+
+def _generate_wsgi(args):
+    from django.test import Client
+
+    def client_run(_):
+        client = Client()
+        for _ in range(args.requests):
+            # Unique texts: identical bodies would be coalesced into one task
+            response = client.post('/api/v1/mockups/generate/', {'text': f"Load test {uuid.uuid4().hex[:8]}"},
+                                   content_type='application/json')
+            assert response.status_code == 202, response.status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        list(pool.map(client_run, range(args.clients)))
+    return time.perf_counter() - started
+
+
+async def _generate_asgi(args):
+    from django.test import AsyncClient
+
+    client = AsyncClient()
+
+    async def client_run():
+        for _ in range(args.requests):
+            response = await client.post('/api/v1/mockups/generate/', {'text': f"Load test {uuid.uuid4().hex[:8]}"},
+                                         content_type='application/json')
+            assert response.status_code == 202, response.status_code
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client_run() for _ in range(args.clients)))
+    return time.perf_counter() - started
+
+
+def run_target(args):
+    """Run both scenarios in this process (started with the target's settings); return the results."""
+    from benchmarks import setup_django
+
+    setup_django()
+    if args.target == 'asgi':
+        started, task_ids, completed_at, received_at = asyncio.run(_poll_asgi(args))
+        generate_seconds = asyncio.run(_generate_asgi(args))
+    else:
+        started, task_ids, completed_at, received_at = _poll_wsgi(args)
+        generate_seconds = _generate_wsgi(args)
+
+    latencies = [(received_at[task_id] - completed_at[task_id]) * 1000 for task_id in task_ids]
+    return {
+        'target': args.target,
+        'clients': args.clients,
+        'threads': args.threads if args.target == 'wsgi' else None,
+        'poll': {
+            'total_s': max(received_at.values()) - started,
+            **_latency_summary(latencies),
+        },
+        'generate': {
+            'requests': args.clients * args.requests,
+            'requests_per_sec': args.clients * args.requests / generate_seconds,
+        },
+    }
+
+
+async def _http_request(host, port, method, path, body=None):
+    """Minimal HTTP/1.1 client on asyncio streams; returns (status, parsed JSON body)."""
+    reader, writer = await asyncio.open_connection(host, port)
+    payload = json.dumps(body).encode() if body is not None else b''
+    headers = [f"{method} {path} HTTP/1.1", f"Host: {host}:{port}", "Connection: close",
+               "Accept: application/json"]
+    if body is not None:
+        headers += ["Content-Type: application/json", f"Content-Length: {len(payload)}"]
+    writer.write(('\r\n'.join(headers) + '\r\n\r\n').encode() + payload)
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, content = raw.partition(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    if b'transfer-encoding: chunked' in head.lower():
+        chunks, rest = [], content
+        while rest:
+            size_line, _, rest = rest.partition(b'\r\n')
+            size = int(size_line, 16)
+            if size == 0:
+                break
+            chunks.append(rest[:size])
+            rest = rest[size + 2:]
+        content = b''.join(chunks)
+    return status, json.loads(content) if content else None
+
+
+async def _run_url(args):
+    parts = urlsplit(args.url)
+    host, port = parts.hostname, parts.port or 80
+    latencies = []
+    failures = 0
+
+    async def client_run():
+        nonlocal failures
+        started = time.perf_counter()
+        status_code, body = await _http_request(host, port, 'POST', '/api/v1/mockups/generate/',
+                                                {'text': f"Load test {uuid.uuid4().hex[:6]}"})
+        if status_code != 202:
+            failures += 1
+            return
+        while True:
+            status_code, body = await _http_request(
+                host, port, 'GET', f"/api/v1/tasks/{body['task_id']}/?wait={args.wait}"
+            )
+            if status_code != 200 or body['status'] == 'FAILURE':
+                failures += 1
+                return
+            if body['status'] == 'SUCCESS':
+                latencies.append((time.perf_counter() - started) * 1000)
+                return
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client_run() for _ in range(args.clients)))
+    return {
+        'target': args.url,
+        'clients': args.clients,
+        'total_s': time.perf_counter() - started,
+        'failures': failures,
+        **_latency_summary(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=200, help="Concurrent clients")
+    parser.add_argument('--threads', type=int, default=16, help="Request threads of the WSGI target")
+    parser.add_argument('--requests', type=int, default=5, help="Generation requests per client")
+    parser.add_argument('--wait', type=float, default=30, help="Long-poll ?wait= seconds")
+    parser.add_argument('--complete-within', type=float, default=2.0,
+                        help="Tasks complete at random times within this many seconds")
+    parser.add_argument('--targets', nargs='+', choices=['wsgi', 'asgi'], default=['wsgi', 'asgi'])
+    parser.add_argument('--url', help="Load a running server instead of the in-process targets")
+    parser.add_argument('--output', help="Write results as JSON to this path")
+    parser.add_argument('--target', choices=['wsgi', 'asgi'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.target:
+        # Child process: run one target and report on stdout
+        print(json.dumps(run_target(args)))
+        return
+
+    if args.url:
+        results = [asyncio.run(_run_url(args))]
+        print(json.dumps(results[0], indent=2))
+    else:
+        results = []
+        for target in args.targets:
+            env = dict(os.environ, DJANGO_SETTINGS_MODULE='benchmarks.load_settings',
+                       MOCKUP_ASYNC_VIEWS='1' if target == 'asgi' else '0',
+                       MOCKUP_LOG_LEVEL=os.environ.get('MOCKUP_LOG_LEVEL', 'WARNING'))
+            child = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.load_test', '--target', target] + sys.argv[1:],
+                env=env, capture_output=True, text=True,
+                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            )
+            if child.returncode != 0:
+                sys.stderr.write(child.stderr)
+                sys.exit(child.returncode)
+            results.append(json.loads(child.stdout.strip().splitlines()[-1]))
+
+        print(f"{'target':<8}{'poll total s':>14}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'generate req/s':>16}")
+        for result in results:
+            poll = result['poll']
+            print(f"{result['target']:<8}{poll['total_s']:>14.2f}{poll['p50_ms']:>10.1f}{poll['p95_ms']:>10.1f}"
+                  f"{poll['max_ms']:>10.1f}{result['generate']['requests_per_sec']:>16.1f}")
+
+    if args.output:
+        with open(args.output, 'w') as fp:
+            json.dump(results, fp, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Compare end-to-end generate_mockup_task latency for each render mode.
+
+    python -m benchmarks.render_modes --runs 10 --font arial
+
+Every run uses a fresh text so the render cache never short-circuits it.
+'chord' runs eagerly here, so it shows the orchestration overhead rather
+than real cross-worker parallelism. 'threads' can only beat 'serial' with
+more than one CPU, so the CPU count is printed with the results.
+"""
+import argparse
+import os
+import statistics
+import time
+import uuid
+
+from benchmarks import setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--font', default=None, help="Font name in assets/fonts (default font if omitted)")
+    parser.add_argument('--modes', nargs='+', default=['serial', 'threads', 'chord'])
+    args = parser.parse_args()
+
+    setup_django()
+    from mockups.tasks import generate_mockup_task
+
+    # Warm the template and font caches so the first mode is not penalised
+    generate_mockup_task.apply(args=(None, 'warm-up'), kwargs={'font_name': args.font})
+
+    print(f"{os.cpu_count()} CPU(s)")
+    print(f"{'mode':<10}{'median ms':>12}{'p95 ms':>12}")
+    for mode in args.modes:
+        timings = []
+        for _ in range(args.runs):
+            text = f"Benchmark {uuid.uuid4().hex[:6]}"
+            started = time.perf_counter()
+            generate_mockup_task.apply(
+                args=(str(uuid.uuid4()), text),
+                kwargs={'font_name': args.font, 'render_mode': mode},
+            )
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        print(f"{mode:<10}{statistics.median(timings):>12.1f}{p95:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
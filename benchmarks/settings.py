@@ -0,0 +1,33 @@
+"""
+Django settings for running the benchmarks offline.
+
+SQLite in memory, Celery in eager mode and a throwaway MEDIA_ROOT, so no
+Redis, worker or dev database is needed.
+"""
+import tempfile
+
+from mockup_project.settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+}
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix='mockup-bench-')
+ALLOWED_HOSTS = ['*']
+DEBUG = False
+
+CELERY_TASK_ALWAYS_EAGER = True
+CELERY_TASK_EAGER_PROPAGATES = True
+CELERY_BROKER_URL = 'memory://'
+CELERY_RESULT_BACKEND = 'cache+memory://'
+
+MOCKUP_TASK_NOTIFIER = 'mockups.notifications.InMemoryNotifier'
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
@@ -0,0 +1,62 @@
+"""
+Compare generate_mockup_task latency against different storage backends.
+
+    python -m benchmarks.storage_backends --runs 10 --latency 0.02 --concurrency 4
+
+Runs against the local filesystem and against InMemoryObjectStorage, the
+S3-like stand-in from mockups.storage, with ``--latency`` seconds per
+request to mimic an object store across the network. ``--concurrency`` sets
+MOCKUP_STORAGE_UPLOAD_CONCURRENCY; run it with 1 to see what overlapping the
+uploads of a job saves. Every run uses a fresh text so the render cache
+never short-circuits it.
+"""
+import argparse
+import os
+import statistics
+import time
+import uuid
+
+from benchmarks import setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.02, help="Seconds per object store request")
+    parser.add_argument('--concurrency', type=int, default=4, help="MOCKUP_STORAGE_UPLOAD_CONCURRENCY")
+    args = parser.parse_args()
+
+    os.environ['MOCKUP_STORAGE_UPLOAD_CONCURRENCY'] = str(args.concurrency)
+    os.environ.setdefault('MOCKUP_LOG_LEVEL', 'WARNING')
+    setup_django()
+    from django.test import override_settings
+    from mockups.tasks import generate_mockup_task
+
+    backends = {
+        'filesystem': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'object': {
+            'BACKEND': 'mockups.storage.InMemoryObjectStorage',
+            'OPTIONS': {'latency': args.latency},
+        },
+    }
+
+    # Warm the template and font caches so the first backend is not penalised
+    generate_mockup_task.apply(args=(None, 'warm-up'))
+
+    print(f"{'backend':<12}{'median ms':>12}{'p95 ms':>12}")
+    for name, backend in backends.items():
+        from django.conf import settings
+
+        with override_settings(STORAGES={**settings.STORAGES, 'mockups': backend}):
+            timings = []
+            for _ in range(args.runs):
+                started = time.perf_counter()
+                generate_mockup_task.apply(args=(str(uuid.uuid4()), f"Benchmark {uuid.uuid4().hex[:6]}"))
+                timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        print(f"{name:<12}{statistics.median(timings):>12.1f}{p95:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,290 @@
+"""
+Benchmark suite for the rendering and API hot paths, with JSON results.
+
+    python -m benchmarks.suite --output benchmarks/results/$(git rev-parse --short HEAD).json
+    python -m benchmarks.suite --compare benchmarks/results/<older commit>.json
+
+Runs against in-memory SQLite with Celery eager (benchmarks.settings), so
+no Redis, worker or dev database is needed. Cases:
+
+* ``render/<font>/<chars>``: MockupRenderer.render for one colour
+* ``task/<font>/<chars>``: generate_mockup_task per colour, render-cache
+  misses included (the files are written to a throwaway MEDIA_ROOT)
+* ``encode/png/<colour>``: PNG encoding of a composed shirt
+* ``list/<rows>/first_page`` and ``list/<rows>/cursor_page``: GET
+  /api/v1/mockups/ latency and query count on a seeded table
+* ``status/<state>``: TaskStatusView latency and requests per second
+
+With ``--compare`` every case's median is checked against the earlier
+results and the run exits non-zero when one got slower than ``--threshold``.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+from benchmarks import setup_django
+
+SUITES = ('render', 'task', 'encode', 'list', 'status')
+SAMPLE_TEXT = "The quick brown fox jumps over the lazy dog and keeps on running far away"
+
+
+def measure(func, runs, setup=None, warmup=1):
+    """Time ``runs`` calls of ``func``; ``setup`` runs untimed before each call."""
+    for _ in range(warmup):
+        if setup:
+            setup()
+        func()
+    timings = []
+    for _ in range(runs):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        'runs': runs,
+        'median_ms': statistics.median(timings),
+        'mean_ms': statistics.fmean(timings),
+        'min_ms': timings[0],
+        'p95_ms': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+    }
+
+
+def _font_label(font_name):
+    return font_name or 'default'
+
+
+def bench_render(args, results):
+    from mockups.rendering import MockupRenderer, RenderSpec
+
+    renderer = MockupRenderer()
+    for font_name in args.fonts:
+        for length in args.text_lengths:
+            text = SAMPLE_TEXT[:length]
+            spec = RenderSpec(text, 'white', font_name)
+            # A fresh TextLayers per call, so each run pays the text rasterization like a new job
+            results[f"render/{_font_label(font_name)}/{length}"] = measure(
+                lambda: renderer.render(spec, renderer.text_layers(text, font_name)), args.runs
+            )
+
+
+def bench_task(args, results):
+    from mockups.rendering import DEFAULT_SHIRT_COLORS
+    from mockups.tasks import generate_mockup_task
+
+    colors = len(DEFAULT_SHIRT_COLORS)
+    for font_name in args.fonts:
+        for length in args.text_lengths:
+            def run():
+                # A unique suffix keeps the content-addressed render cache from short-circuiting
+                text = f"{SAMPLE_TEXT[:length]} {uuid.uuid4().hex[:4]}"
+                generate_mockup_task.apply(args=(str(uuid.uuid4()), text), kwargs={'font_name': font_name})
+
+            stats = measure(run, args.task_runs)
+            stats.update({key: value / colors for key, value in stats.items() if key.endswith('_ms')})
+            stats['colors'] = colors
+            results[f"task/{_font_label(font_name)}/{length}"] = stats
+
+
+def bench_encode(args, results):
+    import io
+
+    from mockups.rendering import SHIRT_FILE_MAP, MockupRenderer, RenderSpec, encode
+
+    renderer = MockupRenderer()
+    for color in SHIRT_FILE_MAP:
+        image = renderer.render(RenderSpec('Hello World', color))
+        if image is None:
+            continue
+        buffer = io.BytesIO()
+
+        def run():
+            buffer.seek(0)
+            buffer.truncate()
+            encode(image, buffer, 'png')
+
+        stats = measure(run, args.runs)
+        stats['bytes'] = buffer.tell()
+        results[f"encode/png/{color}"] = stats
+
+
+def bench_list(args, results):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.test import APIClient
+
+    from benchmarks.list_queries import seed
+    from mockups.models import Mockup
+
+    client = APIClient()
+    for rows in sorted(args.rows):
+        missing = rows - Mockup.objects.count()
+        while missing > 0:
+            seed(min(missing, 10000))
+            missing -= 10000
+
+        first = client.get('/api/v1/mockups/').json()
+        pages = {
+            'first_page': lambda: client.get('/api/v1/mockups/'),
+            'cursor_page': lambda: client.get(first['next']),
+        }
+        for name, fetch in pages.items():
+            with CaptureQueriesContext(connection) as queries:
+                fetch()
+            # Read the count now: every request resets the connection's query log
+            query_count = len(queries)
+            stats = measure(fetch, args.runs)
+            stats.update({'rows': rows, 'queries': query_count})
+            results[f"list/{rows}/{name}"] = stats
+
+
+def bench_status(args, results):
+    from rest_framework.test import APIClient
+
+    from mockups import status_cache
+    from mockups.models import GeneratedImage, GenerationTask, Mockup
+
+    client = APIClient()
+    mockup = Mockup.objects.create(text='Status benchmark', text_color='#000000', shirt_color='white')
+    GeneratedImage.objects.bulk_create(
+        GeneratedImage(mockup=mockup, image=f"mockups/seed/status_{n}.png",
+                       sizes={'600': f"mockups/seed/status_{n}.png"})
+        for n in range(4)
+    )
+    pending = GenerationTask.objects.create(task_id=uuid.uuid4(), status='PENDING')
+    success = GenerationTask.objects.create(task_id=uuid.uuid4(), status='SUCCESS', mockup=mockup)
+    pending_url = f"/api/v1/tasks/{pending.task_id}/"
+    success_url = f"/api/v1/tasks/{success.task_id}/"
+    etag = client.get(success_url)['ETag']
+
+    cases = {
+        'pending': (lambda: client.get(pending_url), None),
+        'success_uncached': (lambda: client.get(success_url), lambda: status_cache.invalidate(success.task_id)),
+        'success_cached': (lambda: client.get(success_url), None),
+        'success_not_modified': (lambda: client.get(success_url, HTTP_IF_NONE_MATCH=etag), None),
+    }
+    for name, (fetch, setup) in cases.items():
+        stats = measure(fetch, args.status_runs, setup=setup)
+        stats['requests_per_sec'] = 1000 / stats['mean_ms']
+        results[f"status/{name}"] = stats
+
+
+BENCHMARKS = {
+    'render': bench_render,
+    'task': bench_task,
+    'encode': bench_encode,
+    'list': bench_list,
+    'status': bench_status,
+}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _metadata(args):
+    import django
+    import PIL
+
+    return {
+        'commit': _git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'pillow': PIL.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'args': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+    }
+
+
+def compare(results, baseline, threshold):
+    """Print median changes against ``baseline``; return the names that regressed."""
+    regressions = []
+    print(f"\n{'case':<40}{'before ms':>12}{'after ms':>12}{'ratio':>8}")
+    for name, stats in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        ratio = stats['median_ms'] / before['median_ms'] if before['median_ms'] else float('inf')
+        flag = ''
+        if ratio > threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<40}{before['median_ms']:>12.2f}{stats['median_ms']:>12.2f}{ratio:>8.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--only', nargs='+', choices=SUITES, default=list(SUITES))
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--task-runs', type=int, default=5, help="generate_mockup_task runs per case")
+    parser.add_argument('--status-runs', type=int, default=500, help="requests per TaskStatusView case")
+    parser.add_argument('--fonts', nargs='+', default=None,
+                        help="Font names in assets/fonts; 'default' is Pillow's built-in font "
+                             "(default: the built-in font and every bundled .ttf)")
+    parser.add_argument('--text-lengths', type=int, nargs='+', default=[5, 20, 60])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--output', help="Write results as JSON to this path")
+    parser.add_argument('--compare', help="JSON results of an earlier run to compare against")
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help="Median ratio above which a case counts as a regression")
+    args = parser.parse_args()
+
+    setup_django()
+    from mockups import rendering
+
+    if args.fonts is None:
+        bundled = sorted(
+            os.path.splitext(filename)[0]
+            for filename in (os.listdir(rendering.FONT_DIR) if os.path.isdir(rendering.FONT_DIR) else [])
+            if filename.lower().endswith('.ttf')
+        )
+        args.fonts = [None] + bundled
+    else:
+        args.fonts = [None if name == 'default' else name for name in args.fonts]
+
+    results = {}
+    for suite in SUITES:
+        if suite in args.only:
+            started = time.perf_counter()
+            BENCHMARKS[suite](args, results)
+            print(f"{suite}: done in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    print(f"{'case':<40}{'median ms':>12}{'p95 ms':>12}")
+    for name, stats in results.items():
+        print(f"{name:<40}{stats['median_ms']:>12.2f}{stats['p95_ms']:>12.2f}")
+
+    document = {'meta': _metadata(args), 'results': results}
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as fp:
+            json.dump(document, fp, indent=2, sort_keys=True)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as fp:
+            baseline = json.load(fp)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) slower than {args.threshold}x the baseline")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Check that generate_mockup_task issues a constant number of queries per job.
+
+    python -m benchmarks.task_queries --max-queries 20
+
+Runs jobs with one to four shirt colours, first as new tasks and then as
+re-runs that replace the previous mockup. Exits non-zero if the query count
+grows with the number of colours or exceeds ``--max-queries`` (BEGIN,
+COMMIT and savepoint statements included).
+"""
+import argparse
+import sys
+import uuid
+
+from benchmarks import setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--max-queries', type=int, default=20, help="Query budget per job")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from mockups.models import GenerationTask
+    from mockups.rendering import DEFAULT_SHIRT_COLORS
+    from mockups.tasks import generate_mockup_task
+
+    counts = {}
+    for colors in range(1, len(DEFAULT_SHIRT_COLORS) + 1):
+        task_id = str(uuid.uuid4())
+        GenerationTask.objects.create(task_id=task_id)
+        kwargs = {'shirt_colors': DEFAULT_SHIRT_COLORS[:colors]}
+        text = f"Queries {uuid.uuid4().hex[:6]}"
+
+        with CaptureQueriesContext(connection) as new_job:
+            generate_mockup_task.apply(args=(task_id, text), kwargs=kwargs)
+        with CaptureQueriesContext(connection) as rerun:
+            generate_mockup_task.apply(args=(task_id, text), kwargs=kwargs)
+        assert GenerationTask.objects.get(task_id=task_id).status == 'SUCCESS'
+
+        counts[colors] = (len(new_job), len(rerun))
+        print(f"colors={colors}  new job: {len(new_job)} queries, re-run: {len(rerun)} queries")
+
+    if len(set(counts.values())) != 1:
+        print("FAIL: query count depends on the number of colours")
+        sys.exit(1)
+    if max(max(pair) for pair in counts.values()) > args.max_queries:
+        print(f"FAIL: more than {args.max_queries} queries per job")
+        sys.exit(1)
+    print("OK: constant query count")
+
+
+if __name__ == '__main__':
+    main()
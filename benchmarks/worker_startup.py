@@ -0,0 +1,155 @@
+"""
+Web-process import cost and first-job latency of a worker process.
+
+    python -m benchmarks.worker_startup --runs 3
+
+Every measurement runs in a fresh interpreter against benchmarks.load_settings:
+
+* ``web``: time to import the URLconf after ``django.setup()``, and the
+  peak RSS after queueing a single and a batch job. Fails if that
+  loaded Pillow, mockups.rendering or mockups.tasks.
+* ``worker``: starts an in-process solo worker (which sends
+  worker_process_init like every pool child) with MOCKUP_WORKER_WARM_UP off
+  and on. It reports the worker start time, the latency from POST to
+  SUCCESS of its first and second job, and the first-job penalty (first
+  minus second, within each process). It also checks that
+  ``catalog.available_output_formats()``, which the web process uses without
+  Pillow, matches the encoders Pillow registers.
+
+Exits non-zero when the web process loads the renderer, the warm-up decodes
+no templates or the output formats disagree.
+"""
+import argparse
+import importlib
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks import setup_django
+
+RENDER_MODULES = ('PIL.Image', 'mockups.rendering', 'mockups.tasks')
+
+
+def _web():
+    import django
+    from django.conf import settings
+
+    django.setup()
+    started = time.perf_counter()
+    importlib.import_module(settings.ROOT_URLCONF)
+    import_ms = (time.perf_counter() - started) * 1000
+
+    from django.core.management import call_command
+    from django.test import Client
+
+    call_command('migrate', verbosity=0)
+    client = Client()
+    client.post('/api/v1/mockups/generate/', {'text': 'Startup'}, content_type='application/json')
+    client.post('/api/v1/mockups/generate/batch/', {'items': [{'text': 'Startup'}]}, content_type='application/json')
+    return {
+        'import_ms': import_ms,
+        'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'loaded': [name for name in RENDER_MODULES if name in sys.modules],
+    }
+
+
+def _worker():
+    setup_django()
+    from celery.contrib.testing.worker import start_worker
+    from django.test import Client
+    from mockup_project.celery import app
+    from mockups import tasks  # noqa: F401 (a worker imports its task modules at boot)
+    from mockups.models import GenerationTask
+    from mockups.notifications import TERMINAL_STATUSES
+    from mockups.rendering import OUTPUT_ENCODERS, available_output_formats, font_registry, template_cache
+    from PIL import Image
+
+    client = Client()
+
+    def job_ms(text):
+        started = time.perf_counter()
+        task_id = client.post('/api/v1/mockups/generate/', {'text': text},
+                              content_type='application/json').json()['task_id']
+        while GenerationTask.objects.get(task_id=task_id).status not in TERMINAL_STATUSES:
+            time.sleep(0.002)
+        return (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with start_worker(app, pool='solo', perform_ping_check=False, hostname='startup@bench'):
+        start_ms = (time.perf_counter() - started) * 1000
+        warm = {'templates': template_cache.stats()['entries'], 'fonts': font_registry.stats()['entries']}
+        first_ms = job_ms('First job')
+        second_ms = job_ms('Second job')
+    Image.init()
+    registered = [name for name, (pil_format, _, _) in OUTPUT_ENCODERS.items() if pil_format in Image.SAVE]
+    return {
+        'start_ms': start_ms,
+        'first_job_ms': first_ms,
+        'second_job_ms': second_ms,
+        'cached_before_first_job': warm,
+        'formats_match': registered == available_output_formats(),
+    }
+
+
+def _child(mode, warm_up=True):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE='benchmarks.load_settings',
+               MOCKUP_WORKER_WARM_UP='1' if warm_up else '0',
+               MOCKUP_LOG_LEVEL=os.environ.get('MOCKUP_LOG_LEVEL', 'WARNING'))
+    child = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.worker_startup', '--child', mode],
+        env=env, capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    if child.returncode != 0:
+        sys.stderr.write(child.stderr)
+        sys.exit(child.returncode)
+    return json.loads(child.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=3, help="Fresh processes per measurement")
+    parser.add_argument('--child', choices=['web', 'worker'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(_web() if args.child == 'web' else _worker()))
+        return
+
+    failures = []
+    web = [_child('web') for _ in range(args.runs)]
+    loaded = sorted({name for run in web for name in run['loaded']})
+    print(f"web: URLconf import {statistics.median(run['import_ms'] for run in web):.1f} ms, "
+          f"peak RSS {statistics.median(run['rss_mb'] for run in web):.1f} MB, render modules loaded: {loaded or 'none'}")
+    if loaded:
+        failures.append(f"the web process imported {loaded}")
+
+    print(f"{'worker':<10}{'start ms':>10}{'first job ms':>14}{'second job ms':>15}{'penalty ms':>12}"
+          f"  cached before first job")
+    for warm_up in (False, True):
+        runs = [_child('worker', warm_up) for _ in range(args.runs)]
+        cached = runs[0]['cached_before_first_job']
+        print(f"{'warm-up' if warm_up else 'cold':<10}"
+              f"{statistics.median(run['start_ms'] for run in runs):>10.1f}"
+              f"{statistics.median(run['first_job_ms'] for run in runs):>14.1f}"
+              f"{statistics.median(run['second_job_ms'] for run in runs):>15.1f}"
+              f"{statistics.median(run['first_job_ms'] - run['second_job_ms'] for run in runs):>12.1f}"
+              f"  {cached['templates']} templates, {cached['fonts']} fonts")
+        if warm_up and not cached['templates']:
+            failures.append("the warm-up decoded no shirt templates")
+        if not all(run['formats_match'] for run in runs):
+            failures.append("available_output_formats() disagrees with Pillow's registered encoders")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK: the web process does not load the renderer")
+
+
+if __name__ == '__main__':
+    main()
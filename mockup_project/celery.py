@@ -1,6 +1,9 @@
 from __future__ import absolute_import, unicode_literals
+import logging
 import os
 from celery import Celery
+from celery.signals import celeryd_after_setup, worker_process_init
+from kombu import Exchange, Queue
 
 # تنظیم متغیر محیطی Django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mockup_project.settings')
@@ -14,7 +17,74 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 # کشف و ثبت خودکار تمام tasks در اپ‌ها
 app.autodiscover_tasks(lambda: ['mockups'])
 
+logger = logging.getLogger(__name__)
+
+# Render tasks: long-running, so each worker takes one at a time and only
+# acknowledges it once it is done. A job whose worker process dies is failed,
+# not redelivered, so an input that crashes the renderer cannot loop.
+RENDER_TASKS = ('mockups.tasks.generate_mockup_task', 'mockups.tasks.render_mockup_color_task')
+
+
+def route_by_lane(name, args, kwargs, options, task=None, **kw):
+    """task_routes entry: mockups tasks go to the queue named by their ``lane`` kwarg."""
+    from django.conf import settings
+
+    lane = (kwargs or {}).get('lane')
+    if name.startswith('mockups.') and lane in getattr(settings, 'MOCKUP_LANES', ()):
+        return {'queue': lane}
+    return None
+
+
+@app.on_after_configure.connect
+def _configure_lanes(sender, **kwargs):
+    # Runs once the Django settings are loaded. Every lane is a queue of its
+    # own; a worker started without -Q consumes all of them.
+    from django.conf import settings
+
+    lanes = getattr(settings, 'MOCKUP_LANES', ('interactive', 'bulk'))
+    sender.conf.task_queues = [Queue(lane, Exchange(lane), routing_key=lane) for lane in lanes]
+    sender.conf.task_default_queue = getattr(settings, 'MOCKUP_DEFAULT_LANE', lanes[0])
+    sender.conf.task_routes = (route_by_lane,)
+    sender.conf.worker_prefetch_multiplier = 1
+    sender.conf.task_annotations = {
+        name: {
+            'acks_late': True,
+            'soft_time_limit': getattr(settings, 'MOCKUP_RENDER_SOFT_TIME_LIMIT', 120),
+            'time_limit': getattr(settings, 'MOCKUP_RENDER_TIME_LIMIT', 150),
+        }
+        for name in RENDER_TASKS
+    }
+
+
+# Pools that send worker_process_init in the process that runs the jobs
+PROCESS_INIT_POOLS = ('celery.concurrency.prefork', 'celery.concurrency.solo')
+
+
+@worker_process_init.connect
+def _warm_up_renderer(**kwargs):
+    # Each prefork child (or the solo pool's process) decodes the shirt
+    # templates and parses the fonts before it takes its first job. The web
+    # process never gets here, so it never loads the renderer.
+    from django.conf import settings
+
+    if not getattr(settings, 'MOCKUP_WORKER_WARM_UP', True):
+        return
+    from mockups.rendering import warm_up
+
+    stats = warm_up()
+    logger.info("Renderer warmed up in %.3fs: %d templates, %d fonts",
+                stats['seconds'], stats['templates'], stats['fonts'])
+
+
+@celeryd_after_setup.connect
+def _warm_up_shared_renderer(sender, instance, **kwargs):
+    # threads, gevent and eventlet pools run jobs in the worker process itself
+    # and never send worker_process_init; warm it before the consumer starts
+    if instance.pool_cls.__module__ not in PROCESS_INIT_POOLS:
+        _warm_up_renderer()
+
+
 # برای debug: چاپ هر بار که celery load شد
 @app.task(bind=True)
 def debug_task(self):
-    print(f'Request: {self.request!r}')
\ No newline at end of file
+    logger.debug('Request: %r', self.request)
\ No newline at end of file
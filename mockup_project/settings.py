@@ -9,6 +9,7 @@ https://docs.djangoproject.com/en/5.2/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
+import json
 import os
 from pathlib import Path
 
@@ -79,6 +80,14 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Tasks read then write inside one transaction; taking the write
+            # lock at BEGIN lets concurrent workers wait on it (up to
+            # timeout seconds) instead of failing with "database is locked".
+            # transaction_mode needs Django 5.1+ (see requirements.txt).
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
     }
 }
 
@@ -126,9 +135,171 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Rendered mockups are written and deleted through the 'mockups' storage.
+# Workers on several nodes need a shared backend, e.g. django-storages'
+# S3 storage: MOCKUP_STORAGE_BACKEND=storages.backends.s3.S3Storage and
+# MOCKUP_STORAGE_OPTIONS='{"bucket_name": "mockups"}'.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+    'mockups': {
+        'BACKEND': os.getenv('MOCKUP_STORAGE_BACKEND', 'django.core.files.storage.FileSystemStorage'),
+        'OPTIONS': json.loads(os.getenv('MOCKUP_STORAGE_OPTIONS', '{}')),
+    },
+}
+MOCKUP_STORAGE = 'mockups'
+# Concurrent uploads per worker process
+MOCKUP_STORAGE_UPLOAD_CONCURRENCY = int(os.getenv('MOCKUP_STORAGE_UPLOAD_CONCURRENCY', 4))
+# Jobs recording rows for shared render files and jobs deleting unreferenced ones
+# take a lock per file in CACHES; it expires (and waiting gives up) after this many seconds
+MOCKUP_RENDER_LOCK_TIMEOUT = int(os.getenv('MOCKUP_RENDER_LOCK_TIMEOUT', 60))
+
 
 CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', 'redis://localhost:6379/0')
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
-CELERY_RESULT_SERIALIZER = 'json'
\ No newline at end of file
+CELERY_RESULT_SERIALIZER = 'json'
+
+# Generation lanes, each its own Celery queue (routing in mockup_project/celery.py), so a
+# bulk import never queues in front of interactive requests. Run a worker per lane:
+#   celery -A mockup_project worker -Q interactive -n interactive@%h
+#   celery -A mockup_project worker -Q bulk -n bulk@%h
+MOCKUP_LANES = ('interactive', 'bulk')
+MOCKUP_DEFAULT_LANE = 'interactive'  # POST /api/v1/mockups/generate/
+MOCKUP_BATCH_LANE = 'bulk'  # POST /api/v1/mockups/generate/batch/
+# Render task limits in seconds: SoftTimeLimitExceeded (the task is marked FAILURE)
+# after the soft limit, the worker process is killed at the hard limit
+MOCKUP_RENDER_SOFT_TIME_LIMIT = int(os.getenv('MOCKUP_RENDER_SOFT_TIME_LIMIT', 120))
+MOCKUP_RENDER_TIME_LIMIT = int(os.getenv('MOCKUP_RENDER_TIME_LIMIT', 150))
+
+# Render worker caches
+MOCKUP_TEMPLATE_CACHE_MAX_BYTES = int(os.getenv('MOCKUP_TEMPLATE_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+MOCKUP_FONT_CACHE_MAX_ENTRIES = int(os.getenv('MOCKUP_FONT_CACHE_MAX_ENTRIES', 64))
+MOCKUP_FONT_SIZE_BUCKET = int(os.getenv('MOCKUP_FONT_SIZE_BUCKET', 1))
+# Decode shirt templates and parse fonts in every worker process before its first job
+MOCKUP_WORKER_WARM_UP = os.getenv('MOCKUP_WORKER_WARM_UP', '1').lower() in ('1', 'true', 'yes')
+
+# Per-colour execution: 'serial', 'threads' (in-worker pool) or 'chord' (one subtask per colour)
+MOCKUP_RENDER_MODE = os.getenv('MOCKUP_RENDER_MODE', 'serial')
+MOCKUP_RENDER_THREADS = int(os.getenv('MOCKUP_RENDER_THREADS', 4))
+
+# Output encoding: 'png', 'webp', 'webp_lossless', 'jpeg' or 'avif' (if Pillow supports it).
+# MOCKUP_ENCODER_OPTIONS holds Pillow save() options per format, merged over the defaults.
+MOCKUP_OUTPUT_FORMAT = os.getenv('MOCKUP_OUTPUT_FORMAT', 'png')
+MOCKUP_ENCODER_OPTIONS = {
+    'png': {'compress_level': int(os.getenv('MOCKUP_PNG_COMPRESS_LEVEL', 6))},
+    'webp': {'quality': int(os.getenv('MOCKUP_WEBP_QUALITY', 80))},
+    'jpeg': {'quality': int(os.getenv('MOCKUP_JPEG_QUALITY', 85))},
+}
+
+# Longest-edge sizes of the downscaled derivatives written with every render
+MOCKUP_DERIVATIVE_SIZES = [int(size) for size in os.getenv('MOCKUP_DERIVATIVE_SIZES', '256,512,1024').split(',') if size]
+
+# Maximum number of specs accepted by POST /api/v1/mockups/generate/batch/
+MOCKUP_BATCH_MAX_SIZE = int(os.getenv('MOCKUP_BATCH_MAX_SIZE', 500))
+
+# Task status notifications for long-poll/SSE waiters (mockups.notifications)
+MOCKUP_TASK_NOTIFIER = os.getenv('MOCKUP_TASK_NOTIFIER', 'mockups.notifications.RedisNotifier')
+MOCKUP_NOTIFIER_URL = os.getenv('MOCKUP_NOTIFIER_URL', CELERY_BROKER_URL)
+# Longest a long-poll request (?wait=) or an SSE stream may stay open, in seconds
+MOCKUP_LONG_POLL_MAX_WAIT = int(os.getenv('MOCKUP_LONG_POLL_MAX_WAIT', 30))
+MOCKUP_SSE_MAX_DURATION = int(os.getenv('MOCKUP_SSE_MAX_DURATION', 300))
+
+# Shared by web and worker processes: the worker invalidates cached task statuses
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('CACHE_URL', 'redis://localhost:6379/1'),
+    }
+}
+# How long a finished task's status response stays cached, in seconds
+MOCKUP_STATUS_CACHE_TIMEOUT = int(os.getenv('MOCKUP_STATUS_CACHE_TIMEOUT', 3600))
+# Identical generate requests join the in-flight task for up to this many seconds (0 = off)
+MOCKUP_COALESCE_TIMEOUT = int(os.getenv('MOCKUP_COALESCE_TIMEOUT', 300))
+
+# Admission control for the generate endpoints (mockups.admission): a token
+# bucket per client (tokens per second and bucket size, 0 = off) and a limit on
+# PENDING/STARTED tasks (0 = off). Both answer 429 with Retry-After. Behind a
+# proxy, MOCKUP_RATE_LIMIT_CLIENT_HEADER names the header with the client address.
+MOCKUP_RATE_LIMIT_RATE = float(os.getenv('MOCKUP_RATE_LIMIT_RATE', 2))
+MOCKUP_RATE_LIMIT_BURST = int(os.getenv('MOCKUP_RATE_LIMIT_BURST', 20))
+MOCKUP_RATE_LIMIT_CLIENT_HEADER = os.getenv('MOCKUP_RATE_LIMIT_CLIENT_HEADER') or None
+MOCKUP_MAX_QUEUE_DEPTH = int(os.getenv('MOCKUP_MAX_QUEUE_DEPTH', 1000))
+# The queue depth counter is recounted from the database this often, in seconds
+MOCKUP_QUEUE_DEPTH_RESYNC = int(os.getenv('MOCKUP_QUEUE_DEPTH_RESYNC', 300))
+
+# GET /api/v1/mockups/preview/: default and largest preview width, in pixels
+MOCKUP_PREVIEW_WIDTH = int(os.getenv('MOCKUP_PREVIEW_WIDTH', 512))
+MOCKUP_PREVIEW_MAX_WIDTH = int(os.getenv('MOCKUP_PREVIEW_MAX_WIDTH', 1024))
+# Longest preview text, in characters; previews also spend MOCKUP_RATE_LIMIT_* tokens
+# from a bucket of their own per client
+MOCKUP_PREVIEW_MAX_TEXT_LENGTH = int(os.getenv('MOCKUP_PREVIEW_MAX_TEXT_LENGTH', 100))
+
+# Per-stage timing of generate_mockup_task (mockups.timing): fraction of tasks
+# sampled, 0 turns it off. Sampled tasks log a record on 'mockups.timing' and
+# feed the histograms served at /api/v1/metrics/ (web) and on
+# MOCKUP_METRICS_PORT + pool index in each worker process (0 = no server).
+MOCKUP_TIMING_SAMPLE_RATE = float(os.getenv('MOCKUP_TIMING_SAMPLE_RATE', 0))
+MOCKUP_METRICS_PORT = int(os.getenv('MOCKUP_METRICS_PORT', 0))
+# /api/v1/metrics/ answers staff users and these networks (by REMOTE_ADDR) only,
+# e.g. MOCKUP_METRICS_ALLOWED_NETWORKS=127.0.0.1/32,10.0.0.0/8 for a Prometheus on the private network
+MOCKUP_METRICS_ALLOWED_NETWORKS = [
+    network.strip() for network in os.getenv('MOCKUP_METRICS_ALLOWED_NETWORKS', '127.0.0.1/32,::1/128').split(',')
+    if network.strip()
+]
+
+# Logging: MOCKUP_LOG_FORMAT is 'json' (one object per line) or 'text'.
+# MOCKUP_LOG_LEVELS sets per-module levels, e.g.
+# "mockups.tasks=DEBUG,mockups.notifications=WARNING".
+MOCKUP_LOG_FORMAT = os.getenv('MOCKUP_LOG_FORMAT', 'json')
+MOCKUP_LOG_LEVEL = os.getenv('MOCKUP_LOG_LEVEL', 'INFO')
+MOCKUP_LOG_LEVELS = dict(
+    item.split('=', 1) for item in os.getenv('MOCKUP_LOG_LEVELS', '').split(',') if '=' in item
+)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {
+            '()': 'mockups.log.JsonFormatter',
+        },
+        'text': {
+            '()': 'mockups.log.TextFormatter',
+            'format': '%(asctime)s %(levelname)s %(name)s %(message)s',
+        },
+    },
+    'handlers': {
+        # Records are written by a background thread, never by the logging caller
+        'queue': {
+            '()': 'mockups.log.QueueStreamHandler',
+            'formatter': MOCKUP_LOG_FORMAT,
+        },
+    },
+    'loggers': {
+        'mockups': {
+            'handlers': ['queue'],
+            'level': MOCKUP_LOG_LEVEL,
+            'propagate': False,
+        },
+        'mockup_project': {
+            'handlers': ['queue'],
+            'level': MOCKUP_LOG_LEVEL,
+            'propagate': False,
+        },
+        # Stage timings are only emitted for sampled tasks (MOCKUP_TIMING_SAMPLE_RATE)
+        'mockups.timing': {
+            'level': 'INFO',
+        },
+        **{name: {'level': level.strip().upper()} for name, level in MOCKUP_LOG_LEVELS.items()},
+    },
+}
+
+# Serve the generate and task status endpoints with the async views in
+# mockups.async_views; enable when running under an ASGI server.
+MOCKUP_ASYNC_VIEWS = os.getenv('MOCKUP_ASYNC_VIEWS', '').lower() in ('1', 'true', 'yes')
@@ -0,0 +1,198 @@
+"""
+Admission control for the generate endpoints.
+
+Two checks run before a job is queued, and either one answers 429 with a
+``Retry-After`` header:
+
+* A token bucket per client (``MOCKUP_RATE_LIMIT_RATE`` tokens per second, up
+  to ``MOCKUP_RATE_LIMIT_BURST``). The bucket is a single integer in the
+  cache: the time at which it will be full again (GCRA). Spending a token is
+  one ``cache.incr``, which is atomic in Redis, so concurrent web processes
+  never hand out the same token twice.
+* A global limit on outstanding (PENDING or STARTED) tasks,
+  ``MOCKUP_MAX_QUEUE_DEPTH``. The depth is a cache counter instead of a
+  ``COUNT(*)``. Views :func:`reserve` a slot per queued task, and the task
+  calls :func:`finished` once it reaches SUCCESS or FAILURE. The counter expires
+  after ``MOCKUP_QUEUE_DEPTH_RESYNC`` seconds and is then counted again from
+  the database, which bounds the drift left by crashed workers. Its
+  ``Retry-After`` is the backlog above the limit divided by the recent
+  completion rate.
+
+Clients are identified by ``REMOTE_ADDR``, or the first address of
+``MOCKUP_RATE_LIMIT_CLIENT_HEADER`` (e.g. ``X-Forwarded-For``) behind a
+proxy. Like the status cache this needs a cache shared by every process, and
+cache errors admit the request rather than failing it.
+
+The async variants run the sync functions in one ``sync_to_async`` call.
+Django's async cache methods are thread hops too, one per call, and its
+``aincr`` is a separate get and set, which would break the atomic ``incr``
+both checks rely on.
+"""
+import logging
+import math
+import time
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from .notifications import TERMINAL_STATUSES
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_RATE = float(getattr(settings, 'MOCKUP_RATE_LIMIT_RATE', 2))
+RATE_LIMIT_BURST = getattr(settings, 'MOCKUP_RATE_LIMIT_BURST', 20)
+RATE_LIMIT_CLIENT_HEADER = getattr(settings, 'MOCKUP_RATE_LIMIT_CLIENT_HEADER', None)
+MAX_QUEUE_DEPTH = getattr(settings, 'MOCKUP_MAX_QUEUE_DEPTH', 1000)
+QUEUE_DEPTH_RESYNC = getattr(settings, 'MOCKUP_QUEUE_DEPTH_RESYNC', 300)
+RETRY_AFTER_MAX = getattr(settings, 'MOCKUP_RETRY_AFTER_MAX', 60)
+# Completions are counted per window of this many seconds to estimate the drain rate
+DRAIN_WINDOW = 10
+
+QUEUE_DEPTH_KEY = 'mockups:queue-depth'
+
+
+def client_id(request) -> str:
+    """Address the rate limit applies to."""
+    if RATE_LIMIT_CLIENT_HEADER:
+        forwarded = request.headers.get(RATE_LIMIT_CLIENT_HEADER, '')
+        if forwarded:
+            return forwarded.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _retry_after(seconds) -> int:
+    return max(1, min(RETRY_AFTER_MAX, math.ceil(seconds)))
+
+
+def _bucket_key(client) -> str:
+    return f"mockups:rate:{client}"
+
+
+def _bucket():
+    """``(ms per token, ms the bucket may run ahead of now)``."""
+    interval = max(1, int(1000 / RATE_LIMIT_RATE))
+    return interval, RATE_LIMIT_BURST * interval
+
+
+def take_token(client) -> Optional[int]:
+    """Spend one token of ``client``'s bucket.
+
+    Returns None when the request is admitted, or the seconds until the
+    bucket holds a token again.
+    """
+    if not RATE_LIMIT_RATE or not RATE_LIMIT_BURST:
+        return None
+    key = _bucket_key(client)
+    interval, capacity = _bucket()
+    now = int(time.time() * 1000)
+    try:
+        if cache.add(key, now + interval, interval // 1000 + 1):
+            return None
+        full_at = cache.incr(key, interval)
+        if full_at < now + interval:
+            # The bucket had refilled completely; count from now
+            full_at = cache.incr(key, now + interval - full_at)
+        if full_at - now > capacity:
+            cache.decr(key, interval)
+            return _retry_after((full_at - capacity - now) / 1000)
+        cache.touch(key, (full_at - now) // 1000 + 1)
+        return None
+    except ValueError:
+        # The key expired between add and incr: the bucket is full
+        return None
+    except Exception as e:
+        logger.warning("Rate limiting unavailable for %s: %s", client, e)
+        return None
+
+
+async def atake_token(client) -> Optional[int]:
+    """Async :func:`take_token` for async views."""
+    return await sync_to_async(take_token)(client)
+
+
+def _outstanding_tasks():
+    from .models import GenerationTask
+
+    return GenerationTask.objects.exclude(status__in=TERMINAL_STATUSES)
+
+
+def _completion_keys(now):
+    window = int(now // DRAIN_WINDOW)
+    return [f"mockups:completed:{window}", f"mockups:completed:{window - 1}"]
+
+
+def _drain_retry_after(excess, completions, now) -> int:
+    """Seconds until ``excess`` tasks drained at the rate of the last one to two windows."""
+    rate = sum(completions.values()) / (DRAIN_WINDOW + now % DRAIN_WINDOW)
+    return _retry_after(excess / rate) if rate else RETRY_AFTER_MAX
+
+
+def reserve(count=1) -> Optional[int]:
+    """Count ``count`` new tasks, whose rows already exist, against MOCKUP_MAX_QUEUE_DEPTH.
+
+    Returns None when they fit, or the seconds the caller should wait before
+    retrying; the reservation is then already undone. Call :func:`release`
+    if reserved tasks end up not queued after all.
+    """
+    if not MAX_QUEUE_DEPTH:
+        return None
+    try:
+        try:
+            depth = cache.incr(QUEUE_DEPTH_KEY, count)
+        except ValueError:
+            # No counter (expired or first use): the recount includes the new rows
+            depth = _outstanding_tasks().count()
+            if not cache.add(QUEUE_DEPTH_KEY, depth, QUEUE_DEPTH_RESYNC):
+                depth = cache.incr(QUEUE_DEPTH_KEY, count)
+        if depth <= MAX_QUEUE_DEPTH:
+            return None
+        release(count)
+        now = time.time()
+        return _drain_retry_after(depth - MAX_QUEUE_DEPTH, cache.get_many(_completion_keys(now)), now)
+    except Exception as e:
+        logger.warning("Queue depth check unavailable: %s", e)
+        return None
+
+
+async def areserve(count=1) -> Optional[int]:
+    """Async :func:`reserve` for async views."""
+    return await sync_to_async(reserve)(count)
+
+
+def release(count=1) -> None:
+    """Give back slots of tasks that will not run (or are done)."""
+    try:
+        cache.decr(QUEUE_DEPTH_KEY, count)
+    except ValueError:
+        # No counter: the next reserve() counts the database
+        pass
+    except Exception as e:
+        logger.warning("Could not update the queue depth: %s", e)
+
+
+async def arelease(count=1) -> None:
+    """Async :func:`release` for async views."""
+    await sync_to_async(release)(count)
+
+
+def requeued(count=1) -> None:
+    """Count tasks that became outstanding again, e.g. a finished task that is re-run."""
+    try:
+        cache.incr(QUEUE_DEPTH_KEY, count)
+    except ValueError:
+        pass
+    except Exception as e:
+        logger.warning("Could not update the queue depth: %s", e)
+
+
+def finished(count=1) -> None:
+    """Release the slots of tasks that reached SUCCESS or FAILURE and record their completion."""
+    release(count)
+    key = _completion_keys(time.time())[0]
+    try:
+        if not cache.add(key, count, DRAIN_WINDOW * 3):
+            cache.incr(key, count)
+    except Exception as e:
+        logger.warning("Could not record task completion: %s", e)
@@ -0,0 +1,184 @@
+"""
+Async versions of the generate and task status endpoints for ASGI deployments.
+
+Under ASGI the DRF views in ``views.py`` run through a thread-sensitive
+``sync_to_async`` bridge, and a long-polling request holds that thread while
+it waits. These views are native coroutines instead:
+
+* database access goes through Django's async ORM (``acreate``/``aget``),
+* the Celery publish runs in a worker thread so the broker round trip never
+  blocks the event loop,
+* long-poll waits on an async notifier subscription and holds no thread.
+
+``MOCKUP_ASYNC_VIEWS`` switches ``mockups.urls`` to these views; responses
+match the DRF views. Request bodies go through DRF's configured parsers
+(JSON, form and multipart by default), so the same bodies are accepted and
+the same errors returned.
+"""
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponseNotModified, JsonResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status  # type: ignore[import]
+from rest_framework.exceptions import APIException  # type: ignore[import]
+from rest_framework.request import Request  # type: ignore[import]
+from rest_framework.settings import api_settings  # type: ignore[import]
+
+from . import admission, coalescing, status_cache
+from .models import GenerationTask, GeneratedImage
+from .notifications import TERMINAL_STATUSES, get_notifier
+from .views import (
+    LONG_POLL_MAX_WAIT,
+    _coalesced_response,
+    _coalescing_key,
+    _etag_matches,
+    _fail_unpublished,
+    _generate_signature,
+    _in_flight_task,
+    _parse_generation_spec,
+    _task_payload,
+    _throttled_response,
+)
+
+# thread_sensitive=False: publishes may run in parallel threads instead of
+# queueing behind the single thread that serves sync_to_async ORM calls.
+_publish = sync_to_async(lambda signature: signature.apply_async(), thread_sensitive=False)
+
+
+def _too_many_requests(reason, retry_after):
+    return JsonResponse(
+        _throttled_response(reason, retry_after),
+        status=status.HTTP_429_TOO_MANY_REQUESTS,
+        headers={'Retry-After': str(retry_after)},
+    )
+
+
+def _not_found():
+    return JsonResponse({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+
+async def _aload_task(task_id, request):
+    """``(GenerationTask, payload)`` read with the async ORM; None when the task does not exist."""
+    try:
+        gen_task = await GenerationTask.objects.aget(task_id=task_id)
+    except GenerationTask.DoesNotExist:
+        return None
+    images = []
+    if gen_task.mockup_id:
+        images = [image async for image in GeneratedImage.objects.filter(mockup_id=gen_task.mockup_id)]
+    return gen_task, _task_payload(gen_task, images, request)
+
+
+def _parse_body(request):
+    """``(data, None)`` parsed like ``APIView`` parses ``request.data``, or ``(None, error response)``.
+
+    The ASGI handler has already read the body, so parsing does not block.
+    """
+    drf_request = Request(request, parsers=[parser() for parser in api_settings.DEFAULT_PARSER_CLASSES])
+    try:
+        return drf_request.data, None
+    except APIException as exc:
+        return None, JsonResponse({'detail': exc.detail}, status=exc.status_code)
+
+
+# views._in_flight_task and views._fail_unpublished, each in a single thread hop
+_ain_flight_task = sync_to_async(_in_flight_task)
+_afail_unpublished = sync_to_async(_fail_unpublished)
+
+
+class _AsyncAPIView(View):
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Like DRF's APIView, the API does not use CSRF tokens
+        return csrf_exempt(super().as_view(**initkwargs))
+
+
+class GenerateMockupAsyncView(_AsyncAPIView):
+    async def post(self, request):
+        retry_after = await admission.atake_token(admission.client_id(request))
+        if retry_after:
+            return _too_many_requests('rate limit exceeded', retry_after)
+
+        data, error_response = _parse_body(request)
+        if error_response:
+            return error_response
+        spec, error = _parse_generation_spec(data)
+        if error:
+            return JsonResponse({
+                'error': error
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        task_uuid = uuid.uuid4()
+        await GenerationTask.objects.acreate(task_id=task_uuid, status='PENDING')
+
+        retry_after = await admission.areserve()
+        if retry_after:
+            await GenerationTask.objects.filter(task_id=task_uuid).adelete()
+            return _too_many_requests('generation queue is full', retry_after)
+
+        key = _coalescing_key(spec)
+        in_flight = await _ain_flight_task(key, task_uuid)
+        if in_flight:
+            await admission.arelease()
+            await GenerationTask.objects.filter(task_id=task_uuid).adelete()
+            return JsonResponse(_coalesced_response(*in_flight), status=status.HTTP_202_ACCEPTED)
+
+        try:
+            await _publish(_generate_signature(str(task_uuid), spec))
+        except Exception:
+            await coalescing.arelease(key, task_uuid)
+            await admission.arelease()
+            await _afail_unpublished(task_uuid)
+            raise
+
+        return JsonResponse({
+            'task_id': str(task_uuid),
+            'status': 'PENDING',
+            'message': 'Image generation started'
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class TaskStatusAsyncView(_AsyncAPIView):
+    """Async TaskStatusView: same cache, ETag and ``?wait=``/``?status=`` long-poll behaviour."""
+
+    async def get(self, request, task_id):
+        origin = f"{request.scheme}://{request.get_host()}"
+        cached = await status_cache.aget(task_id)
+        if cached:
+            etag = cached['etag']
+            if _etag_matches(request, etag):
+                return HttpResponseNotModified(headers={'ETag': etag})
+            if origin in cached['payloads']:
+                return JsonResponse(cached['payloads'][origin], headers={'ETag': etag})
+
+        try:
+            wait = min(float(request.GET.get('wait', 0)), LONG_POLL_MAX_WAIT)
+        except ValueError:
+            return JsonResponse({
+                'error': 'wait must be a number of seconds'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if wait > 0:
+            # Subscribe before reading so a change between the read and the wait is not missed
+            async with get_notifier().asubscribe(task_id) as subscription:
+                try:
+                    gen_task = await GenerationTask.objects.aget(task_id=task_id)
+                except GenerationTask.DoesNotExist:
+                    return _not_found()
+                known_status = request.GET.get('status') or gen_task.status
+                if gen_task.status == known_status and gen_task.status not in TERMINAL_STATUSES:
+                    await subscription.wait(wait)
+
+        loaded = await _aload_task(task_id, request)
+        if loaded is None:
+            return _not_found()
+        gen_task, payload = loaded
+        if gen_task.status not in TERMINAL_STATUSES:
+            return JsonResponse(payload)
+        etag = status_cache.make_etag(gen_task)
+        await status_cache.astore(gen_task, origin, payload)
+        if _etag_matches(request, etag):
+            return HttpResponseNotModified(headers={'ETag': etag})
+        return JsonResponse(payload, headers={'ETag': etag})
@@ -0,0 +1,96 @@
+"""
+Shirt colours, fonts and output formats the renderer offers, importable without Pillow.
+
+The web process validates requests and queues jobs by task name, so it only
+needs these definitions. ``mockups.rendering`` and ``mockups.tasks`` (and with
+them Pillow, the templates and the fonts) are only loaded by workers and by
+the preview endpoint. ``mockups.rendering`` re-exports everything here.
+"""
+import functools
+import importlib.util
+import os
+import re
+
+from django.conf import settings
+
+# مسیرهای ثابت
+ASSETS_DIR = os.path.join(settings.BASE_DIR, 'assets')
+SHIRT_DIR = os.path.join(ASSETS_DIR, 'shirts')
+FONT_DIR = os.path.join(ASSETS_DIR, 'fonts')
+
+SHIRT_FILE_MAP = {
+    'white': 'white.png',
+    'black': 'black.png',
+    'blue': 'blu.jpg',
+    'yellow': 'yellow.png',
+}
+
+DEFAULT_SHIRT_COLORS = list(SHIRT_FILE_MAP.keys())
+
+# Text colours requests may ask for: #RGB or #RRGGBB
+TEXT_COLOR_PATTERN = re.compile(r'#(?:[0-9a-fA-F]{3}){1,2}')
+
+# Output encoders: format name -> (Pillow format, file extension, default save() options).
+# MOCKUP_ENCODER_OPTIONS overrides the options per format name.
+OUTPUT_ENCODERS = {
+    'png': ('PNG', 'png', {'compress_level': 6}),
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    # For lossless WebP, quality trades encode effort for size
+    'webp_lossless': ('WEBP', 'webp', {'lossless': True, 'quality': 50, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 85, 'optimize': True}),
+    'avif': ('AVIF', 'avif', {'quality': 70, 'speed': 8}),
+}
+
+OUTPUT_FORMAT = getattr(settings, 'MOCKUP_OUTPUT_FORMAT', 'png')
+
+CONTENT_TYPES = {
+    'PNG': 'image/png',
+    'WEBP': 'image/webp',
+    'JPEG': 'image/jpeg',
+    'AVIF': 'image/avif',
+}
+
+# Pillow only registers these encoders when their optional codec module is built
+_OPTIONAL_CODECS = {
+    'WEBP': 'PIL._webp',
+    'AVIF': 'PIL._avif',
+}
+
+
+@functools.lru_cache(maxsize=None)
+def available_output_formats():
+    """Names from OUTPUT_ENCODERS that this Pillow build can actually encode.
+
+    Looks for the codec modules instead of importing them, which matches
+    ``PIL.Image.SAVE`` without loading Pillow.
+    """
+    return [
+        name for name, (pil_format, _, _) in OUTPUT_ENCODERS.items()
+        if pil_format not in _OPTIONAL_CODECS or importlib.util.find_spec(_OPTIONAL_CODECS[pil_format])
+    ]
+
+
+@functools.lru_cache(maxsize=None)
+def available_fonts():
+    """Font names (``.ttf`` files in FONT_DIR, without the extension) a request may ask for.
+
+    Listed once per process: requests naming anything else are rejected, so
+    user input never reaches a filesystem path.
+    """
+    if not os.path.isdir(FONT_DIR):
+        return frozenset()
+    return frozenset(
+        os.path.splitext(filename)[0]
+        for filename in os.listdir(FONT_DIR)
+        if filename.lower().endswith('.ttf')
+    )
+
+
+def is_shirt_color(value) -> bool:
+    """Whether ``value`` names a shirt template in SHIRT_FILE_MAP (case and surrounding spaces ignored)."""
+    return isinstance(value, str) and value.lower().strip() in SHIRT_FILE_MAP
+
+
+def is_text_color(value) -> bool:
+    """Whether ``value`` is a ``#RGB`` or ``#RRGGBB`` colour."""
+    return isinstance(value, str) and TEXT_COLOR_PATTERN.fullmatch(value) is not None
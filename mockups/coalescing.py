@@ -0,0 +1,103 @@
+"""
+Single-flight coalescing of identical generation requests.
+
+Bursts of identical ``POST /api/v1/mockups/generate/`` bodies should share one
+render. ``GenerateMockupView`` derives :func:`request_key` from the body and
+calls :func:`claim` with its new task id. ``cache.add`` is atomic, so exactly
+one request becomes the leader and queues the job. Every other request gets
+the leader's task id back and queues nothing, for as long as the leader is
+PENDING or STARTED.
+
+A finished (or failed) leader stays in the cache until it expires. The next
+caller replaces it through :func:`take_over`, where another ``cache.add`` on a
+key derived from the stale leader makes sure only one caller queues the new
+job. The entry expires after ``MOCKUP_COALESCE_TIMEOUT`` seconds, which
+bounds how long callers can be attached to a task whose worker died;
+0 turns coalescing off.
+
+Like the status cache, this needs a cache shared by every web process
+(Redis in production, LocMemCache in tests). Cache errors turn coalescing
+off for that request rather than failing it. Async views claim through
+``views._in_flight_task`` in one ``sync_to_async`` call (the task row lookup
+goes with it); :func:`arelease` is the async :func:`release`.
+"""
+import hashlib
+import json
+import logging
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+COALESCE_TIMEOUT = getattr(settings, 'MOCKUP_COALESCE_TIMEOUT', 300)
+
+
+def request_key(text, font_name, text_color, shirt_colors, output_format, lane=None) -> str:
+    """Cache key shared by generation requests that produce the same result.
+
+    The lane is part of it so an interactive request never waits on a bulk job.
+    """
+    payload = json.dumps(
+        [text, font_name or '', (text_color or '').upper(),
+         [str(color).lower().strip() for color in shirt_colors[:4]], output_format, lane],
+        ensure_ascii=False,
+    )
+    return f"mockups:inflight:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+def _successor_key(key, stale_task_id) -> str:
+    return f"{key}:after:{stale_task_id}"
+
+
+def claim(key, task_id) -> Optional[str]:
+    """Register ``task_id`` as the in-flight task for ``key``.
+
+    Returns None when it did (the caller queues the job), or the id of the
+    task that already holds the key.
+    """
+    if not COALESCE_TIMEOUT:
+        return None
+    try:
+        if cache.add(key, str(task_id), COALESCE_TIMEOUT):
+            return None
+        leader = cache.get(key)
+        if leader:
+            return leader
+        # The entry expired between the two calls
+        return None if cache.add(key, str(task_id), COALESCE_TIMEOUT) else cache.get(key)
+    except Exception as e:
+        logger.warning("Request coalescing unavailable for %s: %s", key, e)
+        return None
+
+
+def take_over(key, stale_task_id, task_id) -> Optional[str]:
+    """Replace a finished ``stale_task_id`` with ``task_id`` as the holder of ``key``.
+
+    Of all callers that found the same stale task only one wins and gets
+    None back. The others get the winner's task id.
+    """
+    try:
+        if cache.add(_successor_key(key, stale_task_id), str(task_id), COALESCE_TIMEOUT):
+            cache.set(key, str(task_id), COALESCE_TIMEOUT)
+            return None
+        return cache.get(_successor_key(key, stale_task_id))
+    except Exception as e:
+        logger.warning("Request coalescing unavailable for %s: %s", key, e)
+        return None
+
+
+def release(key, task_id) -> None:
+    """Drop ``key`` if ``task_id`` still holds it, e.g. when queueing its job failed."""
+    try:
+        if cache.get(key) == str(task_id):
+            cache.delete(key)
+    except Exception as e:
+        logger.warning("Could not release coalescing key %s: %s", key, e)
+
+
+async def arelease(key, task_id) -> None:
+    """Async :func:`release` for async views."""
+    await sync_to_async(release)(key, task_id)
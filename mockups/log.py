@@ -0,0 +1,101 @@
+"""
+Logging helpers wired up by ``LOGGING`` in settings.
+
+* :class:`JsonFormatter` writes one JSON object per record, including any
+  ``extra=`` fields (such as the ``timing`` record of mockups.timing).
+* :class:`TextFormatter` is the human-readable variant; extra fields are
+  appended as JSON.
+* :class:`QueueStreamHandler` only puts records on an in-memory queue; a
+  listener thread formats and writes them, so request and worker threads
+  never wait on log I/O and message formatting happens off the hot path.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# Attributes every LogRecord has; anything else came in through ``extra=``
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+def _extra_fields(record: logging.LogRecord) -> dict:
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, process, thread and extras."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        document = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'process': record.process,
+            'thread': record.threadName,
+        }
+        document.update(_extra_fields(record))
+        if record.exc_info:
+            document['exc_info'] = self.formatException(record.exc_info)
+        if record.stack_info:
+            document['stack_info'] = self.formatStack(record.stack_info)
+        return json.dumps(document, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Plain ``format`` string output with any extra fields appended as JSON."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        extra = _extra_fields(record)
+        if not extra:
+            return message
+        return f"{message} {json.dumps(extra, default=str, ensure_ascii=False)}"
+
+
+class QueueStreamHandler(QueueHandler):
+    """Hands records to a background thread that formats and writes them to ``stream``.
+
+    The formatter set on this handler is used by the writer thread. After a
+    fork (Celery prefork children) the first record starts a fresh listener
+    in the child, since the parent's thread does not survive the fork.
+    """
+
+    def __init__(self, stream=None):
+        super().__init__(queue.SimpleQueue())
+        self._target = logging.StreamHandler(stream or sys.stderr)
+        self._listener = None
+        self._pid = None
+        self._start()
+        atexit.register(self.close)
+
+    def _start(self) -> None:
+        self.queue = queue.SimpleQueue()
+        self._listener = QueueListener(self.queue, self._target)
+        self._listener.start()
+        self._pid = os.getpid()
+
+    def setFormatter(self, fmt) -> None:
+        # Formatting happens in the listener thread, on the target handler
+        self._target.setFormatter(fmt)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue never leaves this process, so skip QueueHandler's eager
+        # message formatting; the writer thread formats the record.
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self._pid != os.getpid():
+            self._start()
+        self.queue.put_nowait(record)
+
+    def close(self) -> None:
+        listener, self._listener = self._listener, None
+        if listener is not None and self._pid == os.getpid():
+            listener.stop()
+        self._target.close()
+        super().close()
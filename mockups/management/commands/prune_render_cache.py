@@ -0,0 +1,116 @@
+import re
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from mockups.models import GeneratedImage
+from mockups.storage import get_storage, lock_renders
+from mockups.tasks import RENDER_PREFIX
+
+# Derivatives are stored as "<full-size name without extension>_<width>w.<extension>"
+DERIVATIVE_SUFFIX = re.compile(r'_\d+w(\.[^./]+)$')
+
+# Full-size renders whose locks are held (and references re-read) at once
+LOCK_BATCH_SIZE = 100
+
+
+def _walk(storage, path):
+    """Every file name below ``path`` in ``storage``."""
+    directories, files = storage.listdir(path)
+    for filename in files:
+        yield f"{path}/{filename}"
+    for directory in directories:
+        yield from _walk(storage, f"{path}/{directory}")
+
+
+def _referenced(images=None):
+    """Every file name GeneratedImage rows point at, optionally only rows of the full-size ``images``."""
+    rows = GeneratedImage.objects.all()
+    if images is not None:
+        rows = rows.filter(image__in=images)
+    referenced = set()
+    for name, sizes in rows.values_list('image', 'sizes').iterator():
+        referenced.add(name.replace('\\', '/'))
+        referenced.update(path.replace('\\', '/') for path in (sizes or {}).values())
+    return referenced
+
+
+class Command(BaseCommand):
+    help = "Delete rendered mockup files that no GeneratedImage row references any more."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-age',
+            type=int,
+            default=3600,
+            help="Only delete files older than this many seconds, so renders whose rows "
+                 "are still being written are left alone (default: 3600).",
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="List orphaned files without deleting them.",
+        )
+
+    def handle(self, *args, **options):
+        storage = get_storage()
+        try:
+            names = list(_walk(storage, RENDER_PREFIX))
+        except FileNotFoundError:
+            self.stdout.write(f"Nothing to prune: {RENDER_PREFIX}/ does not exist.")
+            return
+
+        referenced = _referenced()
+        cutoff = timezone.now() - timedelta(seconds=options['min_age'])
+
+        # Candidates grouped by the full-size render whose lock jobs take
+        candidates = defaultdict(dict)
+        for name in names:
+            if name in referenced:
+                continue
+            try:
+                if storage.get_modified_time(name) > cutoff:
+                    continue
+                size = storage.size(name)
+            except OSError:
+                continue
+            candidates[DERIVATIVE_SUFFIX.sub(r'\1', name)][name] = size
+
+        removed = 0
+        freed = 0
+        images = sorted(candidates)
+        for start in range(0, len(images), LOCK_BATCH_SIZE):
+            batch = images[start:start + LOCK_BATCH_SIZE]
+            if options['dry_run']:
+                for image in batch:
+                    for name, size in candidates[image].items():
+                        self.stdout.write(name)
+                        removed += 1
+                        freed += size
+                continue
+
+            # An old orphan may just have been picked up as a cache hit: under the
+            # locks jobs hold until their rows commit, read the references again
+            with lock_renders(batch) as locked:
+                if not locked:
+                    self.stderr.write(f"Skipped {len(batch)} render(s) whose locks are busy.")
+                    continue
+                still_referenced = _referenced(batch)
+                for image in batch:
+                    for name, size in candidates[image].items():
+                        if name in still_referenced:
+                            continue
+                        try:
+                            storage.delete(name)
+                        except Exception as exc:
+                            self.stderr.write(f"Could not remove {name}: {exc}")
+                            continue
+                        removed += 1
+                        freed += size
+
+        verb = "Would remove" if options['dry_run'] else "Removed"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {removed} orphaned file(s), {freed / (1024 * 1024):.1f} MiB."
+        ))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mockups', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generatedimage',
+            name='format',
+            field=models.CharField(default='png', max_length=16),
+        ),
+    ]
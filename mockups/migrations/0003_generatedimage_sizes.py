@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mockups', '0002_generatedimage_format'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generatedimage',
+            name='sizes',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
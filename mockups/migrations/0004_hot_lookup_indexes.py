@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:25
+
+import mockups.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mockups', '0003_generatedimage_sizes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='generatedimage',
+            index=models.Index(fields=['image'], name='generatedimage_image_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='generationtask',
+            index=models.Index(fields=['status', '-updated_at'], name='gentask_status_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mockup',
+            index=models.Index(mockups.models.TextPrefix('text'), name='mockup_text_prefix_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mockup',
+            index=models.Index(fields=['-created_at', '-id'], name='mockup_created_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:48
+
+import mockups.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mockups', '0005_generationtask_batch_id'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='generatedimage',
+            name='image',
+            field=models.ImageField(storage=mockups.storage.get_storage, upload_to='mockups/'),
+        ),
+    ]
@@ -1,6 +1,38 @@
 from django.db import models
 import uuid
 
+from .storage import get_storage
+
+# Length of the indexed text prefix; long slogans still match on the full text
+TEXT_PREFIX_LENGTH = 64
+
+
+class TextPrefix(models.Func):
+    """SUBSTR(text, 1, TEXT_PREFIX_LENGTH) with literal bounds.
+
+    Substr() would send the bounds as query parameters, and the planner only
+    uses an expression index when the query repeats the indexed expression
+    verbatim.
+    """
+    function = 'SUBSTR'
+    template = f"%(function)s(%(expressions)s, 1, {TEXT_PREFIX_LENGTH})"
+    output_field = models.TextField()
+
+
+class MockupQuerySet(models.QuerySet):
+    def with_text(self, text):
+        """Exact text match that can use the text prefix index.
+
+        The prefix lookup runs on its own and the full text is compared in
+        Python: with ``text = %s`` in the same WHERE clause, SQLite's constant
+        propagation rewrites the indexed expression and falls back to a scan.
+        """
+        candidates = self.annotate(
+            text_prefix=TextPrefix('text')
+        ).filter(text_prefix=text[:TEXT_PREFIX_LENGTH]).values_list('pk', 'text')
+        return self.filter(pk__in=[pk for pk, value in candidates if value == text])
+
+
 class Mockup(models.Model):
     text = models.TextField()
     font = models.CharField(max_length=100, blank=True, null=True)
@@ -8,14 +40,32 @@ class Mockup(models.Model):
     shirt_color = models.CharField(max_length=50, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = MockupQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # TEXT has no length limit, so index a prefix rather than the whole value
+            models.Index(TextPrefix('text'), name='mockup_text_prefix_idx'),
+            # MockupListView: newest first, with id as the tie-breaker
+            models.Index(fields=['-created_at', '-id'], name='mockup_created_idx'),
+        ]
+
     def __str__(self):
         return f"Mockup {self.id} - {self.text[:20]}"
 
 class GeneratedImage(models.Model):
     mockup = models.ForeignKey(Mockup, related_name='images', on_delete=models.CASCADE)
-    image = models.ImageField(upload_to='mockups/')
+    image = models.ImageField(upload_to='mockups/', storage=get_storage)
+    format = models.CharField(max_length=16, default='png')  # key of OUTPUT_ENCODERS in mockups.catalog
+    sizes = models.JSONField(default=dict, blank=True)  # {"<width>": "<media path>"}, full size included
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # _remove_mockups checks whether a shared render file is still referenced
+            models.Index(fields=['image'], name='generatedimage_image_idx'),
+        ]
+
 class GenerationTask(models.Model):
     # نگهداری تسک برای query با task_id
     task_id = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
@@ -23,3 +73,11 @@ class GenerationTask(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     mockup = models.ForeignKey(Mockup, null=True, blank=True, on_delete=models.SET_NULL)
+    # Set for tasks queued through the batch endpoint
+    batch_id = models.UUIDField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Status dashboards: tasks in a given state, most recently updated first
+            models.Index(fields=['status', '-updated_at'], name='gentask_status_updated_idx'),
+        ]
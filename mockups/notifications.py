@@ -0,0 +1,246 @@
+"""
+Task status notifications for long-poll and Server-Sent-Events clients.
+
+``generate_mockup_task`` publishes whenever it saves a terminal status, and
+waiting requests block on a subscription instead of polling the database.
+The backend is chosen by ``MOCKUP_TASK_NOTIFIER``:
+
+* ``RedisNotifier`` (default) uses Redis pub/sub on ``MOCKUP_NOTIFIER_URL``.
+* ``InMemoryNotifier`` only reaches waiters in the same process, which is
+  enough for tests, benchmarks and eager Celery.
+
+``subscribe()`` returns a blocking subscription for sync views;
+``asubscribe()`` returns one to use with ``async with`` and ``await wait()``
+in async views, so a waiting request holds no thread.
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Optional
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ('SUCCESS', 'FAILURE')
+
+
+def _channel(task_id) -> str:
+    return f"mockups:task:{task_id}"
+
+
+class InMemoryNotifier:
+    """Process-local notifier built on threading events."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters = {}  # channel -> set of subscriptions
+
+    def publish(self, task_id, status: str) -> None:
+        with self._lock:
+            waiters = list(self._waiters.get(_channel(task_id), ()))
+        for subscription in waiters:
+            subscription._deliver(status)
+
+    def subscribe(self, task_id) -> 'InMemorySubscription':
+        subscription = InMemorySubscription(self, _channel(task_id))
+        with self._lock:
+            self._waiters.setdefault(subscription.channel, set()).add(subscription)
+        return subscription
+
+    def asubscribe(self, task_id) -> 'AsyncInMemorySubscription':
+        subscription = AsyncInMemorySubscription(self, _channel(task_id), asyncio.get_running_loop())
+        with self._lock:
+            self._waiters.setdefault(subscription.channel, set()).add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription) -> None:
+        with self._lock:
+            waiters = self._waiters.get(subscription.channel)
+            if waiters is not None:
+                waiters.discard(subscription)
+                if not waiters:
+                    del self._waiters[subscription.channel]
+
+
+class InMemorySubscription:
+    def __init__(self, notifier: InMemoryNotifier, channel: str):
+        self.channel = channel
+        self._notifier = notifier
+        self._event = threading.Event()
+        self._status = None
+
+    def _deliver(self, status: str) -> None:
+        self._status = status
+        self._event.set()
+
+    def wait(self, timeout: float) -> Optional[str]:
+        """Block until a status is published or ``timeout`` seconds pass; return it or None."""
+        if not self._event.wait(timeout):
+            return None
+        self._event.clear()
+        return self._status
+
+    def close(self) -> None:
+        self._notifier._unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class AsyncInMemorySubscription:
+    """Event-loop side of an InMemoryNotifier subscription; publishers may be in any thread."""
+
+    def __init__(self, notifier: InMemoryNotifier, channel: str, loop: asyncio.AbstractEventLoop):
+        self.channel = channel
+        self._notifier = notifier
+        self._loop = loop
+        self._event = asyncio.Event()
+        self._status = None
+
+    def _deliver(self, status: str) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._set, status)
+        except RuntimeError:
+            # The waiting request's loop is already closed
+            pass
+
+    def _set(self, status: str) -> None:
+        self._status = status
+        self._event.set()
+
+    async def wait(self, timeout: float) -> Optional[str]:
+        """Wait until a status is published or ``timeout`` seconds pass; return it or None."""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self._event.clear()
+        return self._status
+
+    def close(self) -> None:
+        self._notifier._unsubscribe(self)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+
+class RedisNotifier:
+    """Cross-process notifier on Redis pub/sub."""
+
+    def __init__(self, url: Optional[str] = None):
+        import redis  # type: ignore[import]
+
+        self._url = url or settings.MOCKUP_NOTIFIER_URL
+        self._client = redis.Redis.from_url(self._url)
+        self._async_client = None
+
+    def publish(self, task_id, status: str) -> None:
+        self._client.publish(_channel(task_id), status)
+
+    def subscribe(self, task_id) -> 'RedisSubscription':
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(_channel(task_id))
+        return RedisSubscription(pubsub)
+
+    def asubscribe(self, task_id) -> 'AsyncRedisSubscription':
+        if self._async_client is None:
+            import redis.asyncio  # type: ignore[import]
+
+            self._async_client = redis.asyncio.Redis.from_url(self._url)
+        return AsyncRedisSubscription(self._async_client.pubsub(ignore_subscribe_messages=True), _channel(task_id))
+
+
+class RedisSubscription:
+    def __init__(self, pubsub):
+        self._pubsub = pubsub
+
+    def wait(self, timeout: float) -> Optional[str]:
+        """Block until a status is published or ``timeout`` seconds pass; return it or None."""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            # Returns None early for the subscribe confirmation, so keep waiting
+            message = self._pubsub.get_message(timeout=remaining)
+            if message is not None and message['type'] == 'message':
+                data = message['data']
+                return data.decode() if isinstance(data, bytes) else data
+
+    def close(self) -> None:
+        self._pubsub.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class AsyncRedisSubscription:
+    def __init__(self, pubsub, channel: str):
+        self._pubsub = pubsub
+        self._channel = channel
+
+    async def wait(self, timeout: float) -> Optional[str]:
+        """Wait until a status is published or ``timeout`` seconds pass; return it or None."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return None
+            message = await self._pubsub.get_message(timeout=remaining)
+            if message is not None and message['type'] == 'message':
+                data = message['data']
+                return data.decode() if isinstance(data, bytes) else data
+
+    async def __aenter__(self):
+        await self._pubsub.subscribe(self._channel)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._pubsub.aclose()
+
+
+_notifier = None
+_notifier_lock = threading.Lock()
+
+
+def get_notifier():
+    """The process-wide notifier configured by ``MOCKUP_TASK_NOTIFIER``."""
+    global _notifier
+    if _notifier is None:
+        with _notifier_lock:
+            if _notifier is None:
+                path = getattr(settings, 'MOCKUP_TASK_NOTIFIER', 'mockups.notifications.RedisNotifier')
+                _notifier = import_string(path)()
+    return _notifier
+
+
+@receiver(setting_changed)
+def _reset_notifier(setting, **kwargs):
+    # override_settings in tests swaps the backend
+    global _notifier
+    if setting in ('MOCKUP_TASK_NOTIFIER', 'MOCKUP_NOTIFIER_URL'):
+        with _notifier_lock:
+            _notifier = None
+
+
+def notify_status(task_id, status: str) -> None:
+    """Publish a status change; delivery is best effort and never fails the caller."""
+    try:
+        get_notifier().publish(task_id, status)
+    except Exception as e:
+        logger.warning("Task notification failed for %s: %s", task_id, e)
@@ -0,0 +1,13 @@
+from rest_framework.pagination import CursorPagination  # type: ignore[import]
+
+
+class MockupCursorPagination(CursorPagination):
+    """Keyset pagination over (created_at, id), newest first.
+
+    The cursor encodes the last created_at seen, so every page is an indexed
+    range scan instead of an OFFSET over the whole table.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-created_at', '-id')
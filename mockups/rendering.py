@@ -0,0 +1,624 @@
+"""
+Stateless mockup rendering engine.
+
+:class:`MockupRenderer` turns a :class:`RenderSpec` (text, font, colours,
+output width and format) into a composed PIL image or encoded bytes. It
+never touches the database, MEDIA_ROOT or Celery, so the generation task,
+the preview endpoint, benchmarks and scripts all share one hot path that can
+be profiled on its own.
+
+Decoded shirt templates and parsed fonts live in process-wide caches
+(``template_cache`` and ``font_registry``) that renderers share; a renderer
+holds no per-call state.
+"""
+import functools
+import io
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from PIL import Image, ImageChops, ImageDraw, ImageFont
+
+from .catalog import (  # noqa: F401 (re-exported)
+    ASSETS_DIR,
+    DEFAULT_SHIRT_COLORS,
+    FONT_DIR,
+    OUTPUT_ENCODERS,
+    SHIRT_DIR,
+    SHIRT_FILE_MAP,
+    available_fonts,
+    available_output_formats,
+)
+from .timing import NULL_TIMER
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_CACHE_MAX_BYTES = getattr(settings, 'MOCKUP_TEMPLATE_CACHE_MAX_BYTES', 32 * 1024 * 1024)
+FONT_CACHE_MAX_ENTRIES = getattr(settings, 'MOCKUP_FONT_CACHE_MAX_ENTRIES', 64)
+FONT_SIZE_BUCKET = getattr(settings, 'MOCKUP_FONT_SIZE_BUCKET', 1)
+
+# Longest-edge sizes of the downscaled copies written next to every render.
+# Sizes at or above the template size are skipped rather than upscaled.
+DERIVATIVE_SIZES = getattr(settings, 'MOCKUP_DERIVATIVE_SIZES', [256, 512, 1024])
+
+# Bump whenever a change to the drawing code alters output pixels, so the
+# content-addressed render cache stops serving files from the old renderer.
+RENDERER_VERSION = 3
+
+# Text height as a fraction of the shirt template height
+TEXT_SIZE_RATIO = 0.30
+# 3D effect: shadow offset down and to the right, outline radius around the glyphs
+SHADOW_OFFSET = (4, 4)
+OUTLINE_THICKNESS = 3
+
+
+def _resolve_shirt_asset(color: str) -> Optional[str]:
+    """Return the path to the requested shirt color asset, if available.
+
+    Only SHIRT_FILE_MAP names resolve, so a colour never reaches a filesystem path.
+    """
+    filename = SHIRT_FILE_MAP.get((color or '').lower().strip())
+    if filename:
+        candidate = os.path.join(SHIRT_DIR, filename)
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+class ShirtTemplateCache:
+    """Worker-level LRU cache of decoded RGBA shirt templates.
+
+    Entries are invalidated when the asset's mtime changes and evicted in
+    least-recently-used order once ``max_bytes`` of decoded pixels is exceeded.
+    Callers always receive a private copy they are free to draw on.
+    """
+
+    def __init__(self, max_bytes: int = TEMPLATE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # color -> (path, mtime_ns, image, nbytes)
+        self._probes = {}  # color -> (path, mtime_ns, size)
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, color: str) -> Optional[Image.Image]:
+        normalized = (color or '').lower().strip()
+        if not normalized:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(normalized)
+            if entry is not None:
+                path, mtime_ns, image, _ = entry
+                if _file_mtime_ns(path) == mtime_ns:
+                    self._entries.move_to_end(normalized)
+                    self.hits += 1
+                    return image.copy()
+                self._discard(normalized)
+            self.misses += 1
+
+        asset_path = _resolve_shirt_asset(normalized)
+        if asset_path is None:
+            return None
+        mtime_ns = _file_mtime_ns(asset_path)
+        with Image.open(asset_path) as src:
+            image = src.convert("RGBA")
+
+        with self._lock:
+            self._store(normalized, asset_path, mtime_ns, image)
+        return image.copy()
+
+    def probe(self, color: str) -> Optional[Tuple[int, Tuple[int, int]]]:
+        """``(mtime_ns, (width, height))`` of the asset for ``color``, without decoding it.
+
+        Probes are remembered separately from the decoded images (and never
+        evicted), so a worker that only serves render-cache hits pays one
+        stat() per colour.
+        """
+        normalized = (color or '').lower().strip()
+        with self._lock:
+            known = self._probes.get(normalized)
+        if known is not None:
+            path, mtime_ns, size = known
+            if _file_mtime_ns(path) == mtime_ns:
+                return mtime_ns, size
+
+        asset_path = _resolve_shirt_asset(normalized)
+        mtime_ns = _file_mtime_ns(asset_path) if asset_path else None
+        if mtime_ns is None:
+            return None
+        with Image.open(asset_path) as src:
+            size = src.size
+        with self._lock:
+            self._probes[normalized] = (asset_path, mtime_ns, size)
+        return mtime_ns, size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._probes.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+    def _store(self, key, path, mtime_ns, image) -> None:
+        nbytes = image.width * image.height * len(image.getbands())
+        if mtime_ns is None or nbytes > self.max_bytes:
+            return
+        self._discard(key)
+        self._entries[key] = (path, mtime_ns, image, nbytes)
+        self.current_bytes += nbytes
+        while self.current_bytes > self.max_bytes:
+            _, (_, _, _, evicted_bytes) = self._entries.popitem(last=False)
+            self.current_bytes -= evicted_bytes
+            self.evictions += 1
+
+    def _discard(self, key) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry[3]
+
+
+def _file_mtime_ns(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+template_cache = ShirtTemplateCache()
+
+
+def encoder_options(output_format: str) -> dict:
+    _, _, defaults = OUTPUT_ENCODERS[output_format]
+    overrides = getattr(settings, 'MOCKUP_ENCODER_OPTIONS', {}).get(output_format, {})
+    return {**defaults, **overrides}
+
+
+def encode(image, fp, output_format: str) -> None:
+    """Save ``image`` to a path or file object with the configured encoder for ``output_format``."""
+    pil_format, _, _ = OUTPUT_ENCODERS[output_format]
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    image.save(fp, pil_format, **encoder_options(output_format))
+
+
+def derivative_dimensions(template_size: Tuple[int, int]):
+    """``(width, height)`` of each derivative for a template, smallest first."""
+    img_w, img_h = template_size
+    longest = max(img_w, img_h)
+    return [
+        (max(1, round(img_w * size / longest)), max(1, round(img_h * size / longest)))
+        for size in sorted(set(DERIVATIVE_SIZES))
+        if size < longest
+    ]
+
+
+def _darken_color(color_hex: str, factor: float = 0.4) -> str:
+    """Darken a hex color by a factor (0.0 = black, 1.0 = original)."""
+    try:
+        color_hex = color_hex.strip().lstrip('#')
+        if len(color_hex) == 3:
+            color_hex = ''.join([c*2 for c in color_hex])
+        r = int(color_hex[0:2], 16)
+        g = int(color_hex[2:4], 16)
+        b = int(color_hex[4:6], 16)
+        r = max(0, min(255, int(r * factor)))
+        g = max(0, min(255, int(g * factor)))
+        b = max(0, min(255, int(b * factor)))
+        return f"#{r:02x}{g:02x}{b:02x}"
+    except:
+        return '#000000'
+
+
+def determine_text_and_outline(shirt_color: str, requested_text_color: Optional[str]) -> Tuple[str, str, str]:
+    """Determine optimal text, shadow, and outline colors for readability.
+    Returns: (text_color, shadow_color, outline_color)
+    """
+    normalized = (shirt_color or '').lower()
+
+    color = (requested_text_color or '').strip()
+    if not color:
+        color = '#000000'
+
+    # For blue shirts - use bright white text if user didn't specify, otherwise use their color
+    if normalized == 'blue':
+        if color.upper() == '#000000':
+            color = '#FFFFFF'  # Default to white on blue
+        shadow_color = _darken_color(color, 0.3)  # Dark shadow
+        outline_color = '#000000'  # Black outline for contrast
+    
+    # For yellow/orange shirts - use black text if user didn't specify, otherwise use their color
+    elif normalized == 'yellow':
+        if color.upper() == '#FFFFFF' or color.upper() == '#FFF':
+            color = '#000000'  # Default to black on yellow
+        shadow_color = _darken_color(color, 0.5)  # Darker shadow
+        outline_color = '#000000'  # Black outline for contrast
+    
+    # For dark shirts (black), use white text if user didn't specify
+    elif normalized == 'black':
+        if color.upper() == '#000000':
+            color = '#FFFFFF'
+        shadow_color = _darken_color(color, 0.3)
+        outline_color = '#000000' if color.upper() == '#FFFFFF' else '#FFFFFF'
+    
+    # For light shirts (white), use black text if user didn't specify
+    elif normalized == 'white':
+        if color.upper() == '#FFFFFF' or color.upper() == '#FFF':
+            color = '#000000'
+        shadow_color = _darken_color(color, 0.5)
+        outline_color = '#FFFFFF' if color.upper() == '#000000' else '#000000'
+    
+    # Default: use requested color with appropriate shadow and outline
+    else:
+        shadow_color = _darken_color(color, 0.4)
+        if color.upper() == '#FFFFFF' or color.upper() == '#FFF':
+            outline_color = '#000000'
+        else:
+            outline_color = '#000000'  # Black outline works on most backgrounds
+    
+    return color, shadow_color, outline_color
+
+
+class FontRegistry:
+    """Bounded LRU of parsed fonts keyed by (font name, size bucket).
+
+    Only names from ``catalog.available_fonts()`` are loaded from ``FONT_DIR``;
+    any other name gets the default font under the default font's key, so
+    arbitrary names neither grow the registry nor reach the filesystem.
+    """
+
+    def __init__(self, max_entries: int = FONT_CACHE_MAX_ENTRIES, size_bucket: int = FONT_SIZE_BUCKET):
+        self.max_entries = max_entries
+        self.size_bucket = max(1, int(size_bucket))
+        self._fonts = OrderedDict()  # (font name, size) -> (font, nbytes)
+        self._default = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def bucket(self, size: int) -> int:
+        """Round ``size`` to the nearest bucket so near-identical sizes share one font."""
+        size = max(1, int(size))
+        return max(self.size_bucket, int(round(size / self.size_bucket)) * self.size_bucket)
+
+    def get(self, font_name: Optional[str] = None, size: int = 48):
+        if font_name not in available_fonts():
+            font_name = None
+        key = (font_name or '', self.bucket(size))
+        with self._lock:
+            entry = self._fonts.get(key)
+            if entry is not None:
+                self._fonts.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        font, nbytes = self._load(font_name, key[1])
+        with self._lock:
+            self._fonts[key] = (font, nbytes)
+            self._fonts.move_to_end(key)
+            while len(self._fonts) > self.max_entries:
+                self._fonts.popitem(last=False)
+        return font
+
+    def scalable(self, font_name: Optional[str], size: int) -> bool:
+        """Whether ``font_name`` renders at ``size``; the default font has one fixed size."""
+        return getattr(self.get(font_name, size), 'size', None) == self.bucket(size)
+
+    def preload(self, sizes) -> int:
+        """Parse every ``.ttf`` in ``FONT_DIR`` at each of ``sizes``; return the number of fonts found."""
+        names = sorted(available_fonts())
+        for name in names:
+            for size in sizes:
+                self.get(name, size)
+        return len(names)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._fonts.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._fonts),
+                'max_entries': self.max_entries,
+                # FreeType keeps the font file in memory per face, so file size is a close estimate
+                'bytes': sum(nbytes for _, nbytes in self._fonts.values()),
+            }
+
+    def _load(self, font_name: Optional[str], size: int):
+        if font_name:
+            font_path = os.path.join(FONT_DIR, f"{font_name}.ttf")
+            try:
+                return ImageFont.truetype(font_path, size=size), os.path.getsize(font_path)
+            except Exception as e:
+                logger.warning("Font load failed for %s: %s", font_path, e)
+        if self._default is None:
+            self._default = ImageFont.load_default()
+        return self._default, 0
+
+
+font_registry = FontRegistry()
+
+
+def _font_size_for(img_h: int) -> int:
+    return int(img_h * TEXT_SIZE_RATIO)
+
+
+def template_font_sizes():
+    """Font sizes the bundled shirt templates render at, read from image headers only."""
+    sizes = set()
+    for color in SHIRT_FILE_MAP:
+        asset_path = _resolve_shirt_asset(color)
+        if asset_path is None:
+            continue
+        with Image.open(asset_path) as src:
+            sizes.add(_font_size_for(src.height))
+    return sorted(sizes)
+
+
+def warm_up() -> dict:
+    """Decode every bundled shirt template and parse the bundled fonts at the sizes they render at.
+
+    Called before a worker process takes its first job (see
+    mockup_project.celery), so that job does not pay for the cold caches.
+    """
+    started = time.perf_counter()
+    Image.init()  # Registers every encoder plugin up front
+    templates = 0
+    for color in SHIRT_FILE_MAP:
+        if template_cache.probe(color) is not None and template_cache.get(color) is not None:
+            templates += 1
+    fonts = font_registry.preload(template_font_sizes())
+    return {'templates': templates, 'fonts': fonts, 'seconds': time.perf_counter() - started}
+
+
+class TextMasks(NamedTuple):
+    """Coverage masks for one laid-out text block, independent of colour."""
+    glyphs: Image.Image
+    outline: Image.Image
+    origin: Tuple[int, int]  # shirt coordinates of the masks' top-left corner
+
+
+def _scaled_effects(scale: float) -> Tuple[int, Tuple[int, int]]:
+    """Outline thickness and shadow offset for a shirt drawn at ``scale`` times template size."""
+    if scale == 1.0:
+        return OUTLINE_THICKNESS, SHADOW_OFFSET
+    return (
+        max(1, round(OUTLINE_THICKNESS * scale)),
+        (max(1, round(SHADOW_OFFSET[0] * scale)), max(1, round(SHADOW_OFFSET[1] * scale))),
+    )
+
+
+def _outline_mask(glyphs: Image.Image, thickness: int) -> Image.Image:
+    """Coverage of the glyphs stamped at every offset up to ``thickness`` in x and y.
+
+    Each stamp at coverage ``a`` lets ``1 - a`` of what is below show through,
+    so the stack covers ``1 - prod(1 - a)``: the alpha the old loop of one
+    ``draw.text`` per offset built up. The product is separable, one pass of
+    shifts per axis. ``glyphs`` needs ``thickness`` blank pixels on each side,
+    as ImageChops.offset wraps around.
+    """
+    clear = ImageChops.invert(glyphs)
+    columns = clear
+    for offset in range(-thickness, thickness + 1):
+        if offset:
+            columns = ImageChops.multiply(columns, ImageChops.offset(clear, 0, offset))
+    stack = columns
+    for offset in range(-thickness, thickness + 1):
+        if offset:
+            stack = ImageChops.multiply(stack, ImageChops.offset(columns, offset, 0))
+    return ImageChops.invert(stack)
+
+
+def _rasterize_text(size: Tuple[int, int], text: str, font, scale: float = 1.0) -> Optional[TextMasks]:
+    """Lay ``text`` out on a shirt of ``size`` and rasterize its fill and outline masks.
+
+    The glyphs are rasterized once; the outline stacks that mask at every
+    offset (:func:`_outline_mask`) and the shadow reuses it at an offset.
+    The result only depends on (text, font, size), so one job can colour it
+    for every shirt with :func:`_composite_text`. ``scale`` shrinks the
+    outline for shirts drawn below template size (previews).
+    """
+    img_w, img_h = size
+    thickness, shadow_offset = _scaled_effects(scale)
+    # Rasterize onto a padded canvas so glyphs just outside the shirt still
+    # contribute their outline and shadow.
+    pad = thickness + max(shadow_offset)
+    canvas_size = (img_w + 2 * pad, img_h + 2 * pad)
+
+    glyphs = Image.new('L', canvas_size, 0)
+    draw = ImageDraw.Draw(glyphs)
+    bbox = draw.textbbox((0, 0), text, font=font)
+    text_w = bbox[2] - bbox[0]
+    text_h = bbox[3] - bbox[1]
+
+    # Center horizontally, but position higher (at 35% from top instead of 50%)
+    x = (img_w - text_w) / 2
+    y = img_h * 0.35 - text_h / 2
+    origin = (x + pad, y + pad)
+
+    draw.text(origin, text, font=font, fill=255)
+    box = glyphs.getbbox()
+    if box is None:
+        return None
+    # Grow the box by the outline; the canvas padding keeps it inside
+    box = (box[0] - thickness, box[1] - thickness, box[2] + thickness, box[3] + thickness)
+    glyphs = glyphs.crop(box)
+    return TextMasks(glyphs, _outline_mask(glyphs, thickness), (box[0] - pad, box[1] - pad))
+
+
+def _composite_text(base, masks: TextMasks, fill, shadow_color, outline_color, scale: float = 1.0) -> None:
+    """Paint the shadow, outline and fill of ``masks`` onto ``base`` with three mask pastes.
+
+    This replaces one ``draw.text`` per shadow, outline offset and fill
+    (50 rasterizations); over the text region every channel stays within a
+    few levels of that loop.
+    """
+    left, top = masks.origin
+    shadow_x, shadow_y = _scaled_effects(scale)[1]
+    base.paste(shadow_color, (left + shadow_x, top + shadow_y), masks.glyphs)
+    base.paste(outline_color, (left, top), masks.outline)
+    base.paste(fill, (left, top), masks.glyphs)
+
+
+class TextLayers:
+    """Text masks for one text and font, rasterized once per shirt size and shared by its colours.
+
+    Pass one instance to every :meth:`MockupRenderer.render` call of a job so
+    all colours reuse the same rasterization. Threads that miss the same size
+    at once each rasterize it without a lock (Pillow drops the GIL while
+    drawing) and the first result is kept.
+    """
+
+    def __init__(self, text: str, font_name: Optional[str], fonts: Optional['FontRegistry'] = None):
+        self.text = text
+        self.font_name = font_name
+        self._fonts = fonts or font_registry
+        self._masks = {}
+
+    def get(self, size: Tuple[int, int], scale: float = 1.0, timer=NULL_TIMER) -> Optional[TextMasks]:
+        key = (size, scale)
+        if key in self._masks:
+            return self._masks[key]
+        with timer.span('font_load'):
+            # Double the font size to 30% of image height for much better visibility
+            font = self._fonts.get(self.font_name, size=_font_size_for(size[1]))
+        with timer.span('text_rasterize'):
+            masks = _rasterize_text(size, self.text, font, scale)
+        return self._masks.setdefault(key, masks)
+
+
+@functools.lru_cache(maxsize=32)
+def _scaled_template(templates: ShirtTemplateCache, color: str, template_mtime_ns: int,
+                     width: int) -> Optional[Image.Image]:
+    """A shirt template downscaled to ``width``; the mtime in the key drops stale entries."""
+    base = templates.get(color)
+    if base is None:
+        return None
+    height = max(1, round(base.height * width / base.width))
+    return base.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+
+class RenderSpec(NamedTuple):
+    """Everything that determines one rendered shirt."""
+    text: str
+    shirt_color: str
+    font_name: Optional[str] = None
+    text_color: str = '#000000'
+    width: Optional[int] = None  # None renders at template size
+    output_format: str = 'png'
+
+
+class MockupRenderer:
+    """Render specs to images or encoded bytes; no database, files or Celery involved.
+
+    The renderer itself is stateless. ``templates`` and ``fonts`` default to
+    the process-wide caches and can be swapped for isolated ones in benchmarks.
+    """
+
+    def __init__(self, templates: Optional[ShirtTemplateCache] = None, fonts: Optional[FontRegistry] = None):
+        self.templates = templates or template_cache
+        self.fonts = fonts or font_registry
+
+    def template_info(self, color: str) -> Optional[Tuple[int, Tuple[int, int]]]:
+        """``(mtime_ns, (width, height))`` of the template for ``color`` without decoding it, or None."""
+        return self.templates.probe(color)
+
+    def text_layers(self, text: str, font_name: Optional[str] = None) -> TextLayers:
+        return TextLayers(text, font_name, self.fonts)
+
+    def render(self, spec: RenderSpec, text_layers: Optional[TextLayers] = None,
+               timer=NULL_TIMER) -> Optional[Image.Image]:
+        """Compose ``spec`` into a new RGB image, or None when there is no template for its colour.
+
+        With ``spec.width`` below the template width the shirt is drawn
+        downscaled, with the outline and shadow scaled to match, so the result
+        looks like a resized full render. Fonts that only come in one size
+        (the default font) are composed at template size and then resized.
+        ``timer`` (see mockups.timing) receives the template, font, text and
+        composite stages.
+        """
+        with timer.span('template_decode'):
+            probe = self.templates.probe(spec.shirt_color)
+            if probe is None:
+                return None
+            template_mtime, (template_w, template_h) = probe
+
+        if spec.width and spec.width < template_w and not self.fonts.scalable(
+                spec.font_name, _font_size_for(template_h)):
+            # A fixed-size font would cover more of a smaller shirt than of the
+            # full render, so downscale the full composition instead
+            image = self.render(spec._replace(width=None), text_layers, timer)
+            if image is None:
+                return None
+            with timer.span('composite'):
+                height = max(1, round(image.height * spec.width / image.width))
+                return image.resize((spec.width, height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+        with timer.span('template_decode'):
+            if spec.width and spec.width < template_w:
+                scaled = _scaled_template(self.templates, spec.shirt_color, template_mtime, spec.width)
+                base = scaled.copy() if scaled is not None else None
+            else:
+                base = self.templates.get(spec.shirt_color)
+        if base is None:
+            return None
+        scale = base.width / template_w
+
+        if text_layers is None:
+            text_layers = self.text_layers(spec.text, spec.font_name)
+        masks = text_layers.get(base.size, scale, timer)
+        with timer.span('composite'):
+            render_text_color, shadow_color, outline_color = determine_text_and_outline(
+                spec.shirt_color, spec.text_color
+            )
+            if masks is not None:
+                _composite_text(base, masks, render_text_color, shadow_color, outline_color, scale)
+            return base.convert("RGB")
+
+    def derivatives(self, image: Image.Image) -> List[Image.Image]:
+        """Downscaled copies of ``image`` at DERIVATIVE_SIZES, largest first."""
+        outputs = []
+        source = image
+        for dimensions in reversed(derivative_dimensions(image.size)):
+            # Downscale from the previous (larger) derivative, which is cheaper than from full size
+            source = source.resize(dimensions, Image.Resampling.LANCZOS, reducing_gap=3.0)
+            outputs.append(source)
+        return outputs
+
+    def encode(self, image: Image.Image, output_format: str = 'png') -> bytes:
+        buffer = io.BytesIO()
+        encode(image, buffer, output_format)
+        return buffer.getvalue()
+
+    def render_bytes(self, spec: RenderSpec, text_layers: Optional[TextLayers] = None,
+                     timer=NULL_TIMER) -> Optional[bytes]:
+        """:meth:`render` and encode in ``spec.output_format``; None when there is no template."""
+        image = self.render(spec, text_layers, timer)
+        if image is None:
+            return None
+        with timer.span('encode'):
+            return self.encode(image, spec.output_format)
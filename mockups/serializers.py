@@ -1,36 +1,79 @@
 from rest_framework import serializers
 from .models import Mockup, GeneratedImage, GenerationTask
 
+
+def _absolute_url(request, url):
+    if request:
+        return request.build_absolute_uri(url)
+    return url
+
+
+def _size_urls(image, request):
+    """``{width: url}`` for every stored size of a GeneratedImage, smallest first."""
+    sizes = image.sizes or {}
+    return {
+        width: _absolute_url(request, image.image.storage.url(path))
+        for width, path in sorted(sizes.items(), key=lambda item: int(item[0]))
+    }
+
+
+def _srcset(size_urls):
+    return ", ".join(f"{url} {width}w" for width, url in size_urls.items())
+
+
 class GeneratedImageSerializer(serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    sizes = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = GeneratedImage
-        fields = ['image_url', 'created_at']
+        fields = ['image_url', 'format', 'sizes', 'srcset', 'created_at']
 
     def get_image_url(self, obj):
-        request = self.context.get('request')
-        if request:
-            return request.build_absolute_uri(obj.image.url)
-        return obj.image.url
+        return _absolute_url(self.context.get('request'), obj.image.url)
+
+    def get_sizes(self, obj):
+        return _size_urls(obj, self.context.get('request'))
+
+    def get_srcset(self, obj):
+        return _srcset(_size_urls(obj, self.context.get('request')))
 
 class MockupSerializer(serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    sizes = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = Mockup
-        fields = ['id', 'text', 'image_url', 'font', 'text_color', 'shirt_color', 'created_at']
+        fields = ['id', 'text', 'image_url', 'sizes', 'srcset', 'font', 'text_color', 'shirt_color', 'created_at']
+
+    def _first_image(self, obj):
+        # Return the first image for the mockup (as per spec). images.first()
+        # bypasses prefetch_related, so read the prefetched list when there is one.
+        prefetched = getattr(obj, '_prefetched_objects_cache', {})
+        if 'images' in prefetched:
+            images = prefetched['images']
+            return min(images, key=lambda image: image.pk) if images else None
+        if not hasattr(obj, '_first_image'):
+            obj._first_image = obj.images.first()
+        return obj._first_image
 
     def get_image_url(self, obj):
-        # Return the first image URL for the mockup (as per spec)
-        first_image = obj.images.first()
+        first_image = self._first_image(obj)
         if first_image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(first_image.image.url)
-            return first_image.image.url
+            return _absolute_url(self.context.get('request'), first_image.image.url)
         return None
 
+    def get_sizes(self, obj):
+        first_image = self._first_image(obj)
+        if first_image:
+            return _size_urls(first_image, self.context.get('request'))
+        return {}
+
+    def get_srcset(self, obj):
+        return _srcset(self.get_sizes(obj))
+
 class GenerationTaskSerializer(serializers.ModelSerializer):
     class Meta:
         model = GenerationTask
@@ -0,0 +1,103 @@
+"""
+Cached status responses for finished generation tasks.
+
+Once a task is SUCCESS or FAILURE its status payload only changes if the task
+is re-run, so ``TaskStatusView`` keeps it in the Django cache under the task
+id together with an ETag. Polling clients then get the payload (or a 304 for a
+matching ``If-None-Match``) without a database query. ``generate_mockup_task``
+calls :func:`invalidate` once it starts or finishes a task, or removes a
+mockup a task points at. A view can read a row just before such a change
+commits, so :func:`store` never replaces a newer entry and drops its own
+write again when the row changed in the meantime.
+
+The cache must be shared by the web and worker processes for invalidation to
+reach the web process, so production settings point ``CACHES`` at Redis.
+Cache errors are treated as misses and never fail the request. The async
+variants run the sync functions in one ``sync_to_async`` call, like
+``mockups.admission``.
+"""
+import logging
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+STATUS_CACHE_TIMEOUT = getattr(settings, 'MOCKUP_STATUS_CACHE_TIMEOUT', 3600)
+
+
+def _cache_key(task_id) -> str:
+    return f"mockups:task-status:{task_id}"
+
+
+def _version(updated_at) -> int:
+    return int(updated_at.timestamp() * 1_000_000)
+
+
+def make_etag(gen_task) -> str:
+    """Strong ETag for a task's current state; changes on every status save."""
+    return f'"{gen_task.task_id}-{gen_task.status}-{_version(gen_task.updated_at)}"'
+
+
+def _current_version(task_id):
+    from .models import GenerationTask
+
+    return GenerationTask.objects.filter(task_id=task_id).values_list('updated_at', flat=True)
+
+
+def get(task_id) -> Optional[dict]:
+    """``{'etag': ..., 'payloads': {origin: payload}}`` for a cached task, or None."""
+    try:
+        return cache.get(_cache_key(task_id))
+    except Exception as e:
+        logger.warning("Status cache read failed for %s: %s", task_id, e)
+        return None
+
+
+def store(gen_task, origin: str, payload: dict) -> None:
+    """Remember the terminal payload of ``gen_task`` as rendered for ``origin`` (scheme and host).
+
+    Payloads hold absolute URLs, so one entry keeps a copy per origin that
+    asked for it; all of them share the task's ETag. An entry for a newer
+    state of the task is left alone. Once written, the row is read again (one
+    query, only when the cache is filled) and the entry dropped if the task
+    changed after ``gen_task`` was read: that change may have committed and
+    invalidated before this write.
+    """
+    key = _cache_key(gen_task.task_id)
+    etag, version = make_etag(gen_task), _version(gen_task.updated_at)
+    try:
+        entry = cache.get(key)
+        if entry and entry.get('version', 0) > version:
+            return
+        if not entry or entry.get('etag') != etag:
+            entry = {'etag': etag, 'version': version, 'payloads': {}}
+        entry['payloads'][origin] = payload
+        cache.set(key, entry, STATUS_CACHE_TIMEOUT)
+        current = _current_version(gen_task.task_id).first()
+        if current is None or _version(current) != version:
+            cache.delete(key)
+    except Exception as e:
+        logger.warning("Status cache write failed for %s: %s", gen_task.task_id, e)
+
+
+async def aget(task_id) -> Optional[dict]:
+    """Async :func:`get` for async views."""
+    return await sync_to_async(get)(task_id)
+
+
+async def astore(gen_task, origin: str, payload: dict) -> None:
+    """Async :func:`store` for async views."""
+    await sync_to_async(store)(gen_task, origin, payload)
+
+
+def invalidate(*task_ids) -> None:
+    """Drop the cached status of the given tasks."""
+    if not task_ids:
+        return
+    try:
+        cache.delete_many([_cache_key(task_id) for task_id in task_ids])
+    except Exception as e:
+        logger.warning("Status cache invalidation failed for %s: %s", task_ids, e)
@@ -0,0 +1,220 @@
+"""
+Storage of rendered mockup files.
+
+Every render write and delete goes through the Django storage named by
+``MOCKUP_STORAGE`` (an alias in ``STORAGES``, ``default`` when unset), so
+workers on several nodes can share one network volume or object store:
+point the alias at django-storages' S3 backend, for example.
+
+* :func:`save` streams an encoded render from an in-memory buffer into the
+  storage; :func:`submit` does the same on a process-wide pool of
+  ``MOCKUP_STORAGE_UPLOAD_CONCURRENCY`` threads, so the uploads of one job
+  overlap without a burst of jobs opening unbounded connections.
+* :func:`lock_renders` serializes the jobs that record rows for shared,
+  content-addressed render files against the jobs that delete those files
+  once nothing references them. The locks live in the Django cache, which is
+  shared by every worker like the status cache.
+* :class:`InMemoryObjectStorage` is an S3-like stand-in (flat keys, atomic
+  puts, overwrites, optional per-request latency) for tests and benchmarks.
+"""
+import io
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Optional
+from urllib.parse import quote, urljoin
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, Storage, storages
+from django.utils.deconstruct import deconstructible
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_CONCURRENCY = getattr(settings, 'MOCKUP_STORAGE_UPLOAD_CONCURRENCY', 4)
+# Longest a render lock is held (it expires after that) and waited for, in seconds
+RENDER_LOCK_TIMEOUT = getattr(settings, 'MOCKUP_RENDER_LOCK_TIMEOUT', 60)
+
+
+def get_storage() -> Storage:
+    """The storage backend of rendered mockups (``STORAGES[MOCKUP_STORAGE]``)."""
+    return storages[getattr(settings, 'MOCKUP_STORAGE', 'default')]
+
+
+def save(storage: Storage, name: str, content: io.BytesIO) -> str:
+    """Store ``content`` under exactly ``name`` and return it.
+
+    Render names are content-addressed, so when a concurrent identical render
+    got there first (backends that do not overwrite pick another name) the
+    duplicate is dropped and the existing file kept. On a FileSystemStorage
+    the file is written under a private temporary name and renamed into place,
+    so ``exists(name)`` never sees a partly written file; object stores
+    publish a put all at once.
+    """
+    content.seek(0)
+    if isinstance(storage, FileSystemStorage):
+        path = storage.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            with open(tmp_path, 'wb') as fp:
+                shutil.copyfileobj(content, fp)
+            if storage.file_permissions_mode is not None:
+                os.chmod(tmp_path, storage.file_permissions_mode)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        return name
+    saved = storage.save(name, File(content, name=os.path.basename(name)))
+    if saved != name:
+        storage.delete(saved)
+    return name
+
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+
+
+def _upload_pool() -> ThreadPoolExecutor:
+    global _pool, _pool_pid
+    # A pool inherited through fork has no threads, so each process starts its own
+    if _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool_pid != os.getpid():
+                _pool = ThreadPoolExecutor(max_workers=UPLOAD_CONCURRENCY, thread_name_prefix='mockup-upload')
+                _pool_pid = os.getpid()
+    return _pool
+
+
+def submit(storage: Storage, name: str, content: io.BytesIO) -> Future:
+    """:func:`save` on the shared upload pool."""
+    return _upload_pool().submit(save, storage, name, content)
+
+
+def _acquire(key, token, deadline) -> bool:
+    while not cache.add(key, token, RENDER_LOCK_TIMEOUT):
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@contextmanager
+def lock_renders(names):
+    """Hold the locks of the render files ``names`` (full-size names) for the ``with`` block.
+
+    Yields True once every lock is held. After RENDER_LOCK_TIMEOUT seconds of
+    waiting, or when the cache is unavailable, it yields False without them.
+    Locks are taken in sorted order, so two holders cannot deadlock.
+    """
+    names = sorted(set(names))
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + RENDER_LOCK_TIMEOUT
+    held = []
+    try:
+        for name in names:
+            key = f"mockups:render-lock:{name}"
+            if not _acquire(key, token, deadline):
+                logger.warning("Timed out waiting for the render lock of %s", name)
+                break
+            held.append(key)
+    except Exception as e:
+        logger.warning("Render locks unavailable: %s", e)
+    try:
+        yield len(held) == len(names)
+    finally:
+        for key in held:
+            try:
+                if cache.get(key) == token:
+                    cache.delete(key)
+            except Exception as e:
+                logger.warning("Could not release render lock %s: %s", key, e)
+
+
+@deconstructible(path='mockups.storage.InMemoryObjectStorage')
+class InMemoryObjectStorage(Storage):
+    """Process-local object store with S3 semantics, for offline tests and benchmarks.
+
+    Keys are flat (directories only exist as key prefixes), a put replaces the
+    whole object at once and saving over an existing key overwrites it.
+    ``latency`` adds a sleep per request to stand in for the network round trip.
+    """
+
+    def __init__(self, base_url: Optional[str] = None, latency: float = 0.0):
+        self.base_url = base_url or settings.MEDIA_URL
+        self.latency = latency
+        self._objects = {}
+        self._lock = threading.Lock()
+
+    def _round_trip(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _object(self, name):
+        with self._lock:
+            try:
+                return self._objects[name]
+            except KeyError:
+                raise FileNotFoundError(name) from None
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        body = b''.join(content.chunks())
+        self._round_trip()
+        with self._lock:
+            self._objects[name] = (body, datetime.now(timezone.utc))
+        return name
+
+    def _open(self, name, mode='rb'):
+        self._round_trip()
+        body, _ = self._object(name)
+        return ContentFile(body, name=name)
+
+    def delete(self, name):
+        self._round_trip()
+        with self._lock:
+            self._objects.pop(name, None)
+
+    def exists(self, name):
+        self._round_trip()
+        with self._lock:
+            return name in self._objects
+
+    def listdir(self, path):
+        prefix = f"{path.rstrip('/')}/" if path else ''
+        directories, files = set(), []
+        with self._lock:
+            names = list(self._objects)
+        for name in names:
+            if not name.startswith(prefix):
+                continue
+            head, sep, _ = name[len(prefix):].partition('/')
+            if sep:
+                directories.add(head)
+            else:
+                files.append(head)
+        return sorted(directories), sorted(files)
+
+    def size(self, name):
+        return len(self._object(name)[0])
+
+    def get_modified_time(self, name):
+        return self._object(name)[1]
+
+    def url(self, name):
+        return urljoin(self.base_url, quote(name))
@@ -1,36 +1,62 @@
-
-import os
+import io
+import json
 import uuid
-import traceback
+import time
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import Optional, Tuple
 from django.conf import settings
-from PIL import Image, ImageDraw, ImageFont
+from django.db import transaction
+from django.utils import timezone
+
+from .catalog import OUTPUT_FORMAT
+from .notifications import TERMINAL_STATUSES, notify_status
+from .timing import NULL_TIMER, start_metrics_server, start_timer
+from .rendering import (
+    DEFAULT_SHIRT_COLORS,
+    DERIVATIVE_SIZES,
+    OUTPUT_ENCODERS,
+    RENDERER_VERSION,
+    MockupRenderer,
+    RenderSpec,
+    TextLayers,
+    available_output_formats,
+    derivative_dimensions,
+    determine_text_and_outline,
+    encoder_options,
+)
+from . import admission, status_cache
+from .storage import get_storage, lock_renders, save, submit
 
 try:
-    from celery import shared_task  # type: ignore[import]
+    from celery import chord, group, shared_task  # type: ignore[import]
+    from celery.signals import task_failure, worker_process_init  # type: ignore[import]
 except ImportError:  # pragma: no cover
+    chord = group = task_failure = worker_process_init = None
+
     def shared_task(*args, **kwargs):  # type: ignore[misc]
         def decorator(func):
             return func
 
         return decorator
 
-# مسیرهای ثابت
-ASSETS_DIR = os.path.join(settings.BASE_DIR, 'assets')
-SHIRT_DIR = os.path.join(ASSETS_DIR, 'shirts')
-FONT_DIR = os.path.join(ASSETS_DIR, 'fonts')
-MEDIA_MOCKUP_DIR = os.path.join(settings.MEDIA_ROOT, 'mockups')
+logger = logging.getLogger(__name__)
 
-SHIRT_FILE_MAP = {
-    'white': 'white.png',
-    'black': 'black.png',
-    'blue': 'blu.jpg',
-    'yellow': 'yellow.png',
-}
+# مسیرهای ثابت: renders live under this prefix of the mockup storage
+RENDER_PREFIX = 'mockups'
 
-DEFAULT_SHIRT_COLORS = list(SHIRT_FILE_MAP.keys())
+# How the colours of one job are rendered: 'serial' (one after another),
+# 'threads' (a pool inside the worker) or 'chord' (one Celery subtask each)
+RENDER_MODES = ('serial', 'threads', 'chord')
+RENDER_MODE = getattr(settings, 'MOCKUP_RENDER_MODE', 'serial')
+RENDER_THREADS = getattr(settings, 'MOCKUP_RENDER_THREADS', 4)
 
-print("=== TASKS MODULE IMPORTED ===")
+renderer = MockupRenderer()
+
+# Base port for the per-process Prometheus scrape endpoint of worker processes (0 = off)
+METRICS_PORT = getattr(settings, 'MOCKUP_METRICS_PORT', 0)
 
 
 def _coerce_uuid(value: str) -> Optional[uuid.UUID]:
@@ -40,238 +66,445 @@ def _coerce_uuid(value: str) -> Optional[uuid.UUID]:
         return None
 
 
-def _resolve_shirt_asset(color: str) -> Optional[str]:
-    """Return the path to the requested shirt color asset, if available."""
-    normalized = (color or '').lower().strip()
-    if not normalized:
-        return None
-
-    filename = SHIRT_FILE_MAP.get(normalized)
-    if filename:
-        candidate = os.path.join(SHIRT_DIR, filename)
-        if os.path.exists(candidate):
-            return candidate
-
-    # Fallback: direct filename match with any extension
-    for ext in ('.png', '.jpg', '.jpeg'):
-        candidate = os.path.join(SHIRT_DIR, f"{normalized}{ext}")
-        if os.path.exists(candidate):
-            return candidate
+def _delete_renders(renders, timer=NULL_TIMER) -> None:
+    """Delete the files of ``renders`` (``{full-size name: [names]}``) that no GeneratedImage references.
 
-    return None
+    The references are checked under the render locks, which jobs hold from
+    checking their files until their rows are committed (see
+    :func:`_verified_renders`), so a file is never deleted under a new row.
+    """
+    from .models import GeneratedImage
 
+    if not renders:
+        return
+    storage = get_storage()
+    with timer.span('file_delete'), lock_renders(renders) as locked:
+        if not locked:
+            # Left for prune_render_cache rather than risking a file a new row uses
+            logger.warning("Not deleting %d renders without their locks", len(renders))
+            return
+        still_referenced = set(
+            GeneratedImage.objects.filter(image__in=list(renders)).values_list('image', flat=True)
+        )
+        for image, names in renders.items():
+            if image in still_referenced:
+                continue
+            for name in names:
+                try:
+                    storage.delete(name)
+                except Exception:
+                    logger.exception("Could not delete render %s", name)
 
-def _prepare_shirt_image(color: str) -> Optional[Image.Image]:
-    asset_path = _resolve_shirt_asset(color)
-    if asset_path is None:
-        print(f"No asset found for color '{color}' in {SHIRT_DIR}")
-        return None
 
-    with Image.open(asset_path).convert("RGBA") as src:
-        return src.copy()
+def _remove_mockups(mockup_ids) -> None:
+    """Delete mockups, their images and the render files no other image uses.
 
+    The rows go in one transaction with queryset-level deletes. Files are
+    removed and cached statuses invalidated only once it commits, so a
+    rollback never leaves rows pointing at deleted files.
+    """
+    from .models import GeneratedImage, GenerationTask, Mockup
 
-def _remove_mockup(mockup) -> None:
-    if not mockup:
+    mockup_ids = list(mockup_ids)
+    if not mockup_ids:
         return
 
+    timer = start_timer('remove_mockup', mockups=len(mockup_ids))
     try:
-        images = list(mockup.images.all())
-        for generated in images:
-            try:
-                generated.image.delete(save=False)
-            except Exception:
-                image_path = getattr(generated.image, 'path', None)
-                if image_path and os.path.exists(image_path):
-                    try:
-                        os.remove(image_path)
-                    except OSError:
-                        traceback.print_exc()
-            generated.delete()
-        mockup.delete()
+        with transaction.atomic(), timer.span('orm'):
+            tasks = GenerationTask.objects.filter(mockup__in=mockup_ids)
+            task_ids = list(tasks.values_list('task_id', flat=True))
+            # Tasks pointing at these mockups lose their results: a new
+            # updated_at gives them a new ETag
+            tasks.update(mockup=None, updated_at=timezone.now())
+            images = dict(GeneratedImage.objects.filter(mockup__in=mockup_ids).values_list('image', 'sizes'))
+            Mockup.objects.filter(pk__in=mockup_ids).delete()
+            # Render outputs are content-addressed and may back other mockups
+            # too; _delete_renders keeps the ones still referenced. The
+            # full-size render goes first: while it exists, _render_color
+            # trusts the whole set to be there.
+            renders = {
+                image: [image] + sorted(set((sizes or {}).values()) - {image})
+                for image, sizes in images.items()
+            }
+
+            def after_commit():
+                with timer.span('status_cache'):
+                    status_cache.invalidate(*task_ids)
+                _delete_renders(renders, timer)
+                timer.finish(images=len(renders))
+
+            transaction.on_commit(after_commit)
     except Exception:
-        traceback.print_exc()
+        logger.exception("Could not remove mockups %s", mockup_ids)
 
 
-def _darken_color(color_hex: str, factor: float = 0.4) -> str:
-    """Darken a hex color by a factor (0.0 = black, 1.0 = original)."""
-    try:
-        color_hex = color_hex.strip().lstrip('#')
-        if len(color_hex) == 3:
-            color_hex = ''.join([c*2 for c in color_hex])
-        r = int(color_hex[0:2], 16)
-        g = int(color_hex[2:4], 16)
-        b = int(color_hex[4:6], 16)
-        r = max(0, min(255, int(r * factor)))
-        g = max(0, min(255, int(g * factor)))
-        b = max(0, min(255, int(b * factor)))
-        return f"#{r:02x}{g:02x}{b:02x}"
-    except:
-        return '#000000'
-
-
-def _determine_text_and_outline(shirt_color: str, requested_text_color: Optional[str]) -> Tuple[str, str, str]:
-    """Determine optimal text, shadow, and outline colors for readability.
-    Returns: (text_color, shadow_color, outline_color)
-    """
-    normalized = (shirt_color or '').lower()
-
-    color = (requested_text_color or '').strip()
-    if not color:
-        color = '#000000'
-
-    # For blue shirts - use bright white text if user didn't specify, otherwise use their color
-    if normalized == 'blue':
-        if color.upper() == '#000000':
-            color = '#FFFFFF'  # Default to white on blue
-        shadow_color = _darken_color(color, 0.3)  # Dark shadow
-        outline_color = '#000000'  # Black outline for contrast
-    
-    # For yellow/orange shirts - use black text if user didn't specify, otherwise use their color
-    elif normalized == 'yellow':
-        if color.upper() == '#FFFFFF' or color.upper() == '#FFF':
-            color = '#000000'  # Default to black on yellow
-        shadow_color = _darken_color(color, 0.5)  # Darker shadow
-        outline_color = '#000000'  # Black outline for contrast
-    
-    # For dark shirts (black), use white text if user didn't specify
-    elif normalized == 'black':
-        if color.upper() == '#000000':
-            color = '#FFFFFF'
-        shadow_color = _darken_color(color, 0.3)
-        outline_color = '#000000' if color.upper() == '#FFFFFF' else '#FFFFFF'
-    
-    # For light shirts (white), use black text if user didn't specify
-    elif normalized == 'white':
-        if color.upper() == '#FFFFFF' or color.upper() == '#FFF':
-            color = '#000000'
-        shadow_color = _darken_color(color, 0.5)
-        outline_color = '#FFFFFF' if color.upper() == '#000000' else '#000000'
-    
-    # Default: use requested color with appropriate shadow and outline
-    else:
-        shadow_color = _darken_color(color, 0.4)
-        if color.upper() == '#FFFFFF' or color.upper() == '#FFF':
-            outline_color = '#000000'
-        else:
-            outline_color = '#000000'  # Black outline works on most backgrounds
-    
-    return color, shadow_color, outline_color
+def _render_key(text, font_name, text_color, shirt_color, template_mtime_ns, output_format='png') -> str:
+    """Deterministic hash of everything that determines a rendered shirt's bytes."""
+    payload = json.dumps(
+        [RENDERER_VERSION, text, font_name or '', (text_color or '').upper(),
+         (shirt_color or '').lower().strip(), template_mtime_ns,
+         output_format, encoder_options(output_format), sorted(DERIVATIVE_SIZES)],
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
 
 
-def _get_font(font_name=None, size=48):
-    """بارگذاری فونت امن"""
+def _render_path(render_key: str, output_format: str = 'png', width: Optional[int] = None) -> str:
+    """Storage name of a render (or of its ``width`` derivative), fanned out by key prefix."""
+    _, extension, _ = OUTPUT_ENCODERS[output_format]
+    suffix = f"_{width}w" if width else ''
+    return f"{RENDER_PREFIX}/{render_key[:2]}/{render_key}{suffix}.{extension}"
+
+
+if worker_process_init is not None:
+    @worker_process_init.connect
+    def _serve_metrics(**kwargs):
+        # Each prefork child serves its own histograms on MOCKUP_METRICS_PORT + its pool index
+        if METRICS_PORT:
+            from billiard.process import current_process  # type: ignore[import]
+            start_metrics_server(METRICS_PORT + (getattr(current_process(), 'index', None) or 0))
+
+
+def _render_color(text, font_name, text_color, color, text_layers: TextLayers,
+                  output_format: str = 'png', timer=NULL_TIMER, force=False) -> Optional[Tuple[str, dict]]:
+    """Render one shirt colour into the render cache.
+
+    Returns the storage name of the full-size render and a ``{width: name}``
+    map of every size written (derivatives plus the full render), or None
+    when the colour could not be rendered. ``force`` renders and writes even
+    when the full-size render already exists.
+    """
+    storage = get_storage()
+    with timer.span('cache_lookup'):
+        probe = renderer.template_info(color)
+        if probe is None:
+            logger.warning("No base asset available for color %r, skipping.", color)
+            return None
+        template_mtime, template_size = probe
+
+        # Identical requests against an unchanged template map to the same
+        # files, so a hit only needs a new row pointing at them.
+        render_key = _render_key(text, font_name, text_color, color, template_mtime, output_format)
+        rel_path = _render_path(render_key, output_format)
+        sizes = {
+            str(width): _render_path(render_key, output_format, width)
+            for width, _ in derivative_dimensions(template_size)
+        }
+        sizes[str(template_size[0])] = rel_path
+        if not force and storage.exists(rel_path):
+            return rel_path, sizes
+
+    composed = renderer.render(
+        RenderSpec(text, color, font_name, text_color, output_format=output_format), text_layers, timer
+    )
+    if composed is None:
+        logger.warning("No base asset available for color %r, skipping.", color)
+        return None
+
+    # ذخیره امن فایل: each output is encoded into memory and streamed to the
+    # storage on the upload pool while the next one encodes. The full-size
+    # render is stored last, once every derivative is in place, so its
+    # presence means the whole set is complete for concurrent identical renders.
+    with timer.span('derivatives'):
+        derivatives = [
+            (derivative, _render_path(render_key, output_format, derivative.width))
+            for derivative in renderer.derivatives(composed)
+        ]
+
+    def encoded(image):
+        with timer.span('encode'):
+            return io.BytesIO(renderer.encode(image, output_format))
+
+    uploads = []
     try:
-        if font_name:
-            font_path = os.path.join(FONT_DIR, f"{font_name}.ttf")
-            if os.path.exists(font_path):
-                return ImageFont.truetype(font_path, size=size)
-    except Exception as e:
-        print("Font load failed:", e)
-    return ImageFont.load_default()
+        for image, name in derivatives:
+            uploads.append((name, submit(storage, name, encoded(image))))
+        name = rel_path
+        content = encoded(composed)
+        with timer.span('storage_write'):
+            for name, upload in uploads:
+                upload.result()
+            name = rel_path
+            save(storage, name, content)
+    except Exception:
+        logger.exception("Failed to store %s", name)
+        return None
+    return rel_path, sizes
+
+
+def _verified_renders(renders, rerender, timer=NULL_TIMER):
+    """``renders`` with every render that lost one of its files rendered again.
+
+    Call it holding :func:`lock_renders` on the renders and keep holding it
+    until their rows are committed: a concurrent :func:`_remove_mockups` may
+    have deleted files this job found (or wrote) before the lock was taken.
+    ``rerender(index)`` renders ``renders[index]`` again with ``force=True``.
+    """
+    storage = get_storage()
+    verified = []
+    with timer.span('cache_lookup'):
+        missing = [
+            render is not None and not all(storage.exists(name) for name in render[1].values())
+            for render in renders
+        ]
+    for index, render in enumerate(renders):
+        if missing[index]:
+            logger.info("Render %s was deleted while in use, rendering it again", render[0])
+            render = rerender(index)
+        verified.append(render)
+    return verified
+
+
+def _record_images(mockup, renders, output_format='png'):
+    """Insert the GeneratedImage rows of ``renders`` in one query; returns their result payloads."""
+    from .models import GeneratedImage
+
+    storage = get_storage()
+    # ایجاد رکورد مدل
+    images = GeneratedImage.objects.bulk_create(
+        GeneratedImage(mockup=mockup, image=rel_path, format=output_format, sizes=sizes)
+        for rel_path, sizes in filter(None, renders)
+    )
+    return [
+        {
+            'image_url': storage.url(gen_img.image.name),
+            'format': gen_img.format,
+            'sizes': {width: storage.url(path) for width, path in gen_img.sizes.items()},
+            'created_at': gen_img.created_at.isoformat(),
+        }
+        for gen_img in images
+    ]
+
+
+def _set_task_status(task_record, status, mockup=None) -> None:
+    if not task_record:
+        return
+    was_outstanding = task_record.status not in TERMINAL_STATUSES
+    task_record.status = status
+    update_fields = ['status', 'updated_at']
+    if mockup is not None:
+        task_record.mockup = mockup
+        update_fields.append('mockup')
+    task_record.save(update_fields=update_fields)
+    if status in TERMINAL_STATUSES:
+        # A re-run may have left a status cached between its start and this save
+        transaction.on_commit(partial(status_cache.invalidate, task_record.task_id))
+        # Wake long-poll and SSE clients waiting on this task, once they can read the new state
+        transaction.on_commit(partial(notify_status, task_record.task_id, status))
+        if was_outstanding:
+            transaction.on_commit(admission.finished)
 
 
 @shared_task(bind=True)
-def generate_mockup_task(self, generation_task_id, text, font_name=None, text_color="#000000", shirt_colors=None):
-    from .models import Mockup, GeneratedImage, GenerationTask
+def generate_mockup_task(self, generation_task_id, text, font_name=None, text_color="#000000", shirt_colors=None,
+                         render_mode=None, output_format=None, lane=None):
+    from .models import Mockup, GenerationTask
 
-    print(f"=== GENERATE MOCKUP STARTED for task {generation_task_id} ===")
+    logger.debug("Generating mockup for task %s", generation_task_id)
+    started_at = time.time()
+    timer = start_timer('generate_mockup_task', task_id=str(generation_task_id), lane=lane)
 
-    task_record = None
     task_uuid = _coerce_uuid(generation_task_id)
+    # Checked before the task is STARTED and its previous mockup removed, so a
+    # bad kwarg or MOCKUP_RENDER_MODE / MOCKUP_OUTPUT_FORMAT fails it right away
+    mode = render_mode or RENDER_MODE
+    output_format = output_format or OUTPUT_FORMAT
+    error = None
+    if mode not in RENDER_MODES:
+        error = f"Unknown render mode {mode!r}; expected one of {RENDER_MODES}"
+    elif output_format not in available_output_formats():
+        error = f"Unknown output format {output_format!r}; expected one of {available_output_formats()}"
+    if error:
+        logger.error("Mockup generation failed for task %s: %s", generation_task_id, error)
+        if task_uuid:
+            _set_task_status(GenerationTask.objects.filter(task_id=task_uuid).first(), 'FAILURE')
+        timer.finish(status='FAILURE')
+        raise ValueError(error)
+
+    task_record = None
     if task_uuid:
-        task_record, _ = GenerationTask.objects.get_or_create(task_id=task_uuid)
-        if task_record.mockup_id:
-            _remove_mockup(task_record.mockup)
-            task_record.mockup = None
-        task_record.status = 'STARTED'
-        task_record.save(update_fields=['status', 'mockup', 'updated_at'])
+        with transaction.atomic():
+            with timer.span('orm'):
+                task_record, created = GenerationTask.objects.get_or_create(task_id=task_uuid)
+            # Re-runs and tasks queued without a view were not counted by admission.reserve()
+            requeued = created or task_record.status in TERMINAL_STATUSES
+            if task_record.mockup_id:
+                with timer.span('remove_previous'):
+                    _remove_mockups([task_record.mockup_id])
+                task_record.mockup = None
+            with timer.span('orm'):
+                task_record.status = 'STARTED'
+                task_record.save(update_fields=['status', 'mockup', 'updated_at'])
+        with timer.span('notify'):
+            # A re-run task may have a cached terminal status (e.g. an earlier FAILURE)
+            status_cache.invalidate(task_uuid)
+            notify_status(task_uuid, 'STARTED')
+        if requeued:
+            admission.requeued()
     else:
-        for previous in Mockup.objects.filter(text=text):
-            _remove_mockup(previous)
+        with timer.span('remove_previous'):
+            _remove_mockups(Mockup.objects.with_text(text).values_list('pk', flat=True))
 
     # Default colors
     if shirt_colors is None:
         shirt_colors = DEFAULT_SHIRT_COLORS
-
-    # ایجاد دایرکتوری امن
-    os.makedirs(MEDIA_MOCKUP_DIR, exist_ok=True)
+    colors = list(shirt_colors[:4])  # حداکثر 4 رنگ
 
     # ایجاد رکورد Mockup
-    render_text_color, _, _ = _determine_text_and_outline(shirt_colors[0] if shirt_colors else 'white', text_color)
-
-    mockup = Mockup.objects.create(
+    render_text_color, _, _ = determine_text_and_outline(shirt_colors[0] if shirt_colors else 'white', text_color)
+    new_mockup = partial(
+        Mockup.objects.create,
         text=text,
         font=font_name,
         text_color=render_text_color,
         shirt_color=",".join(shirt_colors) if shirt_colors else ""
     )
 
-    results = []
+    if mode == 'chord' and chord is not None and colors:
+        with timer.span('orm'):
+            mockup = new_mockup()
+        # Each colour renders in its own subtask; the chord body records the
+        # images and marks the GenerationTask once all of them are done. The
+        # subtasks carry the lane so they are routed to the same queue.
+        record_id = str(task_uuid) if task_uuid else None
+        header = group(
+            render_mockup_color_task.s(text, font_name, text_color, color, output_format, lane=lane)
+            for color in colors
+        )
+        body = finalize_mockup_task.s(
+            record_id, mockup.id, started_at, output_format, lane=lane,
+            text=text, font_name=font_name, text_color=text_color, colors=colors,
+        )
+        workflow = chord(header, body).on_error(mark_generation_failed.s(record_id))
+        with timer.span('dispatch'):
+            workflow_id = workflow.apply_async().id
+        timer.finish(mode=mode, colors=len(colors), output_format=output_format)
+        return workflow_id
+
+    # Text masks only depend on the template size (which fixes the font size),
+    # so every colour in this job shares one rasterization per template size.
+    text_layers = renderer.text_layers(text, font_name)
     try:
-        for color in shirt_colors[:4]:  # حداکثر 4 رنگ
-            base = _prepare_shirt_image(color)
-            if base is None:
-                print(f"No base asset available for color '{color}', skipping.")
-                continue
-
-            draw = ImageDraw.Draw(base)
-            img_w, img_h = base.size
-
-            # Double the font size to 30% of image height for much better visibility
-            font = _get_font(font_name, size=int(img_h * 0.30))
-            bbox = draw.textbbox((0, 0), text, font=font)
-            text_w = bbox[2] - bbox[0]
-            text_h = bbox[3] - bbox[1]
-
-            # Center horizontally, but position higher (at 35% from top instead of 50%)
-            x = (img_w - text_w) / 2
-            y = img_h * 0.35 - text_h / 2
-
-            render_text_color, shadow_color, outline_color = _determine_text_and_outline(color, text_color)
-            
-            # Create 3D shadow effect: draw shadow offset down and to the right
-            shadow_offset_x = 4
-            shadow_offset_y = 4
-            draw.text((x + shadow_offset_x, y + shadow_offset_y), text, font=font, fill=shadow_color)
-            
-            # Draw thick outline around the main text for definition
-            outline_thickness = 3
-            for ox in range(-outline_thickness, outline_thickness + 1):
-                for oy in range(-outline_thickness, outline_thickness + 1):
-                    if ox != 0 or oy != 0:  # Skip the center position
-                        draw.text((x+ox, y+oy), text, font=font, fill=outline_color)
-            
-            # Draw main text on top for the 3D raised effect
-            draw.text((x, y), text, font=font, fill=render_text_color)
-
-            # ذخیره امن فایل
-            out_name = f"mockup_{mockup.id}{color}{uuid.uuid4().hex[:8]}.png"
-            out_path = os.path.join(MEDIA_MOCKUP_DIR, out_name)
-            try:
-                base.convert("RGB").save(out_path, "PNG")
-            except PermissionError:
-                print(f"Permission denied saving {out_path}, skipping.")
-                continue
-            except Exception as e:
-                print(f"Failed to save {out_path}: {e}")
-                continue
-
-            # ایجاد رکورد مدل
-            rel_path = os.path.join('mockups', out_name)
-            gen_img = GeneratedImage.objects.create(mockup=mockup, image=rel_path)
-            results.append({'image_url': gen_img.image.url, 'created_at': gen_img.created_at.isoformat()})
+        if mode == 'threads' and len(colors) > 1:
+            # Pillow releases the GIL while filtering and encoding, so colours overlap
+            with ThreadPoolExecutor(max_workers=min(RENDER_THREADS, len(colors))) as pool:
+                renders = list(pool.map(
+                    lambda color: _render_color(text, font_name, text_color, color, text_layers, output_format, timer),
+                    colors,
+                ))
+        else:
+            renders = [
+                _render_color(text, font_name, text_color, color, text_layers, output_format, timer)
+                for color in colors
+            ]
+
+        def rerender(index):
+            return _render_color(text, font_name, text_color, colors[index], text_layers, output_format, timer,
+                                 force=True)
+
+        with lock_renders(render[0] for render in renders if render):
+            renders = _verified_renders(renders, rerender, timer)
+            # All rows of the job in one transaction: mockup, images and status
+            with transaction.atomic(), timer.span('orm'):
+                mockup = new_mockup()
+                results = _record_images(mockup, renders, output_format)
+                _set_task_status(task_record, 'SUCCESS', mockup)
     except Exception as exc:
-        traceback.print_exc()
-        if task_record:
-            task_record.status = 'FAILURE'
-            task_record.save(update_fields=['status', 'updated_at'])
+        logger.exception("Mockup generation failed for task %s", generation_task_id)
+        _set_task_status(task_record, 'FAILURE')
+        timer.finish(mode=mode, colors=len(colors), output_format=output_format, status='FAILURE')
         raise exc
-    else:
-        if task_record:
-            task_record.mockup = mockup
-            task_record.status = 'SUCCESS'
-            task_record.save(update_fields=['status', 'mockup', 'updated_at'])
 
-    print(f"=== GENERATE MOCKUP FINISHED for task {generation_task_id} ===")
-    return results
\ No newline at end of file
+    timer.finish(mode=mode, colors=len(colors), output_format=output_format, status='SUCCESS')
+    logger.info("Generated mockup for task %s in %.3fs (%s)", generation_task_id, time.time() - started_at, mode)
+    return results
+
+
+@shared_task
+def render_mockup_color_task(text, font_name, text_color, color, output_format='png', lane=None):
+    """Chord member: render a single shirt colour and return its paths (or None).
+
+    ``lane`` only routes the task (mockup_project.celery.route_by_lane).
+    """
+    timer = start_timer('render_mockup_color_task', color=color)
+    render = _render_color(
+        text, font_name, text_color, color, renderer.text_layers(text, font_name), output_format, timer
+    )
+    timer.finish(output_format=output_format)
+    return render
+
+
+@shared_task
+def finalize_mockup_task(renders, generation_task_id, mockup_id, started_at, output_format='png', lane=None,
+                         text=None, font_name=None, text_color=None, colors=None):
+    """Chord body: record the rendered colours and mark the GenerationTask SUCCESS.
+
+    ``text``, ``font_name``, ``text_color`` and ``colors`` let it render a
+    colour again whose files were deleted in the meantime; without them that
+    colour is left out.
+    """
+    from .models import Mockup, GenerationTask
+
+    timer = start_timer('finalize_mockup_task', task_id=str(generation_task_id))
+    with timer.span('orm'):
+        mockup = Mockup.objects.filter(pk=mockup_id).first()
+    if mockup is None:
+        # The task was re-run and this mockup replaced while the colours rendered
+        return []
+
+    def rerender(index):
+        if colors is None:
+            return None
+        return _render_color(text, font_name, text_color, colors[index],
+                             renderer.text_layers(text, font_name), output_format, timer, force=True)
+
+    with lock_renders(render[0] for render in renders if render):
+        renders = _verified_renders(renders, rerender, timer)
+        with transaction.atomic(), timer.span('orm'):
+            results = _record_images(mockup, renders, output_format)
+
+            task_uuid = _coerce_uuid(generation_task_id)
+            if task_uuid:
+                _set_task_status(GenerationTask.objects.filter(task_id=task_uuid).first(), 'SUCCESS', mockup)
+    timer.finish(images=len(results))
+
+    logger.info("Generated mockup for task %s in %.3fs (chord)", generation_task_id, time.time() - started_at)
+    return results
+
+
+def _fail_generation(generation_task_id) -> None:
+    """Mark a GenerationTask FAILURE unless it already reached a terminal status."""
+    from .models import GenerationTask
+
+    task_uuid = _coerce_uuid(generation_task_id)
+    if task_uuid:
+        failed = (
+            GenerationTask.objects.filter(task_id=task_uuid).exclude(status__in=TERMINAL_STATUSES)
+            .update(status='FAILURE', updated_at=timezone.now())
+        )
+        if failed:
+            admission.finished(failed)
+            status_cache.invalidate(task_uuid)
+        notify_status(task_uuid, 'FAILURE')
+
+
+@shared_task
+def mark_generation_failed(request, exc, tb, generation_task_id):
+    """Chord error callback: mark the GenerationTask FAILURE when any colour raised."""
+    logger.error("Render chord failed for task %s: %r", generation_task_id, exc)
+    _fail_generation(generation_task_id)
+
+
+if task_failure is not None:
+    @task_failure.connect
+    def _fail_lost_generation(sender=None, task_id=None, exception=None, args=None, **kwargs):
+        # A job whose worker died or hit the hard time limit never reaches its
+        # own except block and is not redelivered; the pool reports it here.
+        from billiard.exceptions import TimeLimitExceeded, WorkerLostError  # type: ignore[import]
+
+        lost = isinstance(exception, (TimeLimitExceeded, WorkerLostError))
+        if lost and getattr(sender, 'name', None) == 'mockups.tasks.generate_mockup_task' and args:
+            logger.error("Mockup generation lost for task %s: %r", args[0], exception)
+            _fail_generation(args[0])
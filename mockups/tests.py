@@ -1,12 +1,533 @@
-import sys
-import os
+"""
+Tests for the mockups app.
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mockup_project.settings")
+    python manage.py test mockups
 
-import django
-django.setup()
+They run offline: MockupTestCase swaps Redis for LocMemCache and the
+in-memory notifier, and writes renders under a temporary MEDIA_ROOT. Tasks
+run in-process with ``apply()``, and publishing is mocked where a view queues one.
+"""
+import io
+import json
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from unittest import mock
 
-from mockups.tasks import generate_mockup_task
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 
-generate_mockup_task.delay("task_id_example", "Hello World")
\ No newline at end of file
+from . import admission, coalescing
+from .models import GeneratedImage, GenerationTask, Mockup
+from .notifications import InMemorySubscription
+from .storage import InMemoryObjectStorage, get_storage
+from .rendering import DEFAULT_SHIRT_COLORS
+from .tasks import _remove_mockups, _set_task_status, generate_mockup_task
+from .views import PREVIEW_MAX_TEXT_LENGTH
+
+GENERATE_URL = '/api/v1/mockups/generate/'
+PREVIEW_URL = '/api/v1/mockups/preview/'
+BATCH_URL = '/api/v1/mockups/generate/batch/'
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    MOCKUP_TASK_NOTIFIER='mockups.notifications.InMemoryNotifier',
+    MEDIA_ROOT=tempfile.mkdtemp(prefix='mockup-tests-'),
+)
+class MockupTestCase(TestCase):
+    """TestCase without Redis: a local cache and notifier, and an empty cache per test."""
+
+    def setUp(self):
+        cache.clear()
+
+
+class MockupListQueriesTest(MockupTestCase):
+    """GET /api/mockups/ runs the same queries whatever the page size."""
+
+    @classmethod
+    def setUpTestData(cls):
+        mockups = Mockup.objects.bulk_create(
+            Mockup(text=f"Seed {i}", font=None, text_color='#000000', shirt_color='white,black')
+            for i in range(12)
+        )
+        GeneratedImage.objects.bulk_create(
+            GeneratedImage(mockup=mockup, image=f"mockups/seed/{mockup.pk}_{n}.png",
+                           sizes={'600': f"mockups/seed/{mockup.pk}_{n}.png"})
+            for mockup in mockups
+            for n in range(4)
+        )
+
+    def test_page_queries_do_not_grow_with_page_size(self):
+        for page_size in (1, 5, 12):
+            with self.subTest(page_size=page_size):
+                with self.assertNumQueries(2):
+                    response = self.client.get('/api/mockups/', {'page_size': page_size})
+                self.assertEqual(response.status_code, 200)
+                body = response.json()
+                self.assertEqual(len(body['results']), page_size)
+                self.assertTrue(body['results'][0]['image_url'])
+
+    def test_next_page_queries(self):
+        body = self.client.get('/api/mockups/', {'page_size': 5}).json()
+        with self.assertNumQueries(2):
+            response = self.client.get(body['next'])
+        self.assertEqual(len(response.json()['results']), 5)
+
+
+class GenerationTaskQueriesTest(MockupTestCase):
+    """generate_mockup_task runs the same queries whatever the number of colours.
+
+    The counts include the on_commit render cleanup; savepoints stand in for
+    the BEGIN/COMMIT a worker would issue.
+    """
+
+    def run_job(self, task_id, colors, queries):
+        with self.assertNumQueries(queries), self.captureOnCommitCallbacks(execute=True):
+            generate_mockup_task.apply(args=(task_id, 'Queries'), kwargs={'shirt_colors': colors})
+        self.assertEqual(GenerationTask.objects.get(task_id=task_id).status, 'SUCCESS')
+
+    def test_new_job_and_rerun_queries(self):
+        for count in (1, len(DEFAULT_SHIRT_COLORS)):
+            with self.subTest(colors=count):
+                task_id = str(uuid.uuid4())
+                GenerationTask.objects.create(task_id=task_id)
+                self.run_job(task_id, DEFAULT_SHIRT_COLORS[:count], 9)
+                # A re-run replaces the previous mockup and its images
+                self.run_job(task_id, DEFAULT_SHIRT_COLORS[:count], 19)
+        self.assertEqual(Mockup.objects.count(), 2)
+
+
+@mock.patch('celery.canvas.Signature.apply_async')
+class CoalescingTest(MockupTestCase):
+    """Identical generate requests join the in-flight task instead of queueing another.
+
+    Publishing is mocked, so every queued task stays PENDING.
+    """
+
+    body = {'text': 'Campaign launch', 'shirt_color': ['white', 'black']}
+
+    def post(self, data):
+        response = self.client.post(GENERATE_URL, data, content_type='application/json')
+        self.assertEqual(response.status_code, 202)
+        return response.json()
+
+    def test_identical_request_joins_in_flight_task(self, apply_async):
+        # Insert, plus the queue-depth recount of an empty cache
+        with self.assertNumQueries(2):
+            leader = self.post(self.body)
+        # Insert, the leader's status, and deleting the unused row
+        with self.assertNumQueries(3):
+            follower = self.post(self.body)
+        self.assertEqual(follower['task_id'], leader['task_id'])
+        self.assertTrue(follower['coalesced'])
+        self.assertEqual(GenerationTask.objects.count(), 1)
+        self.assertEqual(apply_async.call_count, 1)
+
+    def test_finished_task_is_not_joined(self, apply_async):
+        first = self.post(self.body)
+        _set_task_status(GenerationTask.objects.get(task_id=first['task_id']), 'SUCCESS')
+        second = self.post(self.body)
+        self.assertNotEqual(second['task_id'], first['task_id'])
+        self.assertEqual(self.post(self.body)['task_id'], second['task_id'])
+        self.assertEqual(apply_async.call_count, 2)
+
+    def test_different_body_is_not_coalesced(self, apply_async):
+        first = self.post(self.body)
+        other = self.post({**self.body, 'text_color': '#FFFFFF'})
+        self.assertNotEqual(other['task_id'], first['task_id'])
+        self.assertEqual(apply_async.call_count, 2)
+
+
+@mock.patch('celery.canvas.Signature.apply_async')
+class AdmissionTest(MockupTestCase):
+    """Per-client token bucket and queue-depth limit on the generate endpoint.
+
+    Publishing is mocked, so every admitted task stays PENDING.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.texts = (f"Admission {n}" for n in range(1000))
+
+    def post(self, address='10.0.0.1', text=None):
+        return self.client.post(GENERATE_URL, {'text': text or next(self.texts)},
+                                content_type='application/json', REMOTE_ADDR=address)
+
+    def assertTooManyRequests(self, response, error):
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.json()['error'], error)
+        self.assertTrue(response['Retry-After'])
+
+    @mock.patch.object(admission, 'RATE_LIMIT_BURST', 3)
+    @mock.patch.object(admission, 'RATE_LIMIT_RATE', 0.01)
+    def test_rate_limit_per_client(self, apply_async):
+        statuses = [self.post().status_code for _ in range(3)]
+        self.assertEqual(statuses, [202] * 3)
+        # Rejected before the body is parsed or a row is written
+        with self.assertNumQueries(0):
+            response = self.post()
+        self.assertTooManyRequests(response, 'rate limit exceeded')
+        self.assertEqual(self.post('10.0.0.2').status_code, 202)
+
+    @mock.patch.object(admission, 'RATE_LIMIT_RATE', 0)
+    @mock.patch.object(admission, 'MAX_QUEUE_DEPTH', 3)
+    def test_queue_depth_limit(self, apply_async):
+        self.assertEqual(self.post().status_code, 202)
+        # The counter exists now: admission adds no COUNT(*) to the insert
+        for _ in range(2):
+            with self.assertNumQueries(1):
+                self.assertEqual(self.post().status_code, 202)
+        # Insert, then delete the row of the rejected request
+        with self.assertNumQueries(2):
+            response = self.post()
+        self.assertTooManyRequests(response, 'generation queue is full')
+        self.assertEqual(GenerationTask.objects.count(), 3)
+        self.assertEqual(cache.get(admission.QUEUE_DEPTH_KEY), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            _set_task_status(GenerationTask.objects.first(), 'SUCCESS')
+        self.assertEqual(cache.get(admission.QUEUE_DEPTH_KEY), 2)
+        self.assertEqual(self.post().status_code, 202)
+        self.assertEqual(apply_async.call_count, 4)
+
+    @mock.patch.object(admission, 'RATE_LIMIT_RATE', 0)
+    @mock.patch.object(admission, 'MAX_QUEUE_DEPTH', 1)
+    def test_full_queue_keeps_the_in_flight_task(self, apply_async):
+        leader = self.post(text='Shared').json()['task_id']
+        self.assertTooManyRequests(self.post(text='Shared'), 'generation queue is full')
+        # Callers that joined the leader can still poll it
+        self.assertEqual(self.client.get(f"/api/v1/tasks/{leader}/").json()['status'], 'PENDING')
+        self.assertEqual(cache.get(admission.QUEUE_DEPTH_KEY), 1)
+
+    @mock.patch.object(admission, 'RATE_LIMIT_RATE', 0)
+    def test_slot_is_reserved_before_the_coalescing_claim(self, apply_async):
+        # A 429 deletes the row, so nobody may have joined it by then
+        calls = mock.Mock()
+        calls.reserve.side_effect = admission.reserve
+        calls.claim.side_effect = coalescing.claim
+        with mock.patch.object(admission, 'reserve', calls.reserve), mock.patch.object(coalescing, 'claim', calls.claim):
+            self.assertEqual(self.post().status_code, 202)
+        self.assertEqual([name for name, _, _ in calls.mock_calls], ['reserve', 'claim'])
+
+    @mock.patch.object(admission, 'RATE_LIMIT_RATE', 0)
+    @mock.patch('mockups.views.notify_status')
+    @mock.patch('celery.canvas.group.apply_async', side_effect=ConnectionError)
+    def test_failed_batch_publish_fails_every_task(self, group_apply_async, notify_status, apply_async):
+        items = [{'text': 'First'}, {'text': 'Second'}]
+        with self.assertRaises(ConnectionError):
+            self.client.post(BATCH_URL, {'items': items}, content_type='application/json')
+        tasks = GenerationTask.objects.all()
+        self.assertEqual({task.status for task in tasks}, {'FAILURE'})
+        # Waiting clients are woken, and the slots are given back
+        self.assertCountEqual([call.args for call in notify_status.call_args_list],
+                              [(task.task_id, 'FAILURE') for task in tasks])
+        self.assertEqual(cache.get(admission.QUEUE_DEPTH_KEY), 0)
+
+
+@mock.patch('celery.canvas.Signature.apply_async')
+class RequestValidationTest(MockupTestCase):
+    """Shirt and text colours are checked against the catalogue before anything renders or queues."""
+
+    def test_preview_rejects_unknown_colours(self, apply_async):
+        for params in ({'shirt_color': '../shirts/white'}, {'text_color': 'red-ish'}, {'text_color': '#12'}):
+            with self.subTest(**params):
+                response = self.client.get(PREVIEW_URL, {'text': 'Preview', **params})
+                self.assertEqual(response.status_code, 400)
+
+    def test_generate_rejects_unknown_colours(self, apply_async):
+        for body in ({'shirt_color': ['../shirts/white']}, {'shirt_color': 'white'}, {'text_color': '#12'}):
+            with self.subTest(**body):
+                response = self.client.post(GENERATE_URL, {'text': 'Generate', **body},
+                                            content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+        self.assertFalse(GenerationTask.objects.exists())
+        apply_async.assert_not_called()
+
+    def test_batch_rejects_unknown_colours(self, apply_async):
+        response = self.client.post(BATCH_URL, {
+            'items': [{'text': 'Fine'}, {'text': 'Bad', 'shirt_color': ['../shirts/white']}],
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('1', response.json()['items'])
+
+
+
+class PreviewTest(MockupTestCase):
+    """In-request previews look like the full render and are bounded per client."""
+
+    def test_preview_text_keeps_its_proportions(self):
+        from PIL import Image, ImageChops
+
+        from .rendering import MockupRenderer, RenderSpec
+
+        renderer = MockupRenderer()
+
+        def text_span(image):
+            # Share of the shirt width the text covers: where it differs from the bare shirt
+            bare = renderer.render(RenderSpec(text='', shirt_color='white', width=image.width))
+            left, _, right, _ = ImageChops.difference(image.convert('RGB'), bare).getbbox()
+            return (right - left) / image.width
+
+        full = text_span(renderer.render(RenderSpec(text='Hello World', shirt_color='white')))
+        response = self.client.get(PREVIEW_URL, {'text': 'Hello World', 'width': 128})
+        self.assertEqual(response.status_code, 200)
+        with Image.open(io.BytesIO(response.content)) as preview:
+            self.assertAlmostEqual(text_span(preview), full, delta=0.05)
+
+    def test_text_length_is_capped(self):
+        response = self.client.get(PREVIEW_URL, {'text': 'x' * (PREVIEW_MAX_TEXT_LENGTH + 1)})
+        self.assertEqual(response.status_code, 400)
+
+    @mock.patch.object(admission, 'RATE_LIMIT_BURST', 2)
+    @mock.patch.object(admission, 'RATE_LIMIT_RATE', 0.01)
+    def test_rate_limited_per_client(self):
+        statuses = [self.client.get(PREVIEW_URL, {'text': 'Limit', 'width': 32}).status_code for _ in range(3)]
+        self.assertEqual(statuses, [200, 200, 429])
+        response = self.client.get(PREVIEW_URL, {'text': 'Limit'}, REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response.status_code, 200)
+
+
+
+class PruneRenderCacheTest(MockupTestCase):
+    """prune_render_cache deletes orphaned renders, but never one a job picked up meanwhile."""
+
+    def render(self, text):
+        task_id = str(uuid.uuid4())
+        GenerationTask.objects.create(task_id=task_id)
+        generate_mockup_task.apply(args=(task_id, text), kwargs={'shirt_colors': ['white']})
+        image = GeneratedImage.objects.get(mockup__generationtask__task_id=task_id)
+        return image.image.name, image.sizes
+
+    def test_rechecks_references_under_the_render_locks(self):
+        from django.core.management import call_command
+
+        from .management.commands import prune_render_cache
+        from .storage import get_storage, lock_renders
+
+        picked_up, picked_up_sizes = self.render('Picked up')
+        orphan, orphan_sizes = self.render('Orphan')
+        Mockup.objects.all().delete()
+
+        @contextmanager
+        def job_commits_first(names):
+            # A job that found the old orphan as a cache hit commits its row before prune gets the lock
+            GeneratedImage.objects.create(mockup=Mockup.objects.create(text='Picked up'),
+                                          image=picked_up, sizes=picked_up_sizes)
+            with lock_renders(names) as locked:
+                yield locked
+
+        with mock.patch.object(prune_render_cache, 'lock_renders', job_commits_first):
+            call_command('prune_render_cache', min_age=0, stdout=io.StringIO())
+        storage = get_storage()
+        self.assertTrue(all(storage.exists(name) for name in [picked_up, *picked_up_sizes.values()]))
+        self.assertFalse(any(storage.exists(name) for name in [orphan, *orphan_sizes.values()]))
+
+
+
+class TextCompositingTest(MockupTestCase):
+    """The three mask pastes match the old loop of 50 ``draw.text`` calls on the text itself."""
+
+    TEXT = 'Hello World'
+
+    def draw_loop(self, base, font, fill, shadow_color, outline_color):
+        # The renderer before masks: shadow, a 7x7 ring of outline copies, then the fill
+        from PIL import ImageDraw
+
+        draw = ImageDraw.Draw(base)
+        left, top, right, bottom = draw.textbbox((0, 0), self.TEXT, font=font)
+        x = (base.width - (right - left)) / 2
+        y = base.height * 0.35 - (bottom - top) / 2
+        draw.text((x + 4, y + 4), self.TEXT, font=font, fill=shadow_color)
+        for ox in range(-3, 4):
+            for oy in range(-3, 4):
+                if ox or oy:
+                    draw.text((x + ox, y + oy), self.TEXT, font=font, fill=outline_color)
+        draw.text((x, y), self.TEXT, font=font, fill=fill)
+
+    def test_text_region_matches_draw_text_loop(self):
+        from PIL import ImageChops, ImageFont
+
+        from .rendering import (
+            SHIRT_FILE_MAP, _composite_text, _rasterize_text, determine_text_and_outline, template_cache,
+        )
+
+        # The default font as shipped, and at the size a TrueType font renders a 600px shirt
+        for font in (ImageFont.load_default(), ImageFont.load_default(size=180)):
+            for color in SHIRT_FILE_MAP:
+                with self.subTest(font_size=font.size, color=color):
+                    colors = determine_text_and_outline(color, '#000000')
+                    expected = template_cache.get(color)
+                    self.draw_loop(expected, font, *colors)
+                    actual = template_cache.get(color)
+                    _composite_text(actual, _rasterize_text(actual.size, self.TEXT, font), *colors)
+
+                    region = ImageChops.difference(expected, template_cache.get(color)).getbbox()
+                    difference = ImageChops.difference(expected, actual).crop(region)
+                    self.assertLessEqual(max(high for _, high in difference.getextrema()), 8)
+
+
+
+class StatusCacheTest(MockupTestCase):
+    """Finished tasks are served from status_cache with an ETag, and a re-run drops the entry."""
+
+    def run_job(self, task_id):
+        with self.captureOnCommitCallbacks(execute=True):
+            generate_mockup_task.apply(args=(task_id, 'Cached'), kwargs={'shirt_colors': ['white']})
+
+    def test_etag_and_not_modified_without_queries(self):
+        task_id = str(uuid.uuid4())
+        GenerationTask.objects.create(task_id=task_id)
+        self.run_job(task_id)
+        url = f"/api/v1/tasks/{task_id}/"
+
+        first = self.client.get(url)
+        self.assertEqual(first.json()['status'], 'SUCCESS')
+        etag = first['ETag']
+        with self.assertNumQueries(0):
+            cached = self.client.get(url)
+        self.assertEqual((cached.json(), cached['ETag']), (first.json(), etag))
+        with self.assertNumQueries(0):
+            not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+
+        # A re-run replaces the images: the cached entry and the old ETag are gone
+        self.run_job(task_id)
+        rerun = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(rerun.status_code, 200)
+        self.assertNotEqual(rerun['ETag'], etag)
+        self.assertNotEqual(rerun.json()['results'], first.json()['results'])
+
+
+
+class TaskNotificationTest(MockupTestCase):
+    """Bulk status lookups, and long-poll and SSE clients woken by the in-memory notifier."""
+
+    def setUp(self):
+        super().setUp()
+        self.task = GenerationTask.objects.create(task_id=uuid.uuid4())
+
+    @contextmanager
+    def finish_while_waiting(self):
+        """Mark the task SUCCESS (committing, so it notifies) the first time a subscriber waits."""
+        real_wait = InMemorySubscription.wait
+        waits = []
+
+        def wait(subscription, timeout):
+            if not waits:
+                with self.captureOnCommitCallbacks(execute=True):
+                    _set_task_status(GenerationTask.objects.get(pk=self.task.pk), 'SUCCESS')
+            waits.append(timeout)
+            return real_wait(subscription, timeout)
+
+        with mock.patch.object(InMemorySubscription, 'wait', autospec=True, side_effect=wait):
+            yield waits
+
+    @staticmethod
+    def statuses(response):
+        stream = b''.join(response.streaming_content).decode()
+        return [json.loads(line[len('data: '):])['status'] for line in stream.splitlines() if line.startswith('data: ')]
+
+    def test_bulk_lookup_in_two_queries(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            generate_mockup_task.apply(args=(str(self.task.task_id), 'Bulk'), kwargs={'shirt_colors': ['white', 'black']})
+        pending = GenerationTask.objects.create(task_id=uuid.uuid4())
+        missing = uuid.uuid4()
+
+        with self.assertNumQueries(2):
+            response = self.client.get(f"/api/v1/tasks/?ids={pending.task_id},{missing},{self.task.task_id}")
+        body = response.json()
+        self.assertEqual([task['status'] for task in body['tasks']], ['PENDING', 'SUCCESS'])
+        self.assertEqual(len(body['tasks'][1]['results']), 2)
+        self.assertEqual(body['missing'], [str(missing)])
+
+    def test_bulk_lookup_rejects_bad_ids(self):
+        self.assertEqual(self.client.get('/api/v1/tasks/?ids=').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/tasks/?ids=not-a-uuid').status_code, 400)
+
+    def test_long_poll_is_woken_by_the_notification(self):
+        with self.finish_while_waiting() as waits:
+            started = time.monotonic()
+            response = self.client.get(f"/api/v1/tasks/{self.task.task_id}/?wait=30")
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(waits, [30])
+        self.assertEqual(response.json()['status'], 'SUCCESS')
+
+    def test_events_stream_until_terminal(self):
+        with self.finish_while_waiting():
+            response = self.client.get(f"/api/v1/tasks/{self.task.task_id}/events/")
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            self.assertEqual(self.statuses(response), ['PENDING', 'SUCCESS'])
+
+    @mock.patch('mockups.views.SSE_MAX_DURATION', 0.1)
+    @mock.patch('mockups.views.SSE_HEARTBEAT_INTERVAL', 0.01)
+    def test_heartbeats_do_not_reload_the_task(self):
+        response = self.client.get(f"/api/v1/tasks/{self.task.task_id}/events/")
+        with self.assertNumQueries(1):
+            stream = b''.join(response.streaming_content).decode()
+        self.assertEqual(stream.count('event: status'), 1)
+        self.assertGreater(stream.count(': keep-alive'), 1)
+
+
+
+@override_settings(STORAGES={
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    'mockups': {'BACKEND': 'mockups.storage.InMemoryObjectStorage'},
+})
+class ObjectStorageTest(MockupTestCase):
+    """Jobs and removals go through the 'mockups' storage alias, here an in-memory object store."""
+
+    def run_job(self):
+        task = GenerationTask.objects.create(task_id=uuid.uuid4())
+        with self.captureOnCommitCallbacks(execute=True):
+            generate_mockup_task.apply(args=(str(task.task_id), 'Stored'), kwargs={'shirt_colors': ['white', 'black']})
+        return GenerationTask.objects.get(pk=task.pk).mockup
+
+    @staticmethod
+    def stored_names(mockup):
+        names = set()
+        for image, sizes in GeneratedImage.objects.filter(mockup=mockup).values_list('image', 'sizes'):
+            names.add(image)
+            names.update((sizes or {}).values())
+        return names
+
+    def remove(self, mockup):
+        with self.captureOnCommitCallbacks(execute=True):
+            _remove_mockups([mockup.pk])
+
+    def test_files_are_written_and_deleted(self):
+        storage = get_storage()
+        self.assertIsInstance(storage, InMemoryObjectStorage)
+
+        first = self.run_job()
+        names = self.stored_names(first)
+        self.assertGreaterEqual(len(names), 2)
+        self.assertTrue(all(storage.exists(name) for name in names))
+
+        # The same body reuses the content-addressed files, so they outlive the first mockup
+        second = self.run_job()
+        self.assertEqual(self.stored_names(second), names)
+        self.remove(first)
+        self.assertTrue(all(storage.exists(name) for name in names))
+
+        self.remove(second)
+        self.assertFalse(any(storage.exists(name) for name in names))
+        self.assertFalse(GeneratedImage.objects.exists())
+
+
+if __name__ == '__main__':
+    # Queue an example job on a running worker (mockup_project.settings)
+    import os
+    import sys
+
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mockup_project.settings")
+
+    import django
+    django.setup()
+
+    from mockups.tasks import generate_mockup_task
+
+    generate_mockup_task.delay("task_id_example", "Hello World")
@@ -0,0 +1,209 @@
+"""
+Per-stage timing for mockup generation.
+
+:func:`start_timer` returns a :class:`StageTimer` for a sampled fraction of
+calls (``MOCKUP_TIMING_SAMPLE_RATE``, 0 disables timing) and the shared
+``NULL_TIMER`` otherwise, whose spans are a preallocated no-op context
+manager. Disabled timing therefore costs one comparison per operation.
+
+A finished timer is reported twice:
+
+* as one ``mockups.timing`` log record carrying the stage durations in its
+  ``timing`` attribute, and
+* as Prometheus-style histograms in ``registry``. ``MetricsView`` serves them
+  for the web process; Celery workers serve their own with
+  :func:`start_metrics_server` when ``MOCKUP_METRICS_PORT`` is set.
+"""
+import logging
+import random
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from django.conf import settings
+
+SAMPLE_RATE = getattr(settings, 'MOCKUP_TIMING_SAMPLE_RATE', 0.0)
+HISTOGRAM_BUCKETS = tuple(getattr(
+    settings, 'MOCKUP_TIMING_BUCKETS',
+    (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+))
+EXPOSITION_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+logger = logging.getLogger('mockups.timing')
+
+
+class HistogramRegistry:
+    """Cumulative histograms keyed by metric name and label values, rendered in Prometheus text format."""
+
+    def __init__(self, buckets=HISTOGRAM_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._metrics = {}  # name -> (help, {labels: [bucket counts..., sum, count]})
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, help_text: str) -> None:
+        with self._lock:
+            self._metrics.setdefault(name, (help_text, {}))
+
+    def observe(self, name: str, labels: tuple, value: float) -> None:
+        """Record ``value`` seconds; ``labels`` is a tuple of ``(label, value)`` pairs."""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            _, series = self._metrics.setdefault(name, ('', {}))
+            counts = series.get(labels)
+            if counts is None:
+                counts = series[labels] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                counts[index] += 1
+            counts[-2] += value
+            counts[-1] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            for _, series in self._metrics.values():
+                series.clear()
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for name, (help_text, series) in sorted(self._metrics.items()):
+                if help_text:
+                    lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, counts in sorted(series.items()):
+                    label_text = ','.join(f'{key}="{_escape(value)}"' for key, value in labels)
+                    prefix = f"{label_text}," if label_text else ''
+                    cumulative = 0
+                    for bound, count in zip(self.buckets, counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+                    lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {counts[-1]}')
+                    series_labels = f"{{{label_text}}}" if label_text else ''
+                    lines.append(f"{name}_sum{series_labels} {counts[-2]}")
+                    lines.append(f"{name}_count{series_labels} {counts[-1]}")
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = HistogramRegistry()
+registry.describe('mockup_stage_duration_seconds', 'Time spent in one stage of a mockup operation.')
+registry.describe('mockup_operation_duration_seconds', 'Total time of a mockup operation.')
+
+
+class _Span:
+    __slots__ = ('_timer', '_stage', '_started')
+
+    def __init__(self, timer: 'StageTimer', stage: str):
+        self._timer = timer
+        self._stage = stage
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._timer.add(self._stage, time.perf_counter() - self._started)
+
+
+class StageTimer:
+    """Accumulates time per stage for one operation; safe to share between render threads."""
+
+    enabled = True
+
+    def __init__(self, operation: str, **fields):
+        self.operation = operation
+        self.fields = fields
+        self.stages = {}  # stage -> seconds, summed over every span of that stage
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def span(self, stage: str) -> _Span:
+        return _Span(self, stage)
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def finish(self, **fields) -> dict:
+        """Record the histograms and log one structured record; returns the record."""
+        total = time.perf_counter() - self._started
+        operation_label = (('operation', self.operation),)
+        with self._lock:
+            stages = dict(self.stages)
+        for stage, seconds in stages.items():
+            registry.observe('mockup_stage_duration_seconds', operation_label + (('stage', stage),), seconds)
+        registry.observe('mockup_operation_duration_seconds', operation_label, total)
+
+        record = {
+            'operation': self.operation,
+            'total_ms': round(total * 1000, 3),
+            'stages_ms': {stage: round(seconds * 1000, 3) for stage, seconds in stages.items()},
+            **self.fields,
+            **fields,
+        }
+        logger.info("%s took %.1fms", self.operation, total * 1000, extra={'timing': record})
+        return record
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return None
+
+
+class _NullTimer:
+    """Stand-in for unsampled operations: every method is a no-op."""
+
+    enabled = False
+    _span = _NullSpan()
+
+    def span(self, stage: str) -> _NullSpan:
+        return self._span
+
+    def add(self, stage: str, seconds: float) -> None:
+        pass
+
+    def finish(self, **fields) -> None:
+        return None
+
+
+NULL_TIMER = _NullTimer()
+
+
+def start_timer(operation: str, **fields):
+    """A StageTimer for a sampled call, or NULL_TIMER."""
+    if SAMPLE_RATE <= 0 or (SAMPLE_RATE < 1 and random.random() >= SAMPLE_RATE):
+        return NULL_TIMER
+    return StageTimer(operation, **fields)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', EXPOSITION_CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int, host: str = '') -> Optional[ThreadingHTTPServer]:
+    """Serve ``registry`` on ``host:port`` from a daemon thread; None if the port is taken."""
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        logger.warning("Metrics server could not bind port %s: %s", port, e)
+        return None
+    threading.Thread(target=server.serve_forever, name='mockup-metrics', daemon=True).start()
+    return server
@@ -14,11 +14,38 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.urls import path
-from .views import GenerateMockupView, TaskStatusView, MockupListView
+from .views import (
+    BatchStatusView,
+    GenerateMockupBatchView,
+    GenerateMockupView,
+    MetricsView,
+    MockupListView,
+    MockupPreviewView,
+    TaskEventsView,
+    TaskStatusBulkView,
+    TaskStatusView,
+)
+
+if getattr(settings, 'MOCKUP_ASYNC_VIEWS', False):
+    # Native coroutine views for ASGI servers (see mockups.async_views)
+    from .async_views import GenerateMockupAsyncView, TaskStatusAsyncView
+
+    generate_view = GenerateMockupAsyncView.as_view()
+    task_status_view = TaskStatusAsyncView.as_view()
+else:
+    generate_view = GenerateMockupView.as_view()
+    task_status_view = TaskStatusView.as_view()
 
 urlpatterns = [
-    path('mockups/generate/', GenerateMockupView.as_view(), name='generate-mockup'),
-    path('tasks/<uuid:task_id>/', TaskStatusView.as_view(), name='task-status'),
+    path('mockups/generate/', generate_view, name='generate-mockup'),
+    path('mockups/preview/', MockupPreviewView.as_view(), name='mockup-preview'),
+    path('mockups/generate/batch/', GenerateMockupBatchView.as_view(), name='generate-mockup-batch'),
+    path('batches/<uuid:batch_id>/', BatchStatusView.as_view(), name='batch-status'),
+    path('tasks/', TaskStatusBulkView.as_view(), name='task-status-bulk'),
+    path('tasks/<uuid:task_id>/', task_status_view, name='task-status'),
+    path('tasks/<uuid:task_id>/events/', TaskEventsView.as_view(), name='task-events'),
     path('mockups/', MockupListView.as_view(), name='mockup-list'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
 ]
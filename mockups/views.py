@@ -1,48 +1,217 @@
 from rest_framework.views import APIView  # type: ignore[import]
 from rest_framework.response import Response  # type: ignore[import]
 from rest_framework import status  # type: ignore[import]
+from celery import group, signature  # type: ignore[import]
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.views import View
 try:
     from rest_framework.generics import ListAPIView  # type: ignore[import]
 except ImportError:  # pragma: no cover
     class ListAPIView:  # type: ignore[misc]
         pass
 from .models import GenerationTask, GeneratedImage, Mockup
+from .notifications import TERMINAL_STATUSES, get_notifier, notify_status
+from .pagination import MockupCursorPagination
 from .serializers import GeneratedImageSerializer, MockupSerializer
-from .tasks import generate_mockup_task
+from . import admission, coalescing, status_cache
+from .catalog import (
+    CONTENT_TYPES, DEFAULT_SHIRT_COLORS, OUTPUT_ENCODERS, OUTPUT_FORMAT, available_fonts, available_output_formats,
+    is_shirt_color, is_text_color,
+)
+from .timing import EXPOSITION_CONTENT_TYPE, registry as timing_registry
+from collections import defaultdict
+import ipaddress
+import json
+import time
 import uuid
 
 
+BATCH_MAX_SIZE = getattr(settings, 'MOCKUP_BATCH_MAX_SIZE', 500)
+# Celery queues a request may pick with "lane", and the default of each endpoint
+LANES = getattr(settings, 'MOCKUP_LANES', ('interactive', 'bulk'))
+DEFAULT_LANE = getattr(settings, 'MOCKUP_DEFAULT_LANE', LANES[0])
+BATCH_LANE = getattr(settings, 'MOCKUP_BATCH_LANE', LANES[-1])
+LONG_POLL_MAX_WAIT = getattr(settings, 'MOCKUP_LONG_POLL_MAX_WAIT', 30)
+SSE_MAX_DURATION = getattr(settings, 'MOCKUP_SSE_MAX_DURATION', 300)
+SSE_HEARTBEAT_INTERVAL = 15
+# In-request previews: default and largest width, in pixels
+PREVIEW_WIDTH = getattr(settings, 'MOCKUP_PREVIEW_WIDTH', 512)
+PREVIEW_MAX_WIDTH = getattr(settings, 'MOCKUP_PREVIEW_MAX_WIDTH', 1024)
+PREVIEW_MAX_TEXT_LENGTH = getattr(settings, 'MOCKUP_PREVIEW_MAX_TEXT_LENGTH', 100)
+# Networks (matched against REMOTE_ADDR) that may scrape /api/v1/metrics/; staff users always may
+METRICS_ALLOWED_NETWORKS = [
+    ipaddress.ip_network(network, strict=False)
+    for network in getattr(settings, 'MOCKUP_METRICS_ALLOWED_NETWORKS', ('127.0.0.1/32', '::1/128'))
+]
+
+# Jobs are queued by task name, so the web process never imports mockups.tasks
+# and with it Pillow, the renderer and its caches
+GENERATE_TASK = 'mockups.tasks.generate_mockup_task'
+
+if getattr(settings, 'CELERY_TASK_ALWAYS_EAGER', False):
+    # Eager jobs run in this process, so the task must be registered here
+    from . import tasks  # noqa: F401
+
+
+def _parse_generation_spec(data, default_lane=DEFAULT_LANE):
+    """Validate one generation request body.
+
+    Returns ``(task kwargs, None)`` on success or ``(None, error message)``.
+    """
+    if not isinstance(data, dict):
+        return None, 'request body must be an object'
+
+    text = data.get('text', '')
+    if not text:
+        return None, 'text field is required'
+
+    font = data.get('font', None)
+    text_color = data.get('text_color', '#000000')
+    shirt_colors = data.get('shirt_color', None)  # optional list
+    output_format = data.get('output_format', None)  # optional, defaults to MOCKUP_OUTPUT_FORMAT
+    lane = data.get('lane', default_lane)
+
+    if lane not in LANES:
+        return None, f"lane must be one of {list(LANES)}"
+
+    if font is not None and font not in available_fonts():
+        return None, f"font must be one of {sorted(available_fonts())}"
+
+    if output_format is not None:
+        formats = available_output_formats()
+        if output_format not in formats:
+            return None, f"output_format must be one of {formats}"
+
+    if not is_text_color(text_color):
+        return None, 'text_color must be a #RGB or #RRGGBB colour'
+
+    # If no shirt_colors provided, default to all 4 colors
+    if shirt_colors is None:
+        shirt_colors = DEFAULT_SHIRT_COLORS
+    elif not isinstance(shirt_colors, list) or not all(is_shirt_color(color) for color in shirt_colors):
+        return None, f"shirt_color must be a list of {DEFAULT_SHIRT_COLORS}"
+
+    return {
+        'text': text,
+        'font_name': font,
+        'text_color': text_color,
+        'shirt_colors': shirt_colors,
+        'output_format': output_format,
+        'lane': lane,
+    }, None
+
+
+def _generate_signature(task_id, spec):
+    """generate_mockup_task signature for a spec from :func:`_parse_generation_spec`."""
+    kwargs = dict(spec)
+    return signature(GENERATE_TASK, args=(task_id, kwargs.pop('text')), kwargs=kwargs)
+
+
+def _coalescing_key(spec):
+    return coalescing.request_key(
+        spec['text'], spec['font_name'], spec['text_color'], spec['shirt_colors'],
+        spec['output_format'] or OUTPUT_FORMAT, spec['lane'],
+    )
+
+
+def _coalesced_response(task_id, task_status):
+    return {
+        'task_id': str(task_id),
+        'status': task_status,
+        'message': 'Joined an identical image generation already in progress',
+        'coalesced': True,
+    }
+
+
+def _throttled_response(reason, retry_after):
+    return {
+        'error': reason,
+        'retry_after': retry_after,
+    }
+
+
+def _in_flight_task(key, task_uuid):
+    """``(task id, status)`` of an identical in-flight generation, or None when ``task_uuid`` leads."""
+    leader = coalescing.claim(key, task_uuid)
+    # Each round either joins a live task or replaces a finished one; a
+    # replacement that already finished again is not worth more rounds
+    for _ in range(3):
+        if not leader:
+            return None
+        leader_status = GenerationTask.objects.filter(task_id=leader).values_list('status', flat=True).first()
+        if leader_status is not None and leader_status not in TERMINAL_STATUSES:
+            return leader, leader_status
+        leader = coalescing.take_over(key, leader, task_uuid)
+    return None
+
+
+def _fail_unpublished(task_uuid):
+    """Mark a task whose publish failed FAILURE and wake callers that already joined it."""
+    GenerationTask.objects.filter(task_id=task_uuid).update(status='FAILURE', updated_at=timezone.now())
+    status_cache.invalidate(task_uuid)
+    notify_status(task_uuid, 'FAILURE')
+
+
+def _too_many_requests(reason, retry_after):
+    return Response(
+        _throttled_response(reason, retry_after),
+        status=status.HTTP_429_TOO_MANY_REQUESTS,
+        headers={'Retry-After': str(retry_after)},
+    )
+
+
 class GenerateMockupView(APIView):
+    """Queue a generation, or join an identical one that is still PENDING or STARTED.
+
+    Answers 429 with Retry-After when the client ran out of tokens or too many
+    tasks are outstanding (``mockups.admission``); a request that joins an
+    in-flight task gives its queue slot back.
+    """
+
     def post(self, request):
-        data = request.data
-        text = data.get('text', '')
-        if not text:
+        retry_after = admission.take_token(admission.client_id(request))
+        if retry_after:
+            return _too_many_requests('rate limit exceeded', retry_after)
+
+        spec, error = _parse_generation_spec(request.data)
+        if error:
             return Response({
-                'error': 'text field is required'
+                'error': error
             }, status=status.HTTP_400_BAD_REQUEST)
-        
-        font = data.get('font', None)
-        text_color = data.get('text_color', '#000000')
-        shirt_colors = data.get('shirt_color', None)  # optional list
-        
-        # If no shirt_colors provided, default to all 4 colors
-        if shirt_colors is None:
-            from .tasks import DEFAULT_SHIRT_COLORS
-            shirt_colors = DEFAULT_SHIRT_COLORS
-
-        # create GenerationTask record
+
+        # create GenerationTask record; it exists before the coalescing key
+        # points at it, so callers that join it can poll right away
         task_uuid = uuid.uuid4()
         GenerationTask.objects.create(task_id=task_uuid, status='PENDING')
 
+        # The slot is taken before the coalescing key can point at this task,
+        # so a 429 never deletes a row that other callers already joined
+        retry_after = admission.reserve()
+        if retry_after:
+            GenerationTask.objects.filter(task_id=task_uuid).delete()
+            return _too_many_requests('generation queue is full', retry_after)
+
+        key = _coalescing_key(spec)
+        in_flight = _in_flight_task(key, task_uuid)
+        if in_flight:
+            admission.release()
+            GenerationTask.objects.filter(task_id=task_uuid).delete()
+            return Response(_coalesced_response(*in_flight), status=status.HTTP_202_ACCEPTED)
+
         # call celery async task with correct parameters
-        generate_mockup_task.delay(
-            str(task_uuid),
-            text,
-            font_name=font,
-            text_color=text_color,
-            shirt_colors=shirt_colors
-        )
+        try:
+            _generate_signature(str(task_uuid), spec).apply_async()
+        except Exception:
+            # Nobody will run this task, so callers must not join it
+            coalescing.release(key, task_uuid)
+            admission.release()
+            _fail_unpublished(task_uuid)
+            raise
 
         return Response({
             'task_id': str(task_uuid),
@@ -51,24 +220,368 @@ class GenerateMockupView(APIView):
         }, status=status.HTTP_202_ACCEPTED)
 
 
+class GenerateMockupBatchView(APIView):
+    """Queue many generation specs with one insert and one broker publish.
+
+    A batch spends one rate-limit token and needs a queue slot per item.
+    """
+
+    def post(self, request):
+        retry_after = admission.take_token(admission.client_id(request))
+        if retry_after:
+            return _too_many_requests('rate limit exceeded', retry_after)
+
+        items = request.data.get('items') if isinstance(request.data, dict) else None
+        if not isinstance(items, list) or not items:
+            return Response({
+                'error': 'items must be a non-empty list of generation requests'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > BATCH_MAX_SIZE:
+            return Response({
+                'error': f"a batch accepts at most {BATCH_MAX_SIZE} items"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        specs = []
+        errors = {}
+        for index, item in enumerate(items):
+            spec, error = _parse_generation_spec(item, default_lane=BATCH_LANE)
+            if error:
+                errors[index] = error
+            specs.append(spec)
+        if errors:
+            return Response({
+                'error': 'invalid items',
+                'items': errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        batch_id = uuid.uuid4()
+        records = GenerationTask.objects.bulk_create(
+            GenerationTask(task_id=uuid.uuid4(), status='PENDING', batch_id=batch_id) for _ in specs
+        )
+        retry_after = admission.reserve(len(records))
+        if retry_after:
+            GenerationTask.objects.filter(batch_id=batch_id).delete()
+            return _too_many_requests('generation queue is full', retry_after)
+
+        # A group goes out over a single producer connection instead of one publish per item
+        try:
+            group(
+                _generate_signature(str(record.task_id), spec)
+                for record, spec in zip(records, specs)
+            ).apply_async()
+        except Exception:
+            # Part of the group may have gone out; nothing will run the rest
+            admission.release(len(records))
+            GenerationTask.objects.filter(batch_id=batch_id).update(status='FAILURE', updated_at=timezone.now())
+            # As in _fail_unpublished: drop cached statuses and wake clients already waiting
+            task_ids = [record.task_id for record in records]
+            status_cache.invalidate(*task_ids)
+            for task_id in task_ids:
+                notify_status(task_id, 'FAILURE')
+            raise
+
+        return Response({
+            'batch_id': str(batch_id),
+            'task_ids': [str(record.task_id) for record in records],
+            'status': 'PENDING',
+            'message': f"Image generation started for {len(records)} mockups"
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class BatchStatusView(APIView):
+    """Aggregate progress of a batch: one grouped COUNT over its tasks."""
+
+    def get(self, request, batch_id):
+        counts = dict(
+            GenerationTask.objects.filter(batch_id=batch_id)
+            .values_list('status')
+            .annotate(count=Count('id'))
+            .order_by()
+        )
+        total = sum(counts.values())
+        if not total:
+            raise Http404('No batch matches the given query.')
+
+        finished = counts.get('SUCCESS', 0) + counts.get('FAILURE', 0)
+        return Response({
+            'batch_id': str(batch_id),
+            'total': total,
+            'counts': counts,
+            'finished': finished,
+            'progress': finished / total,
+            'status': 'FINISHED' if finished == total else 'IN_PROGRESS'
+        })
+
+
+def _task_payload(gen_task, images, request):
+    data = {
+        'task_id': str(gen_task.task_id),
+        'status': gen_task.status,
+        'results': []
+    }
+    if images:
+        serializer = GeneratedImageSerializer(images, many=True, context={'request': request})
+        data['results'] = serializer.data
+    return data
+
+
+def _load_task(task_id, request):
+    """``(GenerationTask, payload)`` read from the database."""
+    gen_task = get_object_or_404(GenerationTask, task_id=task_id)
+    images = GeneratedImage.objects.filter(mockup_id=gen_task.mockup_id) if gen_task.mockup_id else []
+    return gen_task, _task_payload(gen_task, images, request)
+
+
+def _load_task_payload(task_id, request):
+    return _load_task(task_id, request)[1]
+
+
+def _etag_matches(request, etag):
+    if_none_match = request.headers.get('If-None-Match', '')
+    return if_none_match.strip() == '*' or etag in [tag.strip() for tag in if_none_match.split(',')]
+
+
 class TaskStatusView(APIView):
+    """Status of one task.
+
+    With ``?wait=<seconds>`` the request long-polls: it returns as soon as the
+    status differs from ``?status=`` (default: the status at request time) or
+    becomes terminal, woken by the task's notification rather than by polling
+    the database, or after ``wait`` seconds (at most MOCKUP_LONG_POLL_MAX_WAIT).
+
+    Terminal responses carry an ETag and are served from ``status_cache``
+    without touching the database; a matching ``If-None-Match`` gets a 304.
+    """
+
+    def get(self, request, task_id):
+        origin = f"{request.scheme}://{request.get_host()}"
+        cached = status_cache.get(task_id)
+        if cached:
+            etag = cached['etag']
+            if _etag_matches(request, etag):
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+            if origin in cached['payloads']:
+                return Response(cached['payloads'][origin], headers={'ETag': etag})
+
+        try:
+            wait = min(float(request.query_params.get('wait', 0)), LONG_POLL_MAX_WAIT)
+        except ValueError:
+            return Response({
+                'error': 'wait must be a number of seconds'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if wait > 0:
+            # Subscribe before reading so a change between the read and the wait is not missed
+            with get_notifier().subscribe(task_id) as subscription:
+                gen_task = get_object_or_404(GenerationTask, task_id=task_id)
+                known_status = request.query_params.get('status') or gen_task.status
+                if gen_task.status == known_status and gen_task.status not in TERMINAL_STATUSES:
+                    subscription.wait(wait)
+
+        gen_task, payload = _load_task(task_id, request)
+        if gen_task.status not in TERMINAL_STATUSES:
+            return Response(payload)
+        etag = status_cache.make_etag(gen_task)
+        status_cache.store(gen_task, origin, payload)
+        if _etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        return Response(payload, headers={'ETag': etag})
+
+
+class TaskStatusBulkView(APIView):
+    """Statuses of many tasks (``?ids=<uuid>,<uuid>,...``) in two queries."""
+
+    def get(self, request):
+        raw_ids = [value for value in request.query_params.get('ids', '').split(',') if value.strip()]
+        if not raw_ids:
+            return Response({
+                'error': 'ids must be a comma-separated list of task ids'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if len(raw_ids) > BATCH_MAX_SIZE:
+            return Response({
+                'error': f"at most {BATCH_MAX_SIZE} ids can be looked up at once"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            task_ids = [uuid.UUID(value.strip()) for value in raw_ids]
+        except ValueError:
+            return Response({
+                'error': 'ids must be valid UUIDs'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        tasks = list(GenerationTask.objects.filter(task_id__in=task_ids))
+        images_by_mockup = defaultdict(list)
+        mockup_ids = {gen_task.mockup_id for gen_task in tasks if gen_task.mockup_id}
+        if mockup_ids:
+            for image in GeneratedImage.objects.filter(mockup_id__in=mockup_ids).order_by('id'):
+                images_by_mockup[image.mockup_id].append(image)
+
+        found = {gen_task.task_id: gen_task for gen_task in tasks}
+        return Response({
+            'tasks': [
+                _task_payload(found[task_id], images_by_mockup.get(found[task_id].mockup_id), request)
+                for task_id in task_ids if task_id in found
+            ],
+            'missing': [str(task_id) for task_id in task_ids if task_id not in found]
+        })
+
+
+class TaskEventsView(View):
+    """Server-Sent Events stream of a task's status until it is terminal.
+
+    Sends a ``status`` event with the same payload as TaskStatusView on
+    connect and after every notification, plus a comment heartbeat while idle.
+    A plain Django view: DRF content negotiation would reject EventSource's
+    ``Accept: text/event-stream``.
+    """
+
     def get(self, request, task_id):
-        gen_task = get_object_or_404(GenerationTask, task_id=task_id)
-        data = {
-            'task_id': str(gen_task.task_id),
-            'status': gen_task.status,
-            'results': []
-        }
-        if gen_task.mockup:
-            images = gen_task.mockup.images.all()
-            serializer = GeneratedImageSerializer(images, many=True, context={'request': request})
-            data['results'] = serializer.data
-        return Response(data)
+        get_object_or_404(GenerationTask, task_id=task_id)
+        response = StreamingHttpResponse(self._events(request, task_id), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # stop nginx from buffering the stream
+        return response
+
+    def _events(self, request, task_id):
+        deadline = time.monotonic() + SSE_MAX_DURATION
+        with get_notifier().subscribe(task_id) as subscription:
+            last_status = None
+            changed = True
+            while True:
+                # Heartbeats don't touch the database: only a notification reloads the task
+                if changed:
+                    payload = _load_task_payload(task_id, request)
+                    if payload['status'] != last_status:
+                        last_status = payload['status']
+                        yield f"event: status\ndata: {json.dumps(payload, cls=DjangoJSONEncoder)}\n\n"
+                    if last_status in TERMINAL_STATUSES:
+                        return
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                changed = subscription.wait(min(SSE_HEARTBEAT_INTERVAL, remaining)) is not None
+                if not changed:
+                    yield ": keep-alive\n\n"
+
+
+class MockupPreviewView(View):
+    """Low-resolution preview of one shirt colour, rendered in the request.
+
+    ``GET ?text=&font=&text_color=&shirt_color=&width=&output_format=``
+    returns the encoded image directly: no Celery round trip, no database
+    rows and no files. Rate limited per client like the generate endpoints
+    (429 with Retry-After), with text capped at MOCKUP_PREVIEW_MAX_TEXT_LENGTH. A plain Django view so ``<img src>`` and any
+    ``Accept: image/*`` header work without DRF content negotiation.
+    """
+
+    def get(self, request):
+        # Rendered in the request, so previews spend tokens from a bucket of their own
+        retry_after = admission.take_token(f"preview:{admission.client_id(request)}")
+        if retry_after:
+            return JsonResponse(
+                _throttled_response('rate limit exceeded', retry_after),
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={'Retry-After': str(retry_after)},
+            )
+
+        params = request.GET
+        text = params.get('text', '')
+        if not text:
+            return JsonResponse({'error': 'text parameter is required'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(text) > PREVIEW_MAX_TEXT_LENGTH:
+            return JsonResponse({
+                'error': f"text must be at most {PREVIEW_MAX_TEXT_LENGTH} characters"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            width = int(params.get('width', PREVIEW_WIDTH))
+        except ValueError:
+            return JsonResponse({'error': 'width must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        if not 16 <= width <= PREVIEW_MAX_WIDTH:
+            return JsonResponse({
+                'error': f"width must be between 16 and {PREVIEW_MAX_WIDTH}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        font = params.get('font') or None
+        if font is not None and font not in available_fonts():
+            return JsonResponse({
+                'error': f"font must be one of {sorted(available_fonts())}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        output_format = params.get('output_format', 'png')
+        formats = available_output_formats()
+        if output_format not in formats:
+            return JsonResponse({
+                'error': f"output_format must be one of {formats}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        text_color = params.get('text_color', '#000000')
+        if not is_text_color(text_color):
+            return JsonResponse({
+                'error': 'text_color must be a #RGB or #RRGGBB colour'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        shirt_color = params.get('shirt_color', 'white')
+        if not is_shirt_color(shirt_color):
+            return JsonResponse({
+                'error': f"shirt_color must be one of {DEFAULT_SHIRT_COLORS}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # Imported on the first preview: web processes that never serve one do not load Pillow
+        from .rendering import MockupRenderer, RenderSpec
+
+        content = MockupRenderer().render_bytes(RenderSpec(
+            text=text,
+            shirt_color=shirt_color,
+            font_name=font,
+            text_color=text_color,
+            width=width,
+            output_format=output_format,
+        ))
+        if content is None:
+            return JsonResponse({
+                'error': f"no shirt template for color '{shirt_color}'"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        pil_format, _, _ = OUTPUT_ENCODERS[output_format]
+        response = HttpResponse(content, content_type=CONTENT_TYPES[pil_format])
+        # The same parameters always render the same bytes
+        response['Cache-Control'] = 'public, max-age=300'
+        return response
+
+
+def _metrics_allowed(request):
+    if request.user.is_authenticated and request.user.is_staff:
+        return True
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return any(address in network for network in METRICS_ALLOWED_NETWORKS)
+
+
+class MetricsView(View):
+    """Prometheus scrape endpoint for this process's stage timing histograms (see mockups.timing).
+
+    Only staff users and addresses in MOCKUP_METRICS_ALLOWED_NETWORKS get it;
+    everyone else gets a 403. REMOTE_ADDR is used rather than a forwarded
+    header, which a client could set to an allowed address.
+    """
+
+    def get(self, request):
+        if not _metrics_allowed(request):
+            return JsonResponse({
+                'detail': 'You do not have permission to perform this action.'
+            }, status=status.HTTP_403_FORBIDDEN)
+        return HttpResponse(timing_registry.render(), content_type=EXPOSITION_CONTENT_TYPE)
 
 
 class MockupListView(ListAPIView):
-    queryset = Mockup.objects.prefetch_related('images').all().order_by('-created_at')
+    # MockupSerializer picks the first image from the prefetch cache, so a
+    # page costs two queries regardless of its size.
+    queryset = Mockup.objects.prefetch_related('images').order_by('-created_at', '-id')
     serializer_class = MockupSerializer
+    pagination_class = MockupCursorPagination
     
     def get_serializer_context(self):
         context = super().get_serializer_context()
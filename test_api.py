@@ -3,7 +3,6 @@ Quick test script for Mockup Generator API
 Run this after starting Django server and Celery worker
 """
 import requests  # type: ignore[import]
-import time
 import json
 import sys
 
@@ -53,11 +52,14 @@ def test_task_status(task_id):
     print("2. Testing GET /api/v1/tasks/{task_id}/")
     print("=" * 50)
     
-    print("Waiting 5 seconds for task to complete...")
-    time.sleep(5)
+    print("Waiting (long-poll, up to 30 seconds) for task to complete...")
     
     try:
-        response = requests.get(f"{BASE_URL}/api/v1/tasks/{task_id}/", timeout=30)
+        response = requests.get(
+            f"{BASE_URL}/api/v1/tasks/{task_id}/",
+            params={"wait": 30},
+            timeout=40
+        )
         print(f"Status Code: {response.status_code}")
         result = response.json()
         print(f"Response: {json.dumps(result, indent=2)}")